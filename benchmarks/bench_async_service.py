@@ -0,0 +1,85 @@
+"""
+동시 세션 처리량 부하 테스트: 동기 get_user_response vs 비동기 aget_user_response
+
+Chainlit의 async 핸들러에서 동기 호출을 하면 이벤트 루프가 막혀 세션이 한 줄로 처리됨
+비교설계 경로(의도분류 -> SQL 생성 -> DB 조회 -> JSON 변환)를 가짜 OpenAI 클라이언트와 SQLite로 실행
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_async_service --sessions 16
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+from benchmarks.corpus import COMPARE_QUESTIONS
+from benchmarks.fakes import FakeAsyncOpenAI, FakeOpenAI, Messages, default_responder
+from config.settings import PROJECT_ROOT
+from db.connection_pool import ConnectionPool
+from db.sql_utils import TemplateManager, set_connection_pool
+from db.sqlite_client import SQLiteConnection
+from services.insurance_service import InsuranceService
+
+
+def seed_database(database: str) -> None:
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO insu_company VALUES ('C01', '현대해상화재', 1)")
+        cursor.execute("INSERT INTO insu_product VALUES ('C01', 'P01', '굿앤굿어린이종합보험', 1)")
+        cursor.execute("INSERT INTO coverage VALUES ('CV01', '일반암진단비', 30000000, 1)")
+        cursor.execute("INSERT INTO comparison VALUES ('홍길동', 25, 1, 'nr', '20y_100', 'C01', 'P01', 'CV01', 15000)")
+    conn.commit()
+    conn.close()
+
+
+async def run_sessions(call: Callable[[str], Awaitable[str]], sessions: int, requests: int) -> float:
+    async def session(session_id: int) -> None:
+        for i in range(requests):
+            await call(COMPARE_QUESTIONS[(session_id + i) % len(COMPARE_QUESTIONS)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(session_id) for session_id in range(sessions)))
+    return time.perf_counter() - start
+
+
+def compare_responder(messages: Messages) -> str:
+    # 로컬 분류기가 넘긴 애매한 질문도 비교설계 경로로 보냄
+    if "SQL" in messages[0]["content"] or "JSON" in messages[0]["content"]:
+        return default_responder(messages)
+    return "비교설계 질문"
+
+
+async def main(args: argparse.Namespace) -> None:
+    template_manager = TemplateManager(templates_dir=PROJECT_ROOT / "prompts")
+    service = InsuranceService(
+        openai_client=FakeOpenAI(args.latency, compare_responder),
+        template_manager=template_manager,
+        async_openai_client=FakeAsyncOpenAI(args.latency, compare_responder),
+    )
+
+    async def blocking(question: str) -> str:
+        # 기존 main.py와 동일: async 핸들러 안에서 동기 호출
+        return service.get_user_response(question)
+
+    total = args.sessions * args.requests
+    for name, call in [("sync", blocking), ("async", service.aget_user_response)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = await run_sessions(call, args.sessions, args.requests)
+        print(f"{name:<6} {total} requests / {args.sessions} sessions: {elapsed:6.2f}s  {total / elapsed:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.1, help="가짜 LLM 호출 지연(초)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = f"{tmp_dir}/insu.db"
+        seed_database(database)
+        set_connection_pool(ConnectionPool(lambda: SQLiteConnection(database), size=args.sessions))
+        asyncio.run(main(args))
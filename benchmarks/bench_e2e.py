@@ -0,0 +1,311 @@
+"""
+오프라인 end-to-end 부하 테스트: InsuranceService 전체 경로를 로컬 대체 구현으로 실행
+
+- OpenAI: FakeOpenAI/FakeAsyncOpenAI(의도분류, SQL 생성, JSON 변환), FakeChatModel(약관 답변)
+- 임베딩: FakeEmbedding(텍스트 해시 벡터)
+- DB: db/schema.py 스키마의 SQLite + 합성 comparison 데이터
+- insu_data: 보험사별 합성 FAISS 컬렉션(faiss.index + metadata.json)
+처리량, 요청/단계별 p50/p95/p99(트레이싱 span 기준), 최대 RSS를 출력하고 JSON으로 저장해 커밋 간 비교
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_e2e --mode async --concurrency 16
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_e2e --compare benchmarks/results/<이전 결과>.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import faiss
+import numpy as np
+
+import models.search
+import modules.handler
+from benchmarks.bench_hybrid_search import synthetic_metadata
+from benchmarks.bench_premium_cube import seed_synthetic
+from benchmarks.corpus import COMPARE_QUESTIONS, POLICY_QUESTIONS, SAMPLE_COMPANY_KEYWORDS
+from benchmarks.fakes import FakeAsyncOpenAI, FakeChatModel, FakeEmbedding, FakeOpenAI, Messages, default_responder
+from config.settings import PROJECT_ROOT, settings
+from db.connection_pool import ConnectionPool
+from db.sql_utils import TemplateManager, set_connection_pool
+from db.sqlite_client import SQLiteConnection
+from models.collection_registry import collection_registry
+from models.generate_answer import PolicyResponse
+from options.enums import IntentType
+from options.insu_name import insu_match
+from services.insurance_service import InsuranceService
+from util.keyword_mapping import KEYWORD_MAPPING_VERSION, clear_keyword_mapping_cache, keyword_source_hash
+from util.tracing import tracer
+
+RESULTS_DIR = Path(__file__).parent / "results"
+QUANTILES = (50, 95, 99)
+
+
+def build_collections(base_path: str, num_chunks: int, dim: int) -> None:
+    """
+    insu_data와 같은 구조(컬렉션 폴더마다 faiss.index + metadata.json)의 합성 컬렉션 생성
+    """
+    for number, collection_name in enumerate(insu_match.values()):
+        collection_dir = os.path.join(base_path, collection_name)
+        os.makedirs(collection_dir, exist_ok=True)
+        vectors = np.random.default_rng(number).standard_normal((num_chunks, dim)).astype(np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(dim)
+        index.add(vectors)
+        faiss.write_index(index, os.path.join(collection_dir, "faiss.index"))
+        with open(os.path.join(collection_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(synthetic_metadata(num_chunks, seed=number), f, ensure_ascii=False)
+
+
+def write_keyword_mapping(path: str) -> None:
+    # LLM으로 만드는 보험사 키워드 매핑 대신 샘플 매핑을 캐시 파일 형식으로 저장
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": KEYWORD_MAPPING_VERSION,
+                "source_hash": keyword_source_hash(),
+                "mapping": SAMPLE_COMPANY_KEYWORDS,
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+
+def responder(messages: Messages) -> str:
+    # 로컬 분류기가 넘긴 질문은 코퍼스 종류에 따라 의도를 돌려줌
+    content = messages[-1]["content"] if messages else ""
+    if "SQL" in messages[0]["content"] or "JSON" in messages[0]["content"]:
+        return default_responder(messages)
+    if any(question in content for question in POLICY_QUESTIONS):
+        return IntentType.POLICY_QUESTION
+    return IntentType.COMPARE_QUESTION
+
+
+def workload(num_requests: int, policy_ratio: float) -> list[str]:
+    # 약관 질문 비율을 맞춰 두 코퍼스를 번갈아 섞은 고정 순서
+    questions = []
+    policy_count = 0
+    for i in range(num_requests):
+        if policy_count < round((i + 1) * policy_ratio):
+            questions.append(POLICY_QUESTIONS[policy_count % len(POLICY_QUESTIONS)])
+            policy_count += 1
+        else:
+            questions.append(COMPARE_QUESTIONS[(i - policy_count) % len(COMPARE_QUESTIONS)])
+    return questions
+
+
+def configure(args: argparse.Namespace, tmp_dir: str) -> InsuranceService:
+    vector_path = os.path.join(tmp_dir, "insu_data")
+    start = time.perf_counter()
+    build_collections(vector_path, args.chunks, args.dim)
+    database = os.path.join(tmp_dir, "insu.db")
+    num_rows = seed_synthetic(database, range(20, 20 + args.ages), products_per_company=2, num_coverages=40)
+    print(
+        f"합성 데이터: 컬렉션 {len(insu_match)}개 x {args.chunks}청크, comparison {num_rows}행 "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+
+    settings.vector_path = vector_path
+    settings.keyword_mapping_path = os.path.join(tmp_dir, "insu_keywords.json")
+    write_keyword_mapping(settings.keyword_mapping_path)
+    clear_keyword_mapping_cache()
+    collection_registry.base_path = vector_path
+    set_connection_pool(ConnectionPool(lambda: SQLiteConnection(database), size=args.concurrency))
+    models.search.upembedding = FakeEmbedding(args.dim, args.embedding_latency)
+    PolicyResponse.policy_model = lambda self: FakeChatModel(  # type: ignore[method-assign]
+        latency=args.llm_latency, token_interval=args.token_interval
+    )
+    if args.no_cache:
+        modules.handler.query_cache = None
+        modules.handler.answer_cache = None
+
+    tracer.enabled = True
+    tracer.traces = deque()
+    return InsuranceService(
+        openai_client=FakeOpenAI(args.llm_latency, responder),
+        template_manager=TemplateManager(templates_dir=PROJECT_ROOT / "prompts"),
+        async_openai_client=FakeAsyncOpenAI(args.llm_latency, responder),
+    )
+
+
+def run_sync(service: InsuranceService, questions: list[str], concurrency: int) -> list[float]:
+    def call(item: tuple[int, str]) -> float:
+        start = time.perf_counter()
+        service.get_user_response(item[1], session_id=f"session-{item[0] % concurrency}")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(call, enumerate(questions)))
+
+
+async def run_async(service: InsuranceService, questions: list[str], concurrency: int, stream: bool) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(number: int, question: str) -> float:
+        session_id = f"session-{number % concurrency}"
+        async with semaphore:
+            start = time.perf_counter()
+            if stream:
+                async for _ in service.astream_user_response(question, session_id):
+                    pass
+            else:
+                await service.aget_user_response(question, session_id)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(call(number, question) for number, question in enumerate(questions)))
+
+
+def run(service: InsuranceService, questions: list[str], args: argparse.Namespace) -> list[float]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.mode == "sync":
+            return run_sync(service, questions, args.concurrency)
+        return asyncio.run(run_async(service, questions, args.concurrency, stream=args.mode == "stream"))
+
+
+def summarize(latencies_ms: list[float]) -> dict[str, float]:
+    values = np.asarray(latencies_ms)
+    summary = {"count": int(len(values)), "mean": float(values.mean())}
+    summary.update({f"p{q}": float(np.percentile(values, q)) for q in QUANTILES})
+    return summary
+
+
+def stage_stats(traces: list[dict[str, Any]]) -> tuple[dict[str, dict[str, float]], dict[str, int]]:
+    """
+    트레이스에서 (단계별 지연 시간 분위수(ms), 단계별 토큰 수) 집계
+    """
+    durations: dict[str, list[float]] = {}
+    tokens: dict[str, int] = {}
+
+    def walk(span: dict[str, Any]) -> None:
+        durations.setdefault(span["name"], []).append(span["duration_ms"])
+        if span["prompt_tokens"] or span["completion_tokens"]:
+            tokens[span["name"]] = tokens.get(span["name"], 0) + span["prompt_tokens"] + span["completion_tokens"]
+        for child in span["children"]:
+            walk(child)
+
+    for trace in traces:
+        walk(trace)
+    return {name: summarize(values) for name, values in sorted(durations.items())}, tokens
+
+
+def peak_rss_mb() -> float:
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, cwd=PROJECT_ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def print_report(result: dict[str, Any]) -> None:
+    print(
+        f"\n{result['mode']} / 동시성 {result['config']['concurrency']}: {result['requests']}건 "
+        f"{result['elapsed_s']:.2f}s, {result['throughput_rps']:.1f} req/s, 최대 RSS {result['peak_rss_mb']:.0f}MB"
+    )
+    header = f"{'stage':<18} {'count':>6} " + " ".join(f"{'p' + str(q) + '(ms)':>10}" for q in QUANTILES)
+    print(header)
+    rows = [("(client)", result["latency_ms"])]
+    if result["first_token_ms"] is not None:
+        rows.append(("(first token)", result["first_token_ms"]))
+    for name, stats in rows + list(result["stages"].items()):
+        print(f"{name:<18} {stats['count']:>6} " + " ".join(f"{stats[f'p{q}']:>10.1f}" for q in QUANTILES))
+    if result["tokens"]:
+        print("토큰: " + ", ".join(f"{name} {count}" for name, count in result["tokens"].items()))
+
+
+def print_comparison(result: dict[str, Any], previous: dict[str, Any]) -> None:
+    print(f"\n{previous['revision']} ({previous['mode']}) -> {result['revision']} ({result['mode']})")
+    change = result["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+    before, after = previous["throughput_rps"], result["throughput_rps"]
+    print(f"{'throughput':<18} {before:>10.1f} -> {after:>8.1f} req/s ({change:+.0%})")
+    print(f"{'peak rss':<18} {previous['peak_rss_mb']:>10.0f} -> {result['peak_rss_mb']:>8.0f} MB")
+    for name, stats in result["stages"].items():
+        before = previous["stages"].get(name)
+        if before is None:
+            continue
+        print(
+            f"{name:<18} p50 {before['p50']:>8.1f} -> {stats['p50']:>8.1f}ms   "
+            f"p99 {before['p99']:>8.1f} -> {stats['p99']:>8.1f}ms"
+        )
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = configure(args, tmp_dir)
+        # 컬렉션 로드/토큰 수 계산 같은 첫 요청 비용은 warmup에서 치르고 측정에서 제외
+        run(service, workload(args.warmup, args.policy_ratio), args)
+        tracer.reset()
+
+        questions = workload(args.requests, args.policy_ratio)
+        start = time.perf_counter()
+        latencies = run(service, questions, args)
+        elapsed = time.perf_counter() - start
+        stages, tokens = stage_stats(list(tracer.traces))
+        first_tokens = [
+            trace["attributes"]["first_token_ms"]
+            for trace in tracer.traces
+            if trace["attributes"].get("first_token_ms") is not None
+        ]
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": args.mode,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "requests": len(questions),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(questions) / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "latency_ms": summarize([latency * 1000 for latency in latencies]),
+        "first_token_ms": summarize(first_tokens) if first_tokens else None,
+        "stages": stages,
+        "tokens": tokens,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["sync", "async", "stream"], default="async")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--policy-ratio", type=float, default=0.5, help="약관 질문 비율 (나머지는 비교설계 질문)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="가짜 LLM 응답(스트리밍은 첫 토큰) 지연(초)")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="스트리밍 토큰 간격(초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="가짜 임베딩 지연(초)")
+    parser.add_argument("--chunks", type=int, default=2000, help="컬렉션당 청크 수")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--ages", type=int, default=20, help="합성 comparison 데이터 나이 수 (20세부터)")
+    parser.add_argument("--no-cache", action="store_true", help="비교설계/답변 캐시 끄기")
+    parser.add_argument("--output", type=Path, help="결과 JSON 경로 (기본값 benchmarks/results/e2e_<mode>_<커밋>.json)")
+    parser.add_argument("--compare", type=Path, help="이전 결과 JSON과 비교")
+    args = parser.parse_args()
+
+    result = main(args)
+    print_report(result)
+    output: Optional[Path] = args.output or RESULTS_DIR / f"e2e_{args.mode}_{result['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {output}")
+    if args.compare:
+        print_comparison(result, json.loads(args.compare.read_text(encoding="utf-8")))
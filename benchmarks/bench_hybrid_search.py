@@ -0,0 +1,113 @@
+"""
+BM25 희소 검색과 RRF 결합이 벡터 검색에 더하는 지연 시간 측정
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_hybrid_search
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+import faiss
+import numpy as np
+
+from benchmarks.corpus import QUESTIONS
+from models.sparse_index import BM25Index, reciprocal_rank_fusion
+
+CLAUSE_WORDS = [
+    "보험금",
+    "지급사유",
+    "진단비",
+    "입원일당",
+    "수술비",
+    "통원",
+    "면책기간",
+    "감액지급",
+    "피보험자",
+    "보험계약자",
+    "갱신형",
+    "무해지환급형",
+    "특별약관",
+    "상해",
+    "질병",
+    "암",
+    "뇌출혈",
+    "급성심근경색",
+    "외상후",
+    "스트레스",
+    "장애",
+    "치아",
+    "골절",
+]
+
+
+def synthetic_metadata(num_chunks: int, seed: int = 0) -> dict:
+    # 약관 단어 + 조항 번호 + KCD 코드로 이루어진 합성 청크
+    rng = np.random.default_rng(seed)
+    metadata = {}
+    for doc_id in range(num_chunks):
+        words = rng.choice(CLAUSE_WORDS, size=rng.integers(40, 120)).tolist()
+        words.append(f"제{doc_id % 50 + 1}조")
+        words.append(f"{chr(65 + doc_id % 26)}{doc_id % 100:02d}.{doc_id % 10}")
+        metadata[str(doc_id)] = {"header1": None, "source": "bench", "text": " ".join(words)}
+    return metadata
+
+
+def measure(search: Callable[[str], object], questions: list[str], rounds: int) -> list[float]:
+    latencies = []
+    for _ in range(rounds):
+        for question in questions:
+            start = time.perf_counter()
+            search(question)
+            latencies.append((time.perf_counter() - start) * 1e3)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<14} mean {statistics.fmean(latencies):7.3f}ms  p50 {quantiles[49]:7.3f}ms  p99 {quantiles[98]:7.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000, help="컬렉션당 청크 수")
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    metadata = synthetic_metadata(args.chunks)
+    start = time.perf_counter()
+    sparse_index = BM25Index.build(metadata)
+    print(
+        f"bm25 build: {time.perf_counter() - start:.2f}s, 단어 {len(sparse_index.terms)}개, "
+        f"{sparse_index.nbytes / 1024 / 1024:.1f}MB"
+    )
+
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((args.chunks, args.dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(args.dim)
+    index.add(vectors)
+    query = rng.standard_normal((1, args.dim)).astype(np.float32)
+    faiss.normalize_L2(query)
+
+    questions = QUESTIONS + ["F43.1 외상후 스트레스 장애 보장", "제3조 보험금 지급사유", "A01.1 진단비"]
+
+    def vector_search(question: str) -> list[int]:
+        _, indices = index.search(query, args.candidates)
+        return indices[0].tolist()
+
+    def sparse_search(question: str) -> list[int]:
+        return sparse_index.search(question, args.candidates)[0].tolist()
+
+    def hybrid_search(question: str) -> list[tuple[int, float]]:
+        return reciprocal_rank_fusion([vector_search(question), sparse_search(question)])[: args.top_k]
+
+    report("vector", measure(vector_search, questions, args.rounds))
+    report("bm25", measure(sparse_search, questions, args.rounds))
+    report("vector+bm25", measure(hybrid_search, questions, args.rounds))
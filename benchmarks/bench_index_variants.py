@@ -0,0 +1,94 @@
+"""
+IVF-PQ/HNSW/SQ8 인덱스의 recall@k, 검색 지연 시간, 크기를 원본(flat) 인덱스와 비교
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_index_variants
+CONF_ENV=DEV PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_index_variants --collection Samsung
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import faiss
+import numpy as np
+from numpy.typing import NDArray
+
+from models.index_builder import apply_search_params, build_index
+from options.enums import IndexVariant
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> NDArray[np.float32]:
+    # 약관 청크 임베딩처럼 주제별로 뭉쳐 있는 정규화 벡터
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((64, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), num_vectors)] + 0.5 * rng.standard_normal((num_vectors, dim))
+    vectors = vectors.astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def collection_vectors(collection_name: str) -> NDArray[np.float32]:
+    from config.settings import PROJECT_ROOT, settings
+
+    index = faiss.read_index(os.path.join(PROJECT_ROOT, settings.vector_path, collection_name, "faiss.index"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def make_queries(vectors: NDArray[np.float32], num_queries: int, seed: int = 1) -> NDArray[np.float32]:
+    # 실제 질문 임베딩 대신 문서 벡터에 잡음을 더해 사용
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), num_queries)] + 0.3 * rng.standard_normal(
+        (num_queries, vectors.shape[1])
+    ).astype(np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def evaluate(
+    index: faiss.Index, queries: NDArray[np.float32], expected: NDArray[np.int64], top_k: int
+) -> tuple[float, list[float]]:
+    latencies = []
+    hits = 0
+    for query, expected_ids in zip(queries, expected):
+        start = time.perf_counter()
+        _, indices = index.search(query.reshape(1, -1), top_k)
+        latencies.append((time.perf_counter() - start) * 1e3)
+        hits += len(set(indices[0]) & set(expected_ids))
+    return hits / expected.size, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collection", help="insu_data 컬렉션 이름 (지정하지 않으면 합성 벡터 사용)")
+    parser.add_argument("--num-vectors", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--pq-m", type=int, default=64)
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)  # 질문 1건 지연 시간 비교이므로 단일 스레드로 측정
+    vectors = collection_vectors(args.collection) if args.collection else synthetic_vectors(args.num_vectors, args.dim)
+    queries = make_queries(vectors, args.queries)
+    print(f"vectors {vectors.shape[0]} x {vectors.shape[1]}, queries {len(queries)}, top_k {args.top_k}")
+
+    expected = None
+    for variant in IndexVariant:
+        start = time.perf_counter()
+        index = build_index(vectors, variant, pq_m=args.pq_m)
+        build_seconds = time.perf_counter() - start
+        apply_search_params(index, nprobe=args.nprobe, ef_search=args.ef_search)
+        if expected is None:
+            _, expected = index.search(queries, args.top_k)
+
+        recall, latencies = evaluate(index, queries, expected, args.top_k)
+        quantiles = statistics.quantiles(latencies, n=100)
+        size_mb = faiss.serialize_index(index).nbytes / 1024 / 1024
+        print(
+            f"{variant:<6} recall@{args.top_k} {recall:.3f}  p50 {quantiles[49]:6.3f}ms  p99 {quantiles[98]:6.3f}ms  "
+            f"size {size_mb:8.1f}MB  build {build_seconds:6.1f}s"
+        )
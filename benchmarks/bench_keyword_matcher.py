@@ -0,0 +1,62 @@
+"""
+보험사/보험종류/비교 키워드 검출 마이크로 벤치마크
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_keyword_matcher
+"""
+
+import argparse
+import re
+import statistics
+import time
+from typing import Callable
+
+from benchmarks.corpus import QUESTIONS, SAMPLE_COMPANY_KEYWORDS
+from options.insu_name import comparison_keywords, insurance_type_keywords
+from util.keyword_matcher import KeywordMatcher, normalize_text
+
+
+def legacy_find(user_input: str) -> tuple[list[str], bool, list[str]]:
+    # 기존 find_detected_keywords와 동일하게 호출마다 정규식을 새로 만듦
+    mentioned_companies = [
+        company
+        for company, keywords in SAMPLE_COMPANY_KEYWORDS.items()
+        if re.search("|".join(normalize_text(keyword) for keyword in keywords), user_input)
+    ]
+    is_comparison = re.search("|".join(normalize_text(k) for k in comparison_keywords), user_input) is not None
+    detected_insurance_types = [keyword for keyword in insurance_type_keywords if keyword in user_input]
+    return mentioned_companies, is_comparison, detected_insurance_types
+
+
+def measure(find: Callable[[str], object], questions: list[str], rounds: int) -> list[float]:
+    latencies = []
+    for _ in range(rounds):
+        for question in questions:
+            start = time.perf_counter()
+            find(question)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<10} mean {statistics.fmean(latencies):7.2f}us  "
+        f"p50 {quantiles[49]:7.2f}us  p99 {quantiles[98]:7.2f}us  (n={len(latencies)})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    questions = [normalize_text(question) for question in QUESTIONS]
+    build_start = time.perf_counter()
+    matcher = KeywordMatcher(SAMPLE_COMPANY_KEYWORDS, insurance_type_keywords, comparison_keywords)
+    print(f"matcher build: {(time.perf_counter() - build_start) * 1e3:.2f}ms")
+
+    for question in questions:
+        assert matcher.find(question) == legacy_find(question), question
+
+    report("legacy", measure(legacy_find, questions, args.rounds))
+    report("matcher", measure(matcher.find, questions, args.rounds))
@@ -0,0 +1,142 @@
+"""
+보험료 큐브(NumPy 집계) vs SQL 템플릿 + DB 조회 지연 시간
+
+합성 comparison 데이터(나이 x 성별 x 상품유형 x 보험사 x 상품 x 보장항목)를 SQLite에 적재해 비교
+--mysql이면 설정된 MySQL의 실제 comparison 테이블을 읽기만 해서 비교
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_premium_cube
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+import numpy as np
+
+from benchmarks.corpus import COMPARE_QUESTIONS
+from db.connection_pool import ConnectionPool
+from db.premium_cube import PremiumCube
+from db.sql_templates import COVERAGE_KEYWORDS, SQLTemplateMatcher, parse_comparison_question
+from db.sql_utils import DatabaseClient
+from db.sqlite_client import SQLiteConnection
+from modules.user_state import UserState
+from options.enums import ProductType
+
+COMPANY_NAMES = [
+    "DB손해보험",
+    "삼성화재",
+    "하나손해보험",
+    "한화손해보험",
+    "흥국화재",
+    "현대해상화재",
+    "KB손해보험",
+    "롯데손해보험",
+    "MG손해보험",
+    "메리츠화재",
+    "NH농협손해보험",
+]
+
+
+def seed_synthetic(database: str, ages: range, products_per_company: int, num_coverages: int) -> int:
+    rng = np.random.default_rng(0)
+    conn = SQLiteConnection.with_schema(database)
+    rows = []
+    with conn.cursor() as cursor:
+        for company_number, company_name in enumerate(COMPANY_NAMES):
+            company_id = f"C{company_number:02d}"
+            cursor.execute("INSERT INTO insu_company VALUES (%s, %s, 1)", (company_id, company_name))
+            for product_number in range(products_per_company):
+                product_name = f"{company_name} 상품{product_number}"
+                cursor.execute(
+                    "INSERT INTO insu_product VALUES (%s, %s, %s, 1)", (company_id, f"P{product_number}", product_name)
+                )
+        for coverage_number in range(num_coverages):
+            keyword = COVERAGE_KEYWORDS[coverage_number % len(COVERAGE_KEYWORDS)]
+            cursor.execute(
+                "INSERT INTO coverage VALUES (%s, %s, 10000000, %s)",
+                (f"CV{coverage_number:03d}", f"{keyword}{coverage_number}", int(coverage_number % 3 == 0)),
+            )
+        for age in ages:
+            for sex in (0, 1):
+                for product_type in ProductType:
+                    for company_number in range(len(COMPANY_NAMES)):
+                        for product_number in range(products_per_company):
+                            premiums = rng.integers(100, 50000, size=num_coverages)
+                            for coverage_number, premium in enumerate(premiums.tolist()):
+                                rows.append(
+                                    (
+                                        age,
+                                        sex,
+                                        str(product_type),
+                                        f"C{company_number:02d}",
+                                        f"P{product_number}",
+                                        f"CV{coverage_number:03d}",
+                                        premium,
+                                    )
+                                )
+        cursor.executemany("INSERT INTO comparison VALUES ('홍길동', %s, %s, %s, '20y_100', %s, %s, %s, %s)", rows)
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def measure(run: Callable[[], object], rounds: int) -> list[float]:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<6} mean {statistics.fmean(latencies):9.1f}us  p50 {quantiles[49]:9.1f}us  p99 {quantiles[98]:9.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ages", type=int, default=46, help="합성 데이터 나이 수 (20세부터)")
+    parser.add_argument("--products", type=int, default=2, help="보험사당 상품 수")
+    parser.add_argument("--coverages", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--mysql", action="store_true", help="설정된 MySQL의 comparison 테이블로 측정")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.mysql:
+            db_client = DatabaseClient()
+        else:
+            database = os.path.join(tmp_dir, "insu.db")
+            start = time.perf_counter()
+            num_rows = seed_synthetic(database, range(20, 20 + args.ages), args.products, args.coverages)
+            print(f"합성 데이터: {num_rows}행 ({time.perf_counter() - start:.1f}s)")
+            db_client = DatabaseClient(ConnectionPool(lambda: SQLiteConnection(database), size=1))
+
+        start = time.perf_counter()
+        cube = PremiumCube.load(db_client)
+        print(
+            f"큐브 로드: {time.perf_counter() - start:.2f}s, 가입조건 {len(cube.profiles)}개, "
+            f"{cube.nbytes / 1024 / 1024:.1f}MB"
+        )
+
+        matcher = SQLTemplateMatcher()
+        sql_latencies: list[float] = []
+        cube_latencies: list[float] = []
+        for question in COMPARE_QUESTIONS:
+            user_state = UserState.update_by_user_input_none(UserState(), question)
+            comparison_query = parse_comparison_question(question)
+            if comparison_query is None:
+                continue
+            sql_query = matcher.to_sql(comparison_query, user_state)
+            sql_latencies += measure(lambda: db_client.execute_query(sql_query.sql, sql_query.params), args.rounds)
+            cube_latencies += measure(lambda: cube.answer(comparison_query, user_state), args.rounds)
+
+        report("sql", sql_latencies)
+        report("cube", cube_latencies)
+        print(f"speedup (p50): {statistics.median(sql_latencies) / statistics.median(cube_latencies):.0f}x")
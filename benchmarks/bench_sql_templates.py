@@ -0,0 +1,40 @@
+"""
+비교설계 질문 중 SQL 템플릿으로 처리되는 비율과 템플릿 매칭 시간
+
+CONF_ENV=TEST PYTHONPATH=$(pwd)/src:$(pwd) python -m benchmarks.bench_sql_templates
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.corpus import COMPARE_QUESTIONS
+from db.sql_templates import SQLTemplateMatcher
+from modules.user_state import UserState
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("-v", "--verbose", action="store_true", help="질문별 템플릿 매칭 여부 출력")
+    args = parser.parse_args()
+
+    matcher = SQLTemplateMatcher()
+    matched = 0
+    for question in COMPARE_QUESTIONS:
+        user_state = UserState.update_by_user_input_none(UserState(), question)
+        sql_query = matcher.match(question, user_state)
+        matched += sql_query is not None
+        if args.verbose:
+            print(f"{'template' if sql_query else 'llm':<8} {question}")
+    print(f"템플릿 처리: {matched}/{len(COMPARE_QUESTIONS)} ({matched / len(COMPARE_QUESTIONS):.0%})")
+
+    latencies = []
+    for _ in range(args.rounds):
+        for question in COMPARE_QUESTIONS:
+            start = time.perf_counter()
+            matcher.match(question, UserState())
+            latencies.append((time.perf_counter() - start) * 1e6)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"match      mean {statistics.fmean(latencies):7.2f}us  p50 {quantiles[49]:7.2f}us  p99 {quantiles[98]:7.2f}us"
+    )
@@ -0,0 +1,65 @@
+# 벤치마크용 질문 코퍼스 (상담 로그 형태를 흉내낸 합성 질문)
+from options.insu_name import db_keywords, nh_keywords
+
+COMPARE_QUESTIONS = [
+    "현대해상의 기본플랜 보험료를 알려줘",
+    "삼성화재 무해지형 30세 남자 보험료 얼마야?",
+    "40세 여자 기준으로 보험사별 보험료 비교해줘",
+    "KB손해보험이랑 DB손해보험 보험료 차이 알려줘",
+    "가장 저렴한 보험사 3개 알려줘",
+    "메리츠화재 보장항목별 보험료 상세하게 보여줘",
+    "20년/100세 해지환급형 보험료 비교해줘",
+    "35세 남성 무해지 기본플랜 보험료 순위",
+    "흥국화재 유사암 진단비 보험료는?",
+    "롯데손해보험 기본보장 보험료 합계 알려줘",
+    "한화손해보험과 하나손해보험 중 어디가 더 싸?",
+    "50세 여성 기준 보험사별 평균 보험료 알려줘",
+    "농협손해보험 뇌혈관질환 진단비 보험료 얼마?",
+    "MG손해보험 상품별 보험료 합계 보여줘",
+    "보험료가 제일 비싼 보험사는 어디야?",
+    "25세 남자 무해지형 20년납 100세만기 보험료 비교",
+    "현대해상 보장항목별 상세 보험료 알려줘",
+    "삼성화재랑 메리츠화재 기본플랜 보험료 비교해줘",
+    "DB손보 허혈성심장질환 진단비 보험료",
+    "45세 여자 해지환급형 보험료 싼 순서로 5개",
+]
+
+POLICY_QUESTIONS = [
+    "외상후 스트레스 장애(PTSD)를 보장하는 보험은?",
+    "F43.1 진단을 받으면 보험금이 지급되나요?",
+    "암 진단비 지급 조건이 어떻게 돼?",
+    "유사암의 정의가 뭐야?",
+    "상해로 인한 입원 시 보장 내용 알려줘",
+    "삼성화재 약관에서 면책 기간은 얼마나 돼?",
+    "갑상선암은 일반암으로 보장되나요?",
+    "보험금 청구할 때 필요한 서류는?",
+    "현대해상 약관상 뇌졸중 정의 알려줘",
+    "질병 수술비 특약의 보장 범위가 궁금해",
+    "자동차 사고로 다쳤을 때 실손 보험 청구 가능해?",
+    "계약 전 알릴 의무를 위반하면 어떻게 돼?",
+    "KB손해보험 치매 진단 기준이 뭐야?",
+    "운전자 보험에서 벌금 보장 한도는?",
+    "화재 보험은 재물 손해를 어디까지 보장해?",
+    "납입면제 조건이 보험사마다 어떻게 달라?",
+    "DB손해보험 약관에서 보험금 지급 거절 사유 알려줘",
+    "우울증 치료도 보장되는 보험이 있나요?",
+    "메리츠화재와 한화손해보험 암 보장 차이점",
+    "NH농협손해보험 골절 진단비 지급 기준",
+]
+
+QUESTIONS = COMPARE_QUESTIONS + POLICY_QUESTIONS
+
+# 키워드 매핑 LLM 호출 없이 쓰는 보험사 키워드 예시
+SAMPLE_COMPANY_KEYWORDS = {
+    "DB손해보험": db_keywords,
+    "삼성화재": ["삼성화재", "삼성", "samsung"],
+    "하나손해보험": ["하나손해보험", "하나손보", "하나", "hana"],
+    "한화손해보험": ["한화손해보험", "한화손보", "한화", "hanwha"],
+    "흥국화재": ["흥국화재", "흥국", "heung"],
+    "현대해상": ["현대해상", "현대", "hyundai"],
+    "KB손해보험": ["kb손해보험", "kb손보", "kb"],
+    "롯데손해보험": ["롯데손해보험", "롯데손보", "롯데", "lotte"],
+    "MG손해보험": ["mg손해보험", "mg손보", "mg"],
+    "메리츠화재": ["메리츠화재", "메리츠", "meritz"],
+    "NH농협손해보험": nh_keywords,
+}
@@ -0,0 +1,164 @@
+"""
+외부 API 없이 벤치마크를 돌리기 위한 OpenAI 클라이언트/임베딩/LangChain 채팅 모델 대체 구현
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from numpy.typing import NDArray
+
+Messages = list[dict[str, str]]
+
+FAKE_SQL = """SELECT
+    ic.company_name AS 보험사명,
+    ip.product_name AS 상품명,
+    ROUND(SUM(c.premium_amount)) AS 보험료합계
+FROM comparison c
+JOIN insu_company ic ON c.company_id = ic.company_id
+JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+WHERE c.insu_age = 25 AND c.sex = 1 AND c.product_type = 'nr' AND c.expiry_year = '20y_100'
+GROUP BY ic.company_name, ip.product_name
+ORDER BY ic.company_name, ip.product_name"""
+
+
+def default_responder(messages: Messages) -> str:
+    system = messages[0]["content"] if messages else ""
+    if "SQL" in system:
+        return FAKE_SQL
+    if "JSON" in system:
+        return '{"보험사": []}'
+    return "보험약관 질문"
+
+
+def make_response(content: str, prompt: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=len(prompt) // 2, completion_tokens=len(content) // 2),
+    )
+
+
+class _Completions:
+    def __init__(self, latency: float, responder: Callable[[Messages], str]):
+        self.latency = latency
+        self.responder = responder
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, messages: Messages) -> SimpleNamespace:
+        with self._lock:
+            self.calls += 1
+        return make_response(self.responder(messages), "".join(message["content"] for message in messages))
+
+
+class FakeCompletions(_Completions):
+    def create(self, messages: Messages, **kwargs: object) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+
+class FakeAsyncCompletions(_Completions):
+    async def create(self, messages: Messages, **kwargs: object) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class FakeOpenAI:
+    """
+    chat.completions.create만 흉내내는 동기 클라이언트. latency초 동안 블로킹
+    """
+
+    def __init__(self, latency: float = 0.1, responder: Optional[Callable[[Messages], str]] = None):
+        self.completions = FakeCompletions(latency, responder or default_responder)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+
+class FakeAsyncOpenAI:
+    def __init__(self, latency: float = 0.1, responder: Optional[Callable[[Messages], str]] = None):
+        self.completions = FakeAsyncCompletions(latency, responder or default_responder)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+
+class FakeEmbedding:
+    """
+    UpstageEmbedding 대신 텍스트 해시로 만든 정규화 벡터를 반환. 캐시 없이 매 호출 latency초 블로킹
+    """
+
+    def __init__(self, dim: int = 256, latency: float = 0.05):
+        self.dim = dim
+        self.latency = latency
+
+    def vector(self, text: str) -> NDArray[np.float32]:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def get_upstage_embedding(self, text: str) -> NDArray[np.float32]:
+        time.sleep(self.latency)
+        return self.vector(text).reshape(1, -1)
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> NDArray[np.float32]:
+        time.sleep(self.latency)
+        return np.stack([self.vector(text) for text in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+    embed_queries = embed_many
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    PolicyResponse.policy_model 대체. latency초 뒤 answer를 반환하고, 스트리밍은 첫 토큰까지 latency초 후
+    token_interval초 간격으로 chunk_size 글자씩 보냄. usage_metadata를 채워 토큰 집계도 실제와 같이 동작
+    """
+
+    latency: float = 0.3
+    token_interval: float = 0.01
+    chunk_size: int = 4
+    answer: str = "해당 약관에 따르면 진단 확정 시 보험금이 지급됩니다. " * 8
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def usage(self, messages: list[BaseMessage]) -> dict[str, int]:
+        input_tokens = sum(len(str(message.content)) for message in messages) // 2
+        output_tokens = len(self.answer) // 2
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def message(self, messages: list[BaseMessage]) -> AIMessage:
+        return AIMessage(
+            content=self.answer, usage_metadata=self.usage(messages), response_metadata={"model_name": self._llm_type}
+        )
+
+    def _generate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.message(messages))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.message(messages))])
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        size = self.chunk_size
+        for piece in (self.answer[start:][:size] for start in range(0, len(self.answer), size)):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            await asyncio.sleep(self.token_interval)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self.usage(messages), response_metadata={"model_name": self._llm_type}
+            )
+        )
@@ -4,7 +4,7 @@ from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from options.enums import ServiceEnv
+from options.enums import CollectionLoadMode, DiversifyMode, IndexVariant, ServiceEnv
 
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
 
@@ -21,8 +21,57 @@ class Settings(BaseSettings):
     db_user: str = "root"
     db_password: str
     db_database: str = "insu"
+    db_pool_size: int = 5
+    db_pool_timeout: float = 5.0
+    db_pool_health_check_interval: float = 30.0
 
     vector_path: str = "insu_data"
+    preload_collections: bool = False
+    collection_load_mode: CollectionLoadMode = CollectionLoadMode.MEMORY
+    index_variant: IndexVariant = IndexVariant.FLAT
+    index_variant_overrides: dict[str, IndexVariant] = {}
+    ivf_nprobe: int = 16
+    hnsw_ef_search: int = 64
+    hybrid_search: bool = False
+    hybrid_candidates: int = 20
+    rrf_k: int = 60
+    use_unified_index: bool = False
+    unified_index_path: str = "insu_unified"
+    faiss_search_workers: int = 1
+    faiss_omp_threads: Optional[int] = None
+    keyword_mapping_path: str = "cache/insu_keywords.json"
+    local_intent_enabled: bool = True
+    sql_templates_enabled: bool = True
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 1024
+    query_cache_ttl: Optional[float] = 600.0
+    premium_cube_enabled: bool = False
+    premium_cube_refresh_interval: Optional[float] = 60.0
+    context_token_budget: int = 3000
+    context_min_per_company: int = 1
+    context_min_score: Optional[float] = 0.2
+    context_token_encoding: str = "o200k_base"
+    diversify_mode: Optional[DiversifyMode] = None
+    diversify_threshold: float = 0.95
+    diversify_mmr_lambda: float = 0.7
+    diversify_mmr_fetch_k: int = 10
+    tracing_enabled: bool = False
+    tracing_jsonl_path: Optional[str] = None
+    tracing_metrics_port: Optional[int] = None
+    intent_confidence_threshold: float = 0.7
+    embedding_batch_size: int = 100
+    embedding_cache_max_entries: int = 4096
+    embedding_cache_max_mb: int = 128
+    embedding_cache_ttl: Optional[float] = None
+    embedding_cache_path: Optional[str] = None
+    answer_cache_enabled: bool = False
+    answer_cache_threshold: float = 0.95
+    answer_cache_max_entries: int = 1024
+    answer_cache_ttl: Optional[float] = 3600.0
+    answer_cache_path: Optional[str] = None
+    session_max_entries: int = 10000
+    session_idle_ttl: Optional[float] = 3600.0
+
     openai_api_key: str
     upstage_api_key: str
 
@@ -0,0 +1,117 @@
+from decimal import Decimal
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from options.enums import ProductType, Sex, sex_mapping_table
+
+Number = Union[int, float]
+ResultRow = Mapping[str, Any]
+
+PRODUCT_TYPE_LABELS = {ProductType.NON_REFUND: "무해지형", ProductType.REFUND: "해지환급형"}
+TOTAL_DIVISION = "합계"
+
+
+class UnsupportedResultError(ValueError):
+    pass
+
+
+def to_number(value: Any) -> Optional[Number]:
+    """
+    DB/JSON 보험료 값(Decimal, 문자열, 실수)을 정수로 떨어지면 int, 아니면 float로 변환
+    """
+    if value is None:
+        return None
+    number = Decimal(str(value))
+    return int(number) if number == number.to_integral_value() else float(number)
+
+
+def build_settings(user_settings: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    UserState.__dict__(insu_sex, expiry, duration) 또는 프롬프트 예시 형식(sex, expiry_year) 설정값 변환
+    """
+    sex = user_settings.get("insu_sex", user_settings.get("sex"))
+    product_type = user_settings.get("product_type")
+    expiry_year = user_settings.get("expiry_year")
+    if expiry_year is None and "expiry" in user_settings:
+        expiry_year = f"{user_settings['expiry']}y_{user_settings['duration']}"
+    return {
+        "이름": user_settings.get("custom_name"),
+        "나이": user_settings.get("insu_age"),
+        "성별": sex_mapping_table[Sex(int(sex))] if sex is not None else None,
+        "상품유형": PRODUCT_TYPE_LABELS[ProductType(product_type)] if product_type is not None else None,
+        "보험기간": expiry_year,
+        "보험사ID": user_settings.get("company_id"),
+    }
+
+
+def is_total_row(row: ResultRow) -> bool:
+    if "구분" in row:
+        return row["구분"] == TOTAL_DIVISION
+    return row.get("상품명") is None and row.get("보장항목명") is None
+
+
+def build_coverage_companies(rows: Sequence[ResultRow]) -> list[dict[str, Any]]:
+    """
+    보험사 x 상품 x 보장항목 -> 보험료 행을 보험사별로 묶음 (예시 1 형식)
+    - 합계 행(구분='합계' 또는 상품명/보장항목명이 없는 행)이 없으면 보장항목 보험료 합을 보험료합계로 사용
+    """
+    companies: dict[str, dict[str, Any]] = {}
+    products: dict[tuple[str, str], dict[str, Any]] = {}
+    totals: dict[str, Optional[Number]] = {}
+    for row in rows:
+        company_name = row["보험사명"]
+        company = companies.setdefault(company_name, {"이름": company_name, "보험료합계": None, "상품": []})
+        if is_total_row(row):
+            totals[company_name] = to_number(row["보험료"])
+            continue
+        product_key = (company_name, row.get("상품명"))
+        product = products.get(product_key)
+        if product is None:
+            product = products[product_key] = {"상품명": row.get("상품명"), "보장항목": {}}
+            company["상품"].append(product)
+        product["보장항목"][row["보장항목명"]] = to_number(row["보험료"])
+
+    for company_name, company in companies.items():
+        if company_name in totals:
+            company["보험료합계"] = totals[company_name]
+        else:
+            premiums = [
+                premium
+                for product in company["상품"]
+                for premium in product["보장항목"].values()
+                if premium is not None
+            ]
+            company["보험료합계"] = to_number(sum(premiums)) if premiums else None
+    return list(companies.values())
+
+
+def build_total_companies(rows: Sequence[ResultRow]) -> list[dict[str, Any]]:
+    """
+    보험사(+상품)별 보험료합계 행 (예시 2 형식)
+    """
+    companies = []
+    for row in rows:
+        company: dict[str, Any] = {"이름": row["보험사명"]}
+        if "상품명" in row:
+            company["상품명"] = row["상품명"]
+        company["보험료합계"] = to_number(row["보험료합계"])
+        companies.append(company)
+    return companies
+
+
+def build_chart_data(result_data: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    QueryExecutor.build_result_data 결과를 example_prompt.jinja2의 차트 JSON 형식으로 변환
+    - 보장항목명 컬럼이 있으면 예시 1(보험사 > 상품 > 보장항목), 보험료합계 컬럼만 있으면 예시 2 형식
+    - 두 형식에 맞지 않는 결과(LLM이 만든 임의 컬럼 SQL)는 UnsupportedResultError
+    """
+    rows = result_data["결과"]
+    columns = set().union(*(row.keys() for row in rows)) if rows else set()
+    if "보험사명" not in columns:
+        raise UnsupportedResultError(f"차트 JSON으로 변환할 수 없는 결과 컬럼: {sorted(columns)}")
+    if "보장항목명" in columns and "보험료" in columns:
+        companies = build_coverage_companies(rows)
+    elif "보험료합계" in columns:
+        companies = build_total_companies(rows)
+    else:
+        raise UnsupportedResultError(f"차트 JSON으로 변환할 수 없는 결과 컬럼: {sorted(columns)}")
+    return {"설정값": build_settings(result_data["설정값"]), "보험사": companies}
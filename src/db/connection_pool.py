@@ -0,0 +1,156 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+Connection = Any
+
+
+class PoolTimeoutError(TimeoutError):
+    pass
+
+
+def is_connected(conn: Connection) -> bool:
+    return bool(conn.is_connected())
+
+
+class ConnectionPool:
+    """
+    DB 연결을 재사용하는 스레드 안전한 커넥션 풀
+    - 최대 size개까지만 연결을 만들고, 모두 사용 중이면 timeout초 동안 반납을 기다림
+    - 유휴 연결은 health_check_interval초가 지났으면 꺼낼 때 상태를 확인하고 끊어졌으면 새로 연결
+    - 반납 시 열린 트랜잭션이 남아 있으면 롤백 (autocommit이 아닌 연결이 오래된 스냅샷을 계속 보지 않게)
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], Connection],
+        size: int = 5,
+        timeout: float = 5.0,
+        health_check: Callable[[Connection], bool] = is_connected,
+        health_check_interval: float = 30.0,
+    ):
+        if size < 1:
+            raise ValueError("커넥션 풀 크기는 1 이상이어야 합니다.")
+        self.connection_factory = connection_factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check = health_check
+        self.health_check_interval = health_check_interval
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue[tuple[Connection, float]] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._metrics = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "failed_health_checks": 0,
+            "in_use": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self._metrics[key] += value
+
+    def _is_healthy(self, conn: Connection) -> bool:
+        try:
+            return self.health_check(conn)
+        except Exception:
+            return False
+
+    def _discard(self, conn: Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            logger.warning("DB 연결 종료 중 오류가 발생했습니다.", exc_info=True)
+        self._count("closed")
+
+    def _create(self) -> Connection:
+        conn = self.connection_factory()
+        self._count("created")
+        return conn
+
+    def acquire(self, timeout: Optional[float] = None) -> Connection:
+        if self._closed:
+            raise RuntimeError("이미 닫힌 커넥션 풀입니다.")
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout if timeout is None else timeout):
+            self._count("timeouts")
+            raise PoolTimeoutError(f"{self.size}개 DB 연결이 모두 사용 중입니다.")
+        self._count("wait_seconds", time.perf_counter() - start)
+
+        try:
+            try:
+                conn, last_checked = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._create()
+            else:
+                if time.monotonic() - last_checked >= self.health_check_interval and not self._is_healthy(conn):
+                    self._count("failed_health_checks")
+                    self._discard(conn)
+                    conn = self._create()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["in_use"] += 1
+        return conn
+
+    def _end_transaction(self, conn: Connection) -> bool:
+        # 끝나지 않은 트랜잭션(읽기 스냅샷 포함)을 롤백해 다음 사용자가 최신 데이터를 보게 함. 실패하면 False
+        if not getattr(conn, "in_transaction", False):
+            return True
+        try:
+            conn.rollback()
+        except Exception:
+            logger.warning("반납된 DB 연결의 트랜잭션을 롤백하지 못했습니다.", exc_info=True)
+            return False
+        return True
+
+    def release(self, conn: Connection, discard: bool = False) -> None:
+        with self._lock:
+            self._metrics["in_use"] -= 1
+        if not discard and not self._closed:
+            discard = not self._end_transaction(conn)
+        if discard or self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception:
+            # 쿼리 오류로 연결이 끊어졌다면 풀에 돌려놓지 않음
+            self.release(conn, discard=not self._is_healthy(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["idle"] = self._idle.qsize()
+        metrics["size"] = self.size
+        return metrics
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
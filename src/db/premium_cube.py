@@ -0,0 +1,342 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from config.settings import settings
+from db.query_cache import QueryCache, query_cache
+from db.sql_templates import ComparisonQuery
+from db.sql_utils import DatabaseClient
+from modules.user_state import UserState
+from options.enums import ComparisonKind
+
+logger = logging.getLogger(__name__)
+
+ProfileKey = tuple[int, int, str, str]  # (보험나이, 성별, 상품유형, 보험기간)
+
+# 템플릿 SQL과 같은 INNER JOIN으로 읽어 회사/상품/보장항목 정보가 없는 행은 제외
+CUBE_SQL = """SELECT
+    c.insu_age, c.sex, c.product_type, c.expiry_year,
+    ic.company_name, ip.product_name, cv.coverage_id, cv.coverage_name, cv.is_default,
+    c.premium_amount
+FROM comparison c
+JOIN insu_company ic ON c.company_id = ic.company_id
+JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+JOIN coverage cv ON c.coverage_id = cv.coverage_id"""
+
+FINGERPRINT_SQL = """SELECT
+    (SELECT COUNT(*) FROM comparison) AS comparison_rows,
+    (SELECT COALESCE(SUM(premium_amount), 0) FROM comparison) AS premium_sum,
+    (SELECT COUNT(*) FROM coverage) AS coverage_rows,
+    (SELECT COUNT(*) FROM insu_company) AS company_rows,
+    (SELECT COUNT(*) FROM insu_product) AS product_rows"""
+
+
+def sql_round(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    # MySQL ROUND와 같이 .5는 0에서 먼 쪽으로 반올림 (np.round는 짝수 쪽으로 반올림)
+    return np.sign(values) * np.floor(np.abs(values) + 0.5)
+
+
+def encode(values: Sequence[Any]) -> tuple[list[Any], NDArray[np.int32]]:
+    """
+    값 목록을 정렬된 사전과 사전 번호 배열로 변환 (사전 번호 순서 = SQL ORDER BY 순서)
+    """
+    vocabulary = sorted(set(values))
+    codes = {value: code for code, value in enumerate(vocabulary)}
+    return vocabulary, np.fromiter((codes[value] for value in values), dtype=np.int32, count=len(values))
+
+
+class PremiumCube:
+    """
+    comparison 테이블을 차원 코드 배열로 올려둔 읽기 전용 보험료 큐브
+    - 행은 가입 조건(나이, 성별, 상품유형, 보험기간) 순으로 정렬해 조건별 구간을 슬라이스로 꺼냄
+    - 보험사/상품/보장항목 코드는 이름 순으로 매겨 bincount 결과가 그대로 SQL 템플릿의 정렬 순서가 됨
+    - answer()는 SQL 템플릿과 같은 컬럼/순서의 행을 반환하므로 차트 JSON 변환을 그대로 사용
+    """
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]]):
+        profiles = [
+            (int(row["insu_age"]), int(row["sex"]), str(row["product_type"]), str(row["expiry_year"])) for row in rows
+        ]
+        self.company_names, company_codes = encode([row["company_name"] for row in rows])
+        self.products, product_codes = encode([(row["company_name"], row["product_name"]) for row in rows])
+        self.coverage_ids, coverage_codes = encode([row["coverage_id"] for row in rows])
+        self.coverage_labels, coverage_name_codes = encode([row["coverage_name"] for row in rows])
+
+        coverage_names: dict[str, str] = {}
+        coverage_default: dict[str, bool] = {}
+        for row in rows:
+            coverage_names[row["coverage_id"]] = row["coverage_name"]
+            coverage_default[row["coverage_id"]] = bool(row["is_default"])
+        self.coverage_names = [coverage_names[coverage_id] for coverage_id in self.coverage_ids]
+        self.coverage_is_default = np.array([coverage_default[cid] for cid in self.coverage_ids], dtype=bool)
+        company_code_of = {company_name: code for code, company_name in enumerate(self.company_names)}
+        self.product_company = np.array(
+            [company_code_of[company_name] for company_name, _ in self.products], dtype=np.int32
+        )
+
+        profile_vocabulary, profile_codes = encode(profiles)
+        order = np.argsort(profile_codes, kind="stable")
+        self.profiles = {profile: code for code, profile in enumerate(profile_vocabulary)}
+        self.profile_offsets = np.searchsorted(profile_codes[order], np.arange(len(profile_vocabulary) + 1))
+        self.company_codes = company_codes[order]
+        self.product_codes = product_codes[order]
+        self.coverage_codes = coverage_codes[order]
+        self.coverage_name_codes = coverage_name_codes[order]
+        self.premiums = np.array([row["premium_amount"] for row in rows], dtype=np.float64)[order]
+
+    @classmethod
+    def load(cls, db_client: DatabaseClient) -> "PremiumCube":
+        return cls(db_client.execute_query(CUBE_SQL))
+
+    def __len__(self) -> int:
+        return len(self.premiums)
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.company_codes.nbytes
+            + self.product_codes.nbytes
+            + self.coverage_codes.nbytes
+            + self.coverage_name_codes.nbytes
+            + self.premiums.nbytes
+        )
+
+    @staticmethod
+    def profile_key(user_state: UserState) -> Optional[ProfileKey]:
+        if user_state.insu_age is None or user_state.insu_sex is None or user_state.product_type is None:
+            return None
+        return (user_state.insu_age, int(user_state.insu_sex), str(user_state.product_type), user_state.expiry_year)
+
+    def profile_slice(self, user_state: UserState) -> slice:
+        key = self.profile_key(user_state)
+        code = self.profiles.get(key) if key is not None else None
+        if code is None:
+            return slice(0, 0)
+        return slice(int(self.profile_offsets[code]), int(self.profile_offsets[code + 1]))
+
+    @staticmethod
+    def name_mask(names: Sequence[str], keywords: Sequence[str]) -> NDArray[np.bool_]:
+        # LIKE '%키워드%'와 같은 부분 문자열 조건 (사전 크기만큼만 비교)
+        lowered = [keyword.lower() for keyword in keywords]
+        return np.array([any(keyword in name.lower() for keyword in lowered) for name in names], dtype=bool)
+
+    def select(self, comparison_query: ComparisonQuery, user_state: UserState) -> NDArray[np.int64]:
+        """
+        가입 조건 구간 안에서 보험사/기본보장/보장항목 조건을 만족하는 행 번호
+        """
+        profile = self.profile_slice(user_state)
+        rows = np.arange(profile.start, profile.stop)
+        mask = np.ones(len(rows), dtype=bool)
+        if comparison_query.companies:
+            mask &= self.name_mask(self.company_names, comparison_query.companies)[self.company_codes[rows]]
+        if comparison_query.default_plan:
+            mask &= self.coverage_is_default[self.coverage_codes[rows]]
+        if comparison_query.kind == ComparisonKind.COVERAGE_PREMIUM:
+            mask &= self.name_mask(self.coverage_names, comparison_query.coverages)[self.coverage_codes[rows]]
+        return rows[mask]
+
+    def premium_totals(self, rows: NDArray[np.int64], comparison_query: ComparisonQuery) -> list[dict[str, Any]]:
+        num_products = len(self.products)
+        counts = np.bincount(self.product_codes[rows], minlength=num_products)
+        totals = sql_round(np.bincount(self.product_codes[rows], weights=self.premiums[rows], minlength=num_products))
+        products = np.flatnonzero(counts)
+        if comparison_query.order is not None:
+            sign = -1.0 if comparison_query.order == "DESC" else 1.0
+            # 상품 코드가 (보험사명, 상품명) 순이므로 보조 정렬 키로 그대로 사용
+            products = products[np.lexsort((products, sign * totals[products]))]
+            if comparison_query.limit is not None:
+                products = products[: comparison_query.limit]
+        return [
+            {"보험사명": self.products[code][0], "상품명": self.products[code][1], "보험료합계": float(totals[code])}
+            for code in products.tolist()
+        ]
+
+    def plan_detail(self, rows: NDArray[np.int64]) -> list[dict[str, Any]]:
+        company_totals = sql_round(
+            np.bincount(self.company_codes[rows], weights=self.premiums[rows], minlength=len(self.company_names))
+        )
+        # SELECT DISTINCT (상품, 보장항목, 보험료) + 보험사명, 구분 DESC(합계 먼저), 상품명, sort_id 순 정렬
+        product_codes, coverage_codes, premiums = (
+            self.product_codes[rows],
+            self.coverage_codes[rows],
+            self.premiums[rows],
+        )
+        order = np.lexsort((premiums, coverage_codes, product_codes))
+        product_codes, coverage_codes, premiums = product_codes[order], coverage_codes[order], premiums[order]
+        distinct = np.ones(len(order), dtype=bool)
+        distinct[1:] = (np.diff(product_codes) != 0) | (np.diff(coverage_codes) != 0) | (np.diff(premiums) != 0)
+        result: list[dict[str, Any]] = []
+        current_company = -1
+        for product_code, coverage_code, premium in zip(
+            product_codes[distinct].tolist(), coverage_codes[distinct].tolist(), premiums[distinct].tolist()
+        ):
+            company_code = int(self.product_company[product_code])
+            if company_code != current_company:
+                current_company = company_code
+                result.append(
+                    {
+                        "구분": "합계",
+                        "보험사명": self.company_names[company_code],
+                        "상품명": None,
+                        "보장항목명": None,
+                        "보험료": float(company_totals[company_code]),
+                        "sort_id": "0",
+                    }
+                )
+            result.append(
+                {
+                    "구분": "상세",
+                    "보험사명": self.company_names[company_code],
+                    "상품명": self.products[product_code][1],
+                    "보장항목명": self.coverage_names[coverage_code],
+                    "보험료": int(premium),
+                    "sort_id": self.coverage_ids[coverage_code],
+                }
+            )
+        return result
+
+    def coverage_premiums(self, rows: NDArray[np.int64]) -> list[dict[str, Any]]:
+        # (보험사, 상품, 보장항목명)별 평균 보험료
+        num_labels = len(self.coverage_labels)
+        keys = self.product_codes[rows].astype(np.int64) * num_labels + self.coverage_name_codes[rows]
+        size = len(self.products) * num_labels
+        counts = np.bincount(keys, minlength=size)
+        sums = np.bincount(keys, weights=self.premiums[rows], minlength=size)
+        groups = np.flatnonzero(counts)
+        averages = sql_round(sums[groups] / counts[groups])
+        return [
+            {
+                "보험사명": self.products[key // num_labels][0],
+                "상품명": self.products[key // num_labels][1],
+                "보장항목명": self.coverage_labels[key % num_labels],
+                "보험료": float(average),
+            }
+            for key, average in zip(groups.tolist(), averages.tolist())
+        ]
+
+    def answer(self, comparison_query: ComparisonQuery, user_state: UserState) -> list[dict[str, Any]]:
+        """
+        SQL 템플릿(SQLTemplateMatcher.to_sql)을 실행한 것과 같은 결과 행
+        """
+        rows = self.select(comparison_query, user_state)
+        if comparison_query.kind == ComparisonKind.COVERAGE_PREMIUM:
+            return self.coverage_premiums(rows)
+        if comparison_query.kind == ComparisonKind.PLAN_DETAIL:
+            return self.plan_detail(rows)
+        return self.premium_totals(rows, comparison_query)
+
+
+class PremiumCubeStore:
+    """
+    보험료 큐브를 프로세스당 한 번 읽고, refresh_interval초마다 테이블 fingerprint(행 수, 보험료 합)를 확인해
+    바뀌었으면 다시 읽음
+    - 테이블이 바뀌었거나 invalidate()되면 query_cache의 조회 결과 캐시도 비워 LLM SQL 경로도 새 보험료를 사용
+    - DB 조회는 한 요청만 락 밖에서 하고, 그동안 다른 비교 요청은 현재 큐브로 바로 응답
+    """
+
+    def __init__(
+        self,
+        db_client_factory: Callable[[], DatabaseClient],
+        refresh_interval: Optional[float] = 60.0,
+        query_cache: Optional[QueryCache] = None,
+    ):
+        self.db_client_factory = db_client_factory
+        self.refresh_interval = refresh_interval
+        self.query_cache = query_cache
+        self._db_client: Optional[DatabaseClient] = None
+        self._cube: Optional[PremiumCube] = None
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "PremiumCubeStore":
+        return cls(DatabaseClient, refresh_interval=settings.premium_cube_refresh_interval, query_cache=query_cache)
+
+    @property
+    def db_client(self) -> DatabaseClient:
+        if self._db_client is None:
+            self._db_client = self.db_client_factory()
+        return self._db_client
+
+    def fingerprint(self) -> tuple:
+        return tuple(self.db_client.execute_query(FINGERPRINT_SQL)[0].values())
+
+    def _invalidate_query_results(self) -> None:
+        if self.query_cache is not None:
+            self.query_cache.invalidate_results()
+
+    def get(self) -> PremiumCube:
+        with self._lock:
+            cube = self._cube
+            now = time.monotonic()
+            if cube is not None and (self.refresh_interval is None or now - self._checked_at < self.refresh_interval):
+                return cube
+            self._checked_at = now
+        if cube is None:
+            # 아직 읽은 큐브가 없으면 먼저 읽는 요청을 기다림
+            with self._refresh_lock:
+                return self._cube if self._cube is not None else self._refresh()
+        if not self._refresh_lock.acquire(blocking=False):
+            # 다른 요청이 fingerprint를 확인하는 동안에는 현재 큐브로 응답
+            return cube
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self) -> PremiumCube:
+        """
+        fingerprint 조회와 큐브 로드는 락 밖에서 하고, 교체할 때만 락을 잡음 (_refresh_lock을 잡은 요청만 호출)
+        """
+        with self._lock:
+            cube, previous, generation = self._cube, self._fingerprint, self._generation
+        fingerprint = self.fingerprint()
+        if cube is not None and fingerprint == previous:
+            return cube
+
+        start = time.perf_counter()
+        cube = PremiumCube.load(self.db_client)
+        with self._lock:
+            # 읽는 사이 invalidate()되었으면 이번 결과는 저장하지 않고 다음 get()에서 다시 읽음
+            if generation == self._generation:
+                if previous is not None:
+                    # 이전에 읽은 테이블과 달라졌으므로 캐시된 조회 결과도 더 이상 맞지 않음
+                    self._invalidate_query_results()
+                self._cube, self._fingerprint = cube, fingerprint
+        logger.info(
+            f"보험료 큐브 로드: {len(cube)}행, 가입조건 {len(cube.profiles)}개, "
+            f"{cube.nbytes / 1024 / 1024:.1f}MB, {time.perf_counter() - start:.2f}s"
+        )
+        return cube
+
+    def invalidate(self) -> None:
+        """
+        보험료 테이블을 다시 적재한 뒤 호출하면 다음 get()에서 바로 다시 읽음
+        """
+        with self._lock:
+            self._cube = None
+            self._fingerprint = None
+            self._generation += 1
+            self._invalidate_query_results()
+
+
+premium_cube_store: Optional[PremiumCubeStore] = (
+    PremiumCubeStore.from_settings() if settings.premium_cube_enabled else None
+)
+
+
+def invalidate_premium_data() -> None:
+    """
+    보험료 테이블을 다시 적재한 뒤 호출: 보험료 큐브와 비교설계 조회 결과 캐시를 비움
+    """
+    if premium_cube_store is not None:
+        premium_cube_store.invalidate()
+    elif query_cache is not None:
+        query_cache.invalidate_results()
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+from typing import Any, Optional
+
+from config.settings import settings
+from db.sql_templates import SQLQuery
+from modules.user_state import UserState
+from util.lru_cache import LRUCache
+
+SQLCacheKey = tuple[str, Optional[int], Optional[int], Optional[str], str]
+ResultCacheKey = tuple[str, tuple[Any, ...]]
+
+_IGNORED_CHARACTERS = re.compile(r"[\s?!.~]+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    공백/대소문자/문장부호 차이로 같은 질문이 다른 키가 되지 않도록 정규화
+    """
+    return _IGNORED_CHARACTERS.sub("", unicodedata.normalize("NFC", question).lower())
+
+
+class QueryCache:
+    """
+    비교설계 2단 캐시
+    - SQL: (정규화된 질문, 나이, 성별, 상품유형, 보험기간) -> 생성된 SQL
+    - 결과: (SQL, 파라미터) -> comparison 조회 결과 행
+    - 보험료 테이블을 다시 적재하면 invalidate_results()로 결과 캐시만 비움
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.sql_cache: LRUCache[SQLCacheKey, SQLQuery] = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.result_cache: LRUCache[ResultCacheKey, list[dict]] = LRUCache(max_entries=max_entries, ttl=ttl)
+
+    @classmethod
+    def from_settings(cls) -> "QueryCache":
+        return cls(max_entries=settings.query_cache_max_entries, ttl=settings.query_cache_ttl)
+
+    @staticmethod
+    def sql_key(question: str, user_state: UserState) -> SQLCacheKey:
+        return (
+            normalize_question(question),
+            user_state.insu_age,
+            int(user_state.insu_sex) if user_state.insu_sex is not None else None,
+            str(user_state.product_type) if user_state.product_type is not None else None,
+            user_state.expiry_year,
+        )
+
+    def get_sql(self, question: str, user_state: UserState) -> Optional[SQLQuery]:
+        return self.sql_cache.get(self.sql_key(question, user_state))
+
+    def put_sql(self, question: str, user_state: UserState, sql_query: SQLQuery) -> None:
+        self.sql_cache.put(self.sql_key(question, user_state), sql_query)
+
+    def get_results(self, sql_query: SQLQuery) -> Optional[list[dict]]:
+        rows = self.result_cache.get((sql_query.sql, tuple(sql_query.params)))
+        # 호출 측에서 행을 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return None if rows is None else [dict(row) for row in rows]
+
+    def put_results(self, sql_query: SQLQuery, rows: list[dict]) -> None:
+        self.result_cache.put((sql_query.sql, tuple(sql_query.params)), [dict(row) for row in rows])
+
+    def invalidate_results(self) -> None:
+        self.result_cache.clear()
+
+    def clear(self) -> None:
+        self.sql_cache.clear()
+        self.result_cache.clear()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {"sql": self.sql_cache.stats(), "results": self.result_cache.stats()}
+
+
+query_cache: Optional[QueryCache] = QueryCache.from_settings() if settings.query_cache_enabled else None
@@ -0,0 +1,229 @@
+import re
+from typing import Any, NamedTuple, Optional
+
+from modules.user_state import UserState
+from options.enums import ComparisonKind
+
+
+class SQLQuery(NamedTuple):
+    sql: str
+    params: tuple[Any, ...] = ()
+
+
+# 질문에 나온 보험사 표현 -> insu_company.company_name LIKE 조건
+COMPANY_ALIASES: dict[str, list[str]] = {
+    "DB": ["db", "디비"],
+    "삼성": ["삼성"],
+    "하나": ["하나손해", "하나손보", "하나보험"],
+    "한화": ["한화"],
+    "흥국": ["흥국"],
+    "현대": ["현대"],
+    "KB": ["kb", "케이비"],
+    "롯데": ["롯데"],
+    "MG": ["mg", "엠지"],
+    "메리츠": ["메리츠"],
+    "농협": ["nh", "농협"],
+}
+
+# 보장항목명 LIKE 조건으로 쓸 수 있는 보장 표현
+COVERAGE_KEYWORDS = [
+    "유사암",
+    "일반암",
+    "진단비",
+    "뇌출혈",
+    "뇌졸중",
+    "뇌혈관",
+    "급성심근경색",
+    "허혈성심장",
+    "수술비",
+    "입원일당",
+    "골절",
+    "상해사망",
+    "질병사망",
+    "후유장해",
+]
+GENERIC_COVERAGE = "진단비"
+
+DEFAULT_PLAN_KEYWORDS = ["기본플랜", "기본보장항목", "기본보장", "기본담보"]
+DETAIL_KEYWORDS = ["보장항목별", "상세"]
+
+# 연령 범위/평균/연령별처럼 템플릿이 다루지 않는 질문은 LLM이 SQL을 생성
+UNSUPPORTED_PATTERN = re.compile(r"\d+\s*세?\s*(?:부터|~|-|에서)\s*\d+\s*세|평균|연령별|나이별")
+RANKING_PATTERN = re.compile(r"(?P<order>가장|제일)?\s*(?P<kind>저렴|비싼|비싸|싼|싸|최저|최고)")
+COUNT_PATTERN = re.compile(r"(\d+)\s*(?:개|곳|군데)")
+
+REQUIRED_CONDITIONS = "c.insu_age = %s AND c.sex = %s AND c.product_type = %s AND c.expiry_year = %s"
+
+PREMIUM_TOTAL_SQL = """SELECT
+    ic.company_name AS 보험사명,
+    ip.product_name AS 상품명,
+    ROUND(SUM(c.premium_amount)) AS 보험료합계
+FROM comparison c
+JOIN insu_company ic ON c.company_id = ic.company_id
+JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+WHERE {conditions}
+GROUP BY ic.company_name, ip.product_name
+ORDER BY {order_by}"""
+
+PLAN_DETAIL_SQL = """WITH company_totals AS (
+    SELECT
+        ic.company_name AS 보험사명,
+        ROUND(SUM(c.premium_amount)) AS 보험료합계
+    FROM comparison c
+    JOIN insu_company ic ON c.company_id = ic.company_id
+    JOIN coverage cv ON c.coverage_id = cv.coverage_id
+    WHERE {conditions}
+    GROUP BY ic.company_name
+),
+detailed_coverage AS (
+    SELECT DISTINCT
+        ic.company_name AS 보험사명,
+        ip.product_name AS 상품명,
+        cv.coverage_name AS 보장항목명,
+        c.premium_amount AS 보험료,
+        cv.coverage_id AS sort_id
+    FROM comparison c
+    JOIN insu_company ic ON c.company_id = ic.company_id
+    JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+    JOIN coverage cv ON c.coverage_id = cv.coverage_id
+    WHERE {conditions}
+)
+SELECT * FROM (
+    SELECT '합계' AS 구분, ct.보험사명, NULL AS 상품명, NULL AS 보장항목명, ct.보험료합계 AS 보험료, '0' AS sort_id
+    FROM company_totals ct
+    UNION ALL
+    SELECT '상세' AS 구분, dc.보험사명, dc.상품명, dc.보장항목명, dc.보험료, dc.sort_id
+    FROM detailed_coverage dc
+) result
+ORDER BY 보험사명, 구분 DESC, 상품명, sort_id"""
+
+COVERAGE_PREMIUM_SQL = """SELECT
+    ic.company_name AS 보험사명,
+    ip.product_name AS 상품명,
+    cv.coverage_name AS 보장항목명,
+    ROUND(AVG(c.premium_amount)) AS 보험료
+FROM comparison c
+JOIN insu_company ic ON c.company_id = ic.company_id
+JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+WHERE {conditions}
+GROUP BY ic.company_name, ip.product_name, cv.coverage_name
+ORDER BY ic.company_name, ip.product_name, cv.coverage_name"""
+
+
+def find_companies(user_input: str) -> list[str]:
+    text = user_input.lower()
+    return [company for company, aliases in COMPANY_ALIASES.items() if any(alias in text for alias in aliases)]
+
+
+def find_coverages(user_input: str) -> list[str]:
+    compact = user_input.replace(" ", "")
+    coverages = [keyword for keyword in COVERAGE_KEYWORDS if keyword in compact]
+    # "골절 진단비"처럼 구체적인 보장이 함께 나오면 포괄적인 "진단비" 조건은 제외
+    if len(coverages) > 1 and GENERIC_COVERAGE in coverages:
+        coverages.remove(GENERIC_COVERAGE)
+    return coverages
+
+
+def like_any(column: str, values: list[str]) -> tuple[str, tuple[str, ...]]:
+    """
+    (column LIKE %s OR ...) 조건과 '%값%' 파라미터
+    """
+    condition = " OR ".join(f"{column} LIKE %s" for _ in values)
+    return f"({condition})", tuple(f"%{value}%" for value in values)
+
+
+class ComparisonQuery(NamedTuple):
+    """
+    템플릿으로 처리할 수 있는 비교설계 질문을 해석한 결과 (SQL 템플릿과 보험료 큐브가 함께 사용)
+    """
+
+    kind: ComparisonKind
+    companies: tuple[str, ...] = ()
+    coverages: tuple[str, ...] = ()
+    default_plan: bool = False
+    order: Optional[str] = None  # 보험료합계 정렬 방향 ("ASC"/"DESC"), None이면 보험사명/상품명 순
+    limit: Optional[int] = None
+
+
+def parse_comparison_question(user_input: str) -> Optional[ComparisonQuery]:
+    """
+    보장항목 보험료 / 가장 저렴한(비싼) N개 / 기본플랜·보장항목별 상세 / 보험사별 보험료 합계 질문 해석
+    - 어느 형식에도 맞지 않으면 None
+    """
+    compact = user_input.replace(" ", "")
+    if UNSUPPORTED_PATTERN.search(user_input):
+        return None
+
+    companies = tuple(find_companies(user_input))
+    is_default_plan = any(keyword in compact for keyword in DEFAULT_PLAN_KEYWORDS)
+
+    coverages = tuple(find_coverages(user_input))
+    if coverages and not is_default_plan:
+        return ComparisonQuery(ComparisonKind.COVERAGE_PREMIUM, companies, coverages)
+
+    ranking = RANKING_PATTERN.search(user_input)
+    if ranking:
+        count_match = COUNT_PATTERN.search(user_input)
+        count = int(count_match.group(1)) if count_match else 1 if ranking.group("order") else 3
+        direction = "DESC" if ranking.group("kind") in ("비싼", "비싸", "최고") else "ASC"
+        return ComparisonQuery(
+            ComparisonKind.PREMIUM_TOTAL, companies, default_plan=is_default_plan, order=direction, limit=count
+        )
+
+    if is_default_plan or any(keyword in compact for keyword in DETAIL_KEYWORDS):
+        return ComparisonQuery(ComparisonKind.PLAN_DETAIL, companies, default_plan=is_default_plan)
+
+    if "보험료" in compact:
+        return ComparisonQuery(ComparisonKind.PREMIUM_TOTAL, companies, default_plan=is_default_plan)
+
+    return None
+
+
+class SQLTemplateMatcher:
+    """
+    자주 묻는 비교설계 질문을 LLM 없이 파라미터 바인딩 SQL로 변환
+    - 보장항목 보험료 / 가장 저렴한(비싼) N개 / 기본플랜·보장항목별 상세 / 보험사별 보험료 합계
+    - 어느 템플릿에도 맞지 않으면 None을 반환해 LLM SQL 생성으로 넘김
+    """
+
+    def match(self, user_input: str, user_state: UserState) -> Optional[SQLQuery]:
+        comparison_query = parse_comparison_question(user_input)
+        if comparison_query is None:
+            return None
+        return self.to_sql(comparison_query, user_state)
+
+    def to_sql(self, comparison_query: ComparisonQuery, user_state: UserState) -> SQLQuery:
+        conditions = [REQUIRED_CONDITIONS]
+        params: list[Any] = [
+            user_state.insu_age,
+            int(user_state.insu_sex) if user_state.insu_sex is not None else None,
+            str(user_state.product_type) if user_state.product_type is not None else None,
+            user_state.expiry_year,
+        ]
+        if comparison_query.companies:
+            condition, company_params = like_any("ic.company_name", list(comparison_query.companies))
+            conditions.append(condition)
+            params.extend(company_params)
+        if comparison_query.default_plan:
+            conditions.append("cv.is_default = 1")
+
+        if comparison_query.kind == ComparisonKind.COVERAGE_PREMIUM:
+            condition, coverage_params = like_any("cv.coverage_name", list(comparison_query.coverages))
+            sql = COVERAGE_PREMIUM_SQL.format(conditions=" AND ".join([*conditions, condition]))
+            return SQLQuery(sql, (*params, *coverage_params))
+
+        if comparison_query.kind == ComparisonKind.PLAN_DETAIL:
+            # WITH 구문의 두 CTE에 같은 조건이 들어가므로 파라미터도 두 번 전달
+            where = " AND ".join(conditions)
+            return SQLQuery(PLAN_DETAIL_SQL.format(conditions=where), (*params, *params))
+
+        if comparison_query.order is not None:
+            sql = PREMIUM_TOTAL_SQL.format(
+                conditions=" AND ".join(conditions),
+                order_by=f"보험료합계 {comparison_query.order}, 보험사명, 상품명\nLIMIT %s",
+            )
+            return SQLQuery(sql, (*params, comparison_query.limit))
+        sql = PREMIUM_TOTAL_SQL.format(conditions=" AND ".join(conditions), order_by="보험사명, 상품명")
+        return SQLQuery(sql, tuple(params))
@@ -1,11 +1,20 @@
+import asyncio
+import threading
+from typing import Any, Optional, Sequence
+
 import mysql.connector
 import simplejson as json
 from jinja2 import Environment, FileSystemLoader
 
 from config.settings import Settings, settings
+from db.chart_json import UnsupportedResultError, build_chart_data
+from db.connection_pool import Connection, ConnectionPool
+from db.query_cache import QueryCache
 from db.schema import DB_SCHEMA
+from db.sql_templates import SQLQuery, SQLTemplateMatcher
 from modules.user_state import UserState
-from options.enums import Sex
+from options.enums import Sex, TraceStage
+from util.tracing import tracer
 
 
 class TemplateManager:
@@ -21,24 +30,62 @@ class TemplateManager:
         return template.render(**kwargs)
 
 
+def connect_mysql(settings: Settings = settings) -> Connection:
+    return mysql.connector.connect(
+        host=settings.db_host,
+        port=settings.db_port,
+        user=settings.db_user,
+        password=settings.db_password,
+        database=settings.db_database,
+        # 풀에서 재사용하는 연결이 첫 SELECT의 REPEATABLE READ 스냅샷에 머물지 않도록 문장마다 커밋
+        autocommit=True,
+    )
+
+
+_pool_lock = threading.Lock()
+_connection_pool: Optional[ConnectionPool] = None
+
+
+def get_connection_pool(settings: Settings = settings) -> ConnectionPool:
+    """
+    프로세스 전역 MySQL 커넥션 풀 (처음 사용할 때 생성)
+    """
+    global _connection_pool
+    with _pool_lock:
+        if _connection_pool is None:
+            _connection_pool = ConnectionPool(
+                lambda: connect_mysql(settings),
+                size=settings.db_pool_size,
+                timeout=settings.db_pool_timeout,
+                health_check_interval=settings.db_pool_health_check_interval,
+            )
+        return _connection_pool
+
+
+def set_connection_pool(pool: Optional[ConnectionPool]) -> None:
+    """
+    전역 커넥션 풀 교체 (테스트/벤치마크에서 SQLite 풀을 주입할 때 사용)
+    """
+    global _connection_pool
+    with _pool_lock:
+        _connection_pool = pool
+
+
 class DatabaseClient:
-    def __init__(self, settings: Settings = settings):
-        self.conn = mysql.connector.connect(
-            host=settings.db_host,
-            port=settings.db_port,
-            user=settings.db_user,
-            password=settings.db_password,
-            database=settings.db_database,
-        )
+    """
+    커넥션 풀에서 연결을 빌려 쿼리를 실행하고 바로 반납하는 DB 클라이언트
+    """
 
-    def execute_query(self, query: str) -> list:
-        with self.conn.cursor(dictionary=True) as cursor:
-            cursor.execute(query)
-            results = cursor.fetchall()
-        return results
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_connection_pool()
 
-    def close(self):
-        self.conn.close()
+    def execute_query(self, query: str, params: Optional[Sequence[Any]] = None) -> list:
+        with self.pool.connection() as conn:
+            with conn.cursor(dictionary=True) as cursor:
+                # 파라미터가 없으면 None으로 넘겨 LLM이 만든 SQL의 LIKE '%삼성%'가 포맷 문자로 해석되지 않게 함
+                cursor.execute(query, params or None)
+                results = cursor.fetchall()
+        return results
 
 
 class JSONConverter:
@@ -48,60 +95,94 @@ class JSONConverter:
         template_manager: TemplateManager,
         model_name: str = "gpt-4-0125-preview",
         temperature: float = 0.0,
+        async_openai_client=None,
     ):
         self.openai_client = openai_client
+        self.async_openai_client = async_openai_client
         self.template_manager = template_manager
         self.model_name = model_name
         self.temperature = temperature
 
-    def model(self, prompt: str):
-        response = self.openai_client.chat.completions.create(
-            model=self.model_name,
-            messages=[
+    def request_kwargs(self, prompt: str) -> dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "messages": [
                 {
                     "role": "system",
                     "content": "당신은 JSON 데이터 변환 전문가입니다. 주어진 예시 형식에 맞게 데이터를 변환해주세요.",
                 },
                 {"role": "user", "content": prompt},
             ],
-            temperature=self.temperature,
-            response_format={"type": "json_object"},
-        )
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"},
+        }
+
+    def model(self, prompt: str):
+        response = self.openai_client.chat.completions.create(**self.request_kwargs(prompt))
+        tracer.record_openai_usage(response)
         response_text = response.choices[0].message.content
         return response_text
 
-    def convert(self, generate_json_data: dict) -> str:
+    async def amodel(self, prompt: str):
+        if self.async_openai_client is None:
+            return await asyncio.to_thread(self.model, prompt)
+        response = await self.async_openai_client.chat.completions.create(**self.request_kwargs(prompt))
+        tracer.record_openai_usage(response)
+        return response.choices[0].message.content
+
+    def convert_prompt(self, generate_json_data: dict) -> str:
         convert_prompt = self.template_manager.render("example_prompt.jinja2")
         converter_json_data = json.dumps(generate_json_data, ensure_ascii=False, indent=2, use_decimal=True)
-        convert_json_prompt = convert_prompt + converter_json_data
-        response = self.model(convert_json_prompt)
+        return convert_prompt + converter_json_data
+
+    def convert(self, generate_json_data: dict) -> str:
+        response = self.model(self.convert_prompt(generate_json_data))
         return response
 
+    async def aconvert(self, generate_json_data: dict) -> str:
+        return await self.amodel(self.convert_prompt(generate_json_data))
+
 
 class SQLGenerator:
     """
     프롬프트에 있는 사용자 정보를 추출해 관련 보험을 조회하는 SQL 쿼리생성
+    - 자주 묻는 질문은 SQL 템플릿으로 바로 만들고, 맞는 템플릿이 없을 때만 LLM 호출
     """
 
-    def __init__(self, openai_client, template_manager: TemplateManager):
+    def __init__(
+        self,
+        openai_client,
+        template_manager: TemplateManager,
+        async_openai_client=None,
+        template_matcher: Optional[SQLTemplateMatcher] = None,
+    ):
         self.openai_client = openai_client
+        self.async_openai_client = async_openai_client
         self.template_manager = template_manager
         self.model_name = "gpt-4-0125-preview"
+        if template_matcher is None and settings.sql_templates_enabled:
+            template_matcher = SQLTemplateMatcher()
+        self.template_matcher = template_matcher
+        self.template_hits = 0
+        self.llm_calls = 0
 
-    def model(self, prompt: str):
-        response = self.openai_client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": self.generate_sql_system_prompt},
+    def request_kwargs(self, prompt: str, system_prompt: str) -> dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0,
-            response_format={"type": "text"},
-        )
+            "temperature": 0,
+            "response_format": {"type": "text"},
+        }
+
+    def model(self, prompt: str, system_prompt: str):
+        response = self.openai_client.chat.completions.create(**self.request_kwargs(prompt, system_prompt))
         return response
 
-    def generate(self, prompt: str, user_state: UserState) -> str:
-        self.generate_sql_system_prompt = self.template_manager.render(
+    def system_prompt(self, user_state: UserState) -> str:
+        return self.template_manager.render(
             "base_prompt.jinja2",
             schema=DB_SCHEMA,
             age=user_state.insu_age,
@@ -110,31 +191,121 @@ class SQLGenerator:
             product_type=user_state.product_type,
             expiry_year=user_state.expiry_year,
         )
-        model = self.model(prompt)
-        sql_query = model.choices[0].message.content.strip()
+
+    def match_template(self, prompt: str, user_state: UserState) -> Optional[SQLQuery]:
+        if self.template_matcher is None:
+            return None
+        sql_query = self.template_matcher.match(prompt, user_state)
+        if sql_query is not None:
+            self.template_hits += 1
         return sql_query
 
+    def generate(self, prompt: str, user_state: UserState) -> SQLQuery:
+        with tracer.span(TraceStage.SQL_GENERATION) as span:
+            sql_query = self.match_template(prompt, user_state)
+            span.set(source="template" if sql_query is not None else "llm")
+            if sql_query is not None:
+                return sql_query
+            self.llm_calls += 1
+            model = self.model(prompt, self.system_prompt(user_state))
+            tracer.record_openai_usage(model)
+            return SQLQuery(model.choices[0].message.content.strip())
+
+    async def agenerate(self, prompt: str, user_state: UserState) -> SQLQuery:
+        if self.async_openai_client is None:
+            return await asyncio.to_thread(self.generate, prompt, user_state)
+        with tracer.span(TraceStage.SQL_GENERATION) as span:
+            sql_query = self.match_template(prompt, user_state)
+            span.set(source="template" if sql_query is not None else "llm")
+            if sql_query is not None:
+                return sql_query
+            self.llm_calls += 1
+            model = await self.async_openai_client.chat.completions.create(
+                **self.request_kwargs(prompt, self.system_prompt(user_state))
+            )
+            tracer.record_openai_usage(model)
+            return SQLQuery(model.choices[0].message.content.strip())
+
 
 class QueryExecutor:
-    def __init__(self, openai_client, template_manager: TemplateManager):
-        self.db_client = DatabaseClient()
-        self.json_converter = JSONConverter(openai_client, template_manager)
+    def __init__(
+        self,
+        openai_client,
+        template_manager: TemplateManager,
+        db_client: Optional[DatabaseClient] = None,
+        async_openai_client=None,
+        query_cache: Optional[QueryCache] = None,
+    ):
+        self.db_client = db_client or DatabaseClient()
+        self.query_cache = query_cache
+        self.json_converter = JSONConverter(openai_client, template_manager, async_openai_client=async_openai_client)
 
-    def execute_sql_query(self, generated_sql: str, user_state: UserState) -> str:
-        results = self.db_client.execute_query(generated_sql)
+    def build_result_data(self, query: str, user_state: UserState, results: list) -> Optional[dict]:
         print("\n[검색 결과]")
-        if results:
-            print(f"전체 결과 수: {len(results)}개")
-            # 검색 결과와 설정값을 함께 딕셔너리로 구성
-            temp_data = {
-                "설정값": user_state.__dict__,
-                "쿼리": generated_sql,
-                "결과": results,  # 각 행은 이미 딕셔너리 형태임
-            }
-            # 변환된 JSON 결과를 반환
-            print()
-            json_result = self.json_converter.convert(temp_data)
-            return json_result
-        else:
+        if not results:
             print("검색 결과가 없습니다.")
+            return None
+        print(f"전체 결과 수: {len(results)}개")
+        # 검색 결과와 설정값을 함께 딕셔너리로 구성
+        return {
+            "설정값": user_state.__dict__,
+            "쿼리": query,
+            "결과": results,  # 각 행은 이미 딕셔너리 형태임
+        }
+
+    @staticmethod
+    def build_chart_json(temp_data: dict) -> Optional[str]:
+        try:
+            chart_data = build_chart_data(temp_data)
+        except UnsupportedResultError as e:
+            print(f"[JSON 변환] {e}")
+            return None
+        return json.dumps(chart_data, ensure_ascii=False, indent=4)
+
+    def fetch_results(self, generated_sql: SQLQuery) -> list:
+        with tracer.span(TraceStage.DB_EXECUTE, source="db") as span:
+            if self.query_cache is not None:
+                cached_results = self.query_cache.get_results(generated_sql)
+                if cached_results is not None:
+                    print("[캐시] 조회 결과 캐시 적중")
+                    span.set(cache_hit=True, rows=len(cached_results))
+                    return cached_results
+            results = self.db_client.execute_query(generated_sql.sql, generated_sql.params)
+            span.set(cache_hit=False, rows=len(results))
+            if self.query_cache is not None:
+                self.query_cache.put_results(generated_sql, results)
+            return results
+
+    def execute_sql_query(self, generated_sql: SQLQuery, user_state: UserState) -> str:
+        results = self.fetch_results(generated_sql)
+        temp_data = self.build_result_data(generated_sql.sql, user_state, results)
+        if temp_data is None:
+            return json.dumps([])
+        with tracer.span(TraceStage.JSON_CONVERSION) as span:
+            chart_json = self.build_chart_json(temp_data)
+            span.set(method="chart" if chart_json is not None else "llm")
+            if chart_json is not None:
+                return chart_json
+            # 차트 형식에 맞지 않는 결과만 LLM으로 변환
+            return self.json_converter.convert(temp_data)
+
+    def format_cube_results(self, query: str, user_state: UserState, results: list) -> str:
+        # 보험료 큐브 결과는 SQL 템플릿과 같은 컬럼이므로 항상 차트 JSON으로 변환됨
+        temp_data = self.build_result_data(query, user_state, results)
+        if temp_data is None:
+            return json.dumps([])
+        with tracer.span(TraceStage.JSON_CONVERSION, method="chart"):
+            return json.dumps(build_chart_data(temp_data), ensure_ascii=False, indent=4)
+
+    async def aexecute_sql_query(self, generated_sql: SQLQuery, user_state: UserState) -> str:
+        # mysql.connector는 동기 드라이버이므로 워커 스레드에서 실행
+        results = await asyncio.to_thread(self.fetch_results, generated_sql)
+        temp_data = self.build_result_data(generated_sql.sql, user_state, results)
+        if temp_data is None:
             return json.dumps([])
+        with tracer.span(TraceStage.JSON_CONVERSION) as span:
+            chart_json = self.build_chart_json(temp_data)
+            span.set(method="chart" if chart_json is not None else "llm")
+            if chart_json is not None:
+                return chart_json
+            return await self.json_converter.aconvert(temp_data)
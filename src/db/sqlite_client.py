@@ -0,0 +1,117 @@
+import re
+import sqlite3
+from typing import Any, Optional, Sequence
+
+# 로컬 개발/테스트용 SQLite 스키마 (db/schema.py의 MySQL 스키마와 같은 테이블/컬럼)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS comparison (
+    custom_name TEXT NOT NULL,
+    insu_age INTEGER NOT NULL,
+    sex INTEGER NOT NULL,
+    product_type TEXT NOT NULL,
+    expiry_year TEXT NOT NULL,
+    company_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    coverage_id TEXT NOT NULL,
+    premium_amount INTEGER NOT NULL,
+    PRIMARY KEY (insu_age, sex, product_type, company_id, product_id, coverage_id)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    coverage_id TEXT NOT NULL PRIMARY KEY,
+    coverage_name TEXT NOT NULL,
+    default_coverage_amount REAL NOT NULL,
+    is_default INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS insu_company (
+    company_id TEXT NOT NULL PRIMARY KEY,
+    company_name TEXT NOT NULL,
+    is_default INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS insu_product (
+    company_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    is_default INTEGER NOT NULL,
+    PRIMARY KEY (company_id, product_id),
+    FOREIGN KEY (company_id) REFERENCES insu_company(company_id) ON DELETE CASCADE
+);
+"""
+
+# MySQL 파라미터 자리표시자(%s)를 SQLite(?)로 변환. 문자열 리터럴 안의 %s는 그대로 둠
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|%s")
+
+
+def to_sqlite_placeholders(query: str) -> str:
+    return _PLACEHOLDER.sub(lambda match: "?" if match.group(0) == "%s" else match.group(0), query)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool):
+        self._cursor = cursor
+        self.dictionary = dictionary
+
+    def __enter__(self) -> "SQLiteCursor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._cursor.close()
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None) -> None:
+        self._cursor.execute(to_sqlite_placeholders(query), tuple(params or ()))
+
+    def executemany(self, query: str, rows: Sequence[Sequence[Any]]) -> None:
+        self._cursor.executemany(to_sqlite_placeholders(query), rows)
+
+    def fetchall(self) -> list:
+        rows = self._cursor.fetchall()
+        if not self.dictionary:
+            return rows
+        columns = [column[0] for column in self._cursor.description or ()]
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class SQLiteConnection:
+    """
+    mysql.connector 연결과 같은 인터페이스(cursor(dictionary=True), commit/rollback, in_transaction 등)를 가진 SQLite 연결
+    - MySQL 없이 테스트/벤치마크를 돌리기 위한 로컬 대체 구현
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        self.database = database
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(database, check_same_thread=False)
+
+    @classmethod
+    def with_schema(cls, database: str = ":memory:") -> "SQLiteConnection":
+        conn = cls(database)
+        conn.executescript(SQLITE_SCHEMA)
+        return conn
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("이미 닫힌 연결입니다.")
+        return self._conn
+
+    def cursor(self, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self.raw.cursor(), dictionary)
+
+    def executescript(self, script: str) -> None:
+        self.raw.executescript(script)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn is not None and self._conn.in_transaction
+
+    def is_connected(self) -> bool:
+        return self._conn is not None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,27 +1,57 @@
 import logging
 
 import chainlit as cl
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from config.logger import setup_logging
 from config.settings import PROJECT_ROOT, settings
+from db.premium_cube import premium_cube_store
 from db.sql_utils import TemplateManager
-from modules.user_state import UserState
+from models.collection_registry import collection_registry
+from modules.session_store import InMemorySessionStore
+from options.enums import StreamChunkKind
 from services.insurance_service import InsuranceService
+from util.tracing import tracer
 
 setup_logging()
 logger = logging.getLogger(__name__)
 logging.info("\n=== 보험 상담 챗봇 ===")
 
+if settings.preload_collections:
+    collection_registry.preload()
+
+if premium_cube_store is not None:
+    premium_cube_store.get()
+
+if settings.tracing_metrics_port:
+    tracer.serve_metrics(settings.tracing_metrics_port)
+
 template_manager = TemplateManager(templates_dir=PROJECT_ROOT / "prompts")
 openai_client = OpenAI(api_key=settings.openai_api_key)
-user_state = UserState()
+async_openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
 
+# 클라이언트/템플릿/인덱스는 모든 세션이 공유하고, UserState는 Chainlit 세션 id별로 따로 보관
 insurance_service = InsuranceService(
-    openai_client=openai_client, template_manager=template_manager, user_state=user_state
+    openai_client=openai_client,
+    template_manager=template_manager,
+    async_openai_client=async_openai_client,
+    session_store=InMemorySessionStore.from_settings(),
 )
 
 
+async def stream_response(user_input: str, prefix: str = "") -> None:
+    """
+    검색 결과(참고 문서)는 별도 메시지로 먼저 보내고, 답변은 토큰이 생성되는 대로 스트리밍
+    """
+    answer = cl.Message(content=prefix)
+    async for chunk in insurance_service.astream_user_response(user_input, cl.context.session.id):
+        if chunk.kind == StreamChunkKind.CONTEXT:
+            await cl.Message(content=chunk.content, author="검색 결과").send()
+        elif chunk.kind == StreamChunkKind.TOKEN:
+            await answer.stream_token(chunk.content)
+    await answer.send()
+
+
 @cl.on_chat_start
 async def start() -> None:
     actions = [
@@ -44,20 +74,23 @@ async def start() -> None:
     ).send()
 
 
+@cl.on_chat_end
+async def end() -> None:
+    insurance_service.end_session(cl.context.session.id)
+
+
 @cl.action_callback("m01_00")
 async def on_action_m01_00(action: cl.Action) -> None:
     await cl.Message(content=action.payload["value"]).send()
-    await cl.Message(content=insurance_service.get_user_response(action.payload["value"])).send()
+    await stream_response(action.payload["value"])
 
 
 @cl.action_callback("m02_00")
 async def on_action_m02_00(action: cl.Action) -> None:
     await cl.Message(content=action.payload["value"]).send()
-    await cl.Message(content=insurance_service.get_user_response(action.payload["value"])).send()
+    await stream_response(action.payload["value"])
 
 
 @cl.on_message
 async def main(message: cl.Message) -> None:
-    await cl.Message(
-        content=f"Insupanda Bot: {insurance_service.get_user_response(message.content)}",
-    ).send()
+    await stream_response(message.content, prefix="Insupanda Bot: ")
@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+import models.search
+from config.settings import PROJECT_ROOT, settings
+from models.embedding_cache import normalize_embedding_text
+from models.metadata_store import METADATA_FILE
+from util.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CacheScope = str
+
+
+class AnswerCacheEntry(NamedTuple):
+    key: str  # 정규화된 질문
+    vector: NDArray[np.float32]  # 정규화된 질문 임베딩 (1, d)
+    answer: str
+
+
+def collection_scope(base_path: str, collection_names: list[str]) -> CacheScope:
+    """
+    컬렉션 조합 + 인덱스/메타데이터 파일 fingerprint(수정 시각, 크기)로 캐시 범위를 만듦
+    - insu_data 인덱스가 다시 만들어지면 fingerprint가 바뀌어 이전 답변은 더 이상 조회되지 않음
+    """
+    names = sorted(set(collection_names))
+    fingerprint = hashlib.sha1()
+    for name in names:
+        collection_dir = os.path.join(base_path, name)
+        if not os.path.isdir(collection_dir):
+            continue
+        for file_name in sorted(os.listdir(collection_dir)):
+            if file_name.endswith(".index") or file_name == METADATA_FILE:
+                stat = os.stat(os.path.join(collection_dir, file_name))
+                fingerprint.update(f"{name}/{file_name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return f"{','.join(names)}@{fingerprint.hexdigest()[:16]}"
+
+
+class AnswerCacheBackend(ABC):
+    """
+    답변 캐시 저장소. 범위(scope)별 항목을 모두 꺼내 가장 가까운 질문을 찾음
+    """
+
+    @abstractmethod
+    def entries(self, scope: CacheScope) -> list[AnswerCacheEntry]:
+        raise NotImplementedError("AnswerCacheBackend should be implemented")
+
+    @abstractmethod
+    def put(self, scope: CacheScope, entry: AnswerCacheEntry) -> None:
+        raise NotImplementedError("AnswerCacheBackend should be implemented")
+
+    @abstractmethod
+    def touch(self, scope: CacheScope, key: str) -> None:
+        raise NotImplementedError("AnswerCacheBackend should be implemented")
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError("AnswerCacheBackend should be implemented")
+
+
+class InMemoryAnswerBackend(AnswerCacheBackend):
+    """
+    프로세스 메모리 LRU(항목 수/TTL 제한). 적중한 항목만 LRU 순서를 갱신
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.cache: LRUCache[tuple[CacheScope, str], AnswerCacheEntry] = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._scopes: dict[CacheScope, dict[str, None]] = {}
+        self._lock = threading.Lock()
+
+    def entries(self, scope: CacheScope) -> list[AnswerCacheEntry]:
+        with self._lock:
+            keys = list(self._scopes.get(scope, {}))
+        found = []
+        for key in keys:
+            entry = self.cache.peek((scope, key))
+            if entry is None:
+                # LRU에서 밀려났거나 만료된 항목은 범위 목록에서도 제거
+                with self._lock:
+                    self._scopes.get(scope, {}).pop(key, None)
+                continue
+            found.append(entry)
+        return found
+
+    def put(self, scope: CacheScope, entry: AnswerCacheEntry) -> None:
+        self.cache.put((scope, entry.key), entry)
+        with self._lock:
+            self._scopes.setdefault(scope, {})[entry.key] = None
+
+    def touch(self, scope: CacheScope, key: str) -> None:
+        self.cache.get((scope, key))
+
+    def clear(self) -> None:
+        self.cache.clear()
+        with self._lock:
+            self._scopes.clear()
+
+
+class SQLiteAnswerBackend(AnswerCacheBackend):
+    """
+    여러 워커 프로세스가 함께 쓰는 SQLite 답변 캐시 (last_used_at 기준 LRU, created_at 기준 TTL)
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl: Optional[float] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (scope, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def entries(self, scope: CacheScope) -> list[AnswerCacheEntry]:
+        min_created_at = time.time() - self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, dim, vector, answer FROM answers WHERE scope = ? AND created_at >= ?",
+                (scope, min_created_at),
+            ).fetchall()
+        return [
+            AnswerCacheEntry(key, np.frombuffer(vector, dtype=np.float32).reshape(1, dim).copy(), answer)
+            for key, dim, vector, answer in rows
+        ]
+
+    def put(self, scope: CacheScope, entry: AnswerCacheEntry) -> None:
+        vector = np.ascontiguousarray(entry.vector, dtype=np.float32)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (scope, key, dim, vector, answer, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (scope, entry.key, vector.shape[-1], vector.tobytes(), entry.answer, now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM answers WHERE rowid IN "
+                "(SELECT rowid FROM answers ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def touch(self, scope: CacheScope, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE answers SET last_used_at = ? WHERE scope = ? AND key = ?", (time.time(), scope, key)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class SemanticAnswerCache:
+    """
+    약관 질문 답변 캐시
+    - 같은 컬렉션 조합(scope) 안에서 질문 임베딩의 코사인 유사도가 threshold 이상인 가장 가까운 질문의 답변을 재사용
+    - 임베딩은 질문 임베딩 캐시를 거치므로 이후 FAISS 검색에서 다시 요청하지 않음
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], NDArray[np.float32]],
+        backend: Optional[AnswerCacheBackend] = None,
+        threshold: float = 0.95,
+    ):
+        self.embed = embed
+        self.backend = backend or InMemoryAnswerBackend()
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SemanticAnswerCache":
+        backend: AnswerCacheBackend
+        if settings.answer_cache_path:
+            path = settings.answer_cache_path
+            backend = SQLiteAnswerBackend(
+                path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path),
+                max_entries=settings.answer_cache_max_entries,
+                ttl=settings.answer_cache_ttl,
+            )
+        else:
+            backend = InMemoryAnswerBackend(settings.answer_cache_max_entries, settings.answer_cache_ttl)
+        return cls(
+            lambda text: models.search.upembedding.get_upstage_embedding(text),
+            backend=backend,
+            threshold=settings.answer_cache_threshold,
+        )
+
+    def _query_vector(self, query: str) -> NDArray[np.float32]:
+        vector = np.array(self.embed(query), dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, query: str, scope: CacheScope) -> Optional[str]:
+        entries = self.backend.entries(scope)
+        best: Optional[AnswerCacheEntry] = None
+        best_score = -1.0
+        if entries:
+            query_vector = self._query_vector(query)
+            vectors = np.vstack([entry.vector for entry in entries])
+            if vectors.shape[1] == query_vector.shape[1]:
+                scores = vectors @ query_vector[0]
+                best_index = int(np.argmax(scores))
+                best, best_score = entries[best_index], float(scores[best_index])
+
+        with self._lock:
+            if best is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.backend.touch(scope, best.key)
+        logger.info(f"답변 캐시 적중: '{best.key}' (유사도 {best_score:.3f}, 적중률 {self.stats()['hit_rate']:.2f})")
+        return best.answer
+
+    def store(self, query: str, scope: CacheScope, answer: str) -> None:
+        self.backend.put(scope, AnswerCacheEntry(normalize_embedding_text(query), self._query_vector(query), answer))
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+answer_cache: Optional[SemanticAnswerCache] = (
+    SemanticAnswerCache.from_settings() if settings.answer_cache_enabled else None
+)
@@ -1,18 +1,39 @@
-import json
+import logging
 import os
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Mapping, Optional
 
 import faiss
 from langchain.embeddings.base import Embeddings
 
+from config.settings import settings
+from models.context_builder import ChunkTokenCounts
+from models.dict_types import DocId, DocIDMetadata
+from models.index_builder import apply_search_params, index_file_name
+from models.metadata_store import METADATA_FILE, MmapMetadataStore, read_metadata_json
+from models.mmap_index import MmapFlatIndex
+from models.sparse_index import BM25Index
+from options.enums import CollectionLoadMode, IndexVariant
 from options.insu_name import insu_match
 
+if TYPE_CHECKING:
+    from models.collection_registry import CollectionRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def select_index_variant(collection_name: str) -> IndexVariant:
+    """
+    컬렉션별 설정(index_variant_overrides)이 있으면 우선, 없으면 index_variant 사용
+    """
+    return settings.index_variant_overrides.get(collection_name, settings.index_variant)
+
 
 class CollectionLoader:
-    def __init__(self, vector_path: str, embeddings: Embeddings):
+    def __init__(self, vector_path: str, embeddings: Embeddings, registry: Optional["CollectionRegistry"] = None):
         self.base_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), vector_path)
         self.embeddings = embeddings
+        self.registry = registry
         self.collections: list[dict[str, Any]] = []
 
     @classmethod
@@ -21,14 +42,20 @@ class CollectionLoader:
         folder_path: str,
         index_name: str = "faiss",
         index_extend: str = "index",
-    ) -> tuple[faiss.Index, dict[str, Any]]:
+        load_mode: CollectionLoadMode = CollectionLoadMode.MEMORY,
+        index_variant: IndexVariant = IndexVariant.FLAT,
+    ) -> tuple[faiss.Index, Mapping[DocId, DocIDMetadata]]:
         if index_extend not in ["faiss", "index", "bin"]:
             raise ValueError("사용할 수 없는 파일 인덱스 확장자입니다.")
 
         path = Path(folder_path)
-        index_path = str(path / f"{index_name}.{index_extend}")
-        metadata_path = str(path / "metadata.json")
-        index = faiss.read_index(index_path)
+        index_path = str(path / index_file_name(index_variant, index_name, index_extend))
+        metadata_path = str(path / METADATA_FILE)
+
+        if index_variant != IndexVariant.FLAT and not os.path.exists(index_path):
+            # 변형 인덱스를 아직 만들지 않은 컬렉션은 원본 인덱스로 검색
+            logger.warning(f"{index_variant} 인덱스가 없어 원본 인덱스를 사용합니다: {index_path}")
+            index_path = str(path / index_file_name(IndexVariant.FLAT, index_name, index_extend))
 
         if not os.path.exists(index_path):
             raise FileNotFoundError(f"인덱스 파일을 찾을 수 없습니다: {index_path}")
@@ -36,34 +63,57 @@ class CollectionLoader:
         if not os.path.exists(metadata_path):
             raise FileNotFoundError(f"메타데이터 파일을 찾을 수 없습니다: {metadata_path}")
 
-        with open(metadata_path, "r", encoding="utf-8") as f:
-            metadata_raw = json.load(f)
-
-        if isinstance(metadata_raw, list):
-            metadata = {}
-            for i, item in enumerate(metadata_raw):
-                metadata[str(i)] = item
+        if load_mode == CollectionLoadMode.MMAP:
+            # 메타데이터는 오프셋 테이블 + blob 저장소로 조회 시점에만 역직렬화
+            metadata = MmapMetadataStore.load(folder_path)
+            if os.path.basename(index_path) == index_file_name(IndexVariant.FLAT, index_name, index_extend):
+                # flat 벡터는 .npy mmap으로 읽어 워커 간 페이지 캐시 공유 (IO_FLAG_MMAP은 IndexFlat을 힙으로 복사)
+                return MmapFlatIndex.load(index_path), metadata
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
         else:
-            metadata = metadata_raw
-
+            index = faiss.read_index(index_path)
+            metadata = read_metadata_json(folder_path)
+        apply_search_params(index, nprobe=settings.ivf_nprobe, ef_search=settings.hnsw_ef_search)
         return index, metadata
 
+    @classmethod
+    def load_configured(cls, folder_path: str) -> tuple[faiss.Index, Mapping[DocId, DocIDMetadata]]:
+        """
+        설정(collection_load_mode, index_variant)에 맞춰 컬렉션 로드
+        """
+        return cls.load_local(
+            folder_path,
+            load_mode=settings.collection_load_mode,
+            index_variant=select_index_variant(os.path.basename(os.path.normpath(folder_path))),
+        )
+
     def load_collection(self, collection_name: str) -> list[dict[str, Any]]:
         # 이미 로드된 컬렉션 확인
         for coll in self.collections:
             if coll["name"] == collection_name:
                 print(f"{collection_name} 컬렉션이 이미 로드되어 있습니다.")
+                return self.collections
 
         if collection_name not in insu_match.values():
             raise ValueError(f"{collection_name} 컬렉션을 찾을 수 없습니다.")
 
+        # 공유 레지스트리가 있으면 프로세스 내에 상주하는 컬렉션을 재사용
+        if self.registry is not None:
+            self.collections.append(dict(self.registry.get(collection_name)))
+            return self.collections
+
         collection_dir = os.path.join(self.base_path, collection_name)
 
         index, metadata = CollectionLoader.load_local(
             folder_path=collection_dir,
             index_name="faiss",  # 보통 faiss.index 또는 index.faiss 중 하나
             index_extend="index",
+            index_variant=select_index_variant(collection_name),
         )
 
-        self.collections.append({"name": collection_name, "index": index, "metadata": metadata})
+        collection = {"name": collection_name, "index": index, "metadata": metadata}
+        if settings.hybrid_search:
+            collection["sparse_index"] = BM25Index.load(collection_dir, metadata)
+        collection["token_counts"] = ChunkTokenCounts(metadata)
+        self.collections.append(collection)
         return self.collections
@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import faiss
+
+from config.settings import PROJECT_ROOT, settings
+from models.collection_loader import CollectionLoader, select_index_variant
+from models.context_builder import ChunkTokenCounts
+from models.dict_types import CollectionLoadStats, DocId, DocIDMetadata, InsuFileName, RawCollection
+from models.index_builder import index_file_name
+from models.metadata_store import MmapMetadataStore
+from models.sparse_index import BM25Index
+from models.unified_index import UNIFIED_INDEX_FILE, UnifiedIndex
+from options.insu_name import insu_match
+from util.memory import rss_bytes
+
+CollectionReader = Callable[[str], tuple[faiss.Index, Mapping[DocId, DocIDMetadata]]]
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_index_bytes(index: faiss.Index, index_path: Optional[str] = None) -> int:
+    """
+    인덱스가 메모리에서 차지하는 크기 추정 (코드 크기 x 벡터 수, 불가능하면 파일 크기)
+    """
+    try:
+        return int(index.sa_code_size()) * int(index.ntotal)
+    except RuntimeError:
+        if index_path and os.path.exists(index_path):
+            return os.path.getsize(index_path)
+        return int(index.d) * 4 * int(index.ntotal)
+
+
+def estimate_metadata_bytes(metadata: Mapping[DocId, DocIDMetadata]) -> int:
+    if isinstance(metadata, MmapMetadataStore):
+        return metadata.nbytes
+    total = 0
+    for doc_id, item in metadata.items():
+        total += len(doc_id.encode("utf-8"))
+        for value in item.values():
+            if isinstance(value, str):
+                total += len(value.encode("utf-8"))
+    return total
+
+
+class CollectionRegistry:
+    """
+    insu_match 컬렉션을 프로세스당 한 번만 로드해 모든 핸들러가 공유하는 레지스트리
+    - 컬렉션별 락으로 동시에 요청이 들어와도 한 번만 읽음
+    - 메타데이터는 읽기 전용 매핑으로 제공
+    - hybrid_search이면 BM25 희소 인덱스(bm25.npz)도 함께 로드
+    - 컬렉션별 로드 전후 RSS 차이를 기록. 다른 컬렉션을 동시에 로드하면 그만큼 섞이고, mmap 모드는 검색 시 페이지가 올라옴
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        reader: Optional[CollectionReader] = None,
+        unified_index_path: Optional[str] = None,
+        hybrid_search: bool = False,
+    ):
+        self.base_path = base_path
+        self.unified_index_path = unified_index_path
+        self.hybrid_search = hybrid_search
+        self._unified_index: Optional[UnifiedIndex] = None
+        self._unified_index_stale = False
+        self._reader: CollectionReader = reader or CollectionLoader.load_configured
+        self._collections: dict[InsuFileName, RawCollection] = {}
+        self._stats: dict[InsuFileName, CollectionLoadStats] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[InsuFileName, threading.Lock] = {}
+
+    def _collection_lock(self, collection_name: InsuFileName) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(collection_name, threading.Lock())
+
+    def _load(self, collection_name: InsuFileName) -> RawCollection:
+        collection_dir = os.path.join(self.base_path, collection_name)
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        index, metadata = self._reader(collection_dir)
+
+        collection: RawCollection = {
+            "name": collection_name,
+            "index": index,
+            "metadata": metadata if isinstance(metadata, MappingProxyType) else MappingProxyType(metadata),
+        }
+        if self.hybrid_search:
+            collection["sparse_index"] = BM25Index.load(collection_dir, metadata)
+        collection["token_counts"] = ChunkTokenCounts(collection["metadata"])
+        elapsed = time.perf_counter() - start
+        rss_after = rss_bytes()
+        stats: CollectionLoadStats = {
+            "name": collection_name,
+            "load_seconds": elapsed,
+            "rss_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            "estimated_index_bytes": estimate_index_bytes(
+                index, os.path.join(collection_dir, index_file_name(select_index_variant(collection_name)))
+            ),
+            "estimated_metadata_bytes": estimate_metadata_bytes(metadata),
+            "num_vectors": int(index.ntotal),
+            "num_documents": len(metadata),
+        }
+        rss = "측정 불가" if stats["rss_bytes"] is None else f"+{stats['rss_bytes'] / 1024 / 1024:.1f}MB"
+        logger.info(
+            f"{collection_name} 컬렉션 로드 완료: {elapsed:.3f}s, RSS {rss} "
+            f"(추정 index {stats['estimated_index_bytes'] / 1024 / 1024:.1f}MB, "
+            f"metadata {stats['estimated_metadata_bytes'] / 1024 / 1024:.1f}MB)"
+        )
+        self._stats[collection_name] = stats
+        return collection
+
+    def get(self, collection_name: InsuFileName) -> Mapping[str, Any]:
+        """
+        컬렉션의 읽기 전용 핸들 반환. 처음 요청될 때만 디스크에서 로드
+        """
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            if collection_name not in insu_match.values():
+                raise ValueError(f"{collection_name} 컬렉션을 찾을 수 없습니다.")
+            with self._collection_lock(collection_name):
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    collection = self._load(collection_name)
+                    self._collections[collection_name] = collection
+        return MappingProxyType(collection)
+
+    def get_unified_index(self) -> Optional[UnifiedIndex]:
+        """
+        통합 인덱스 경로가 설정되어 있고 파일이 있으면 한 번만 로드해 반환
+        - 통합 인덱스를 만든 뒤 바뀐 컬렉션이 있으면 doc_id가 어긋나므로 None을 반환해 컬렉션별 검색 사용
+        """
+        if self._unified_index is None and self.unified_index_path and not self._unified_index_stale:
+            if not os.path.exists(os.path.join(self.unified_index_path, UNIFIED_INDEX_FILE)):
+                return None
+            with self._lock:
+                if self._unified_index is None and not self._unified_index_stale:
+                    unified_index = UnifiedIndex.load(self.unified_index_path)
+                    ntotals = {name: int(collection["index"].ntotal) for name, collection in self._collections.items()}
+                    stale = unified_index.stale_collections(self.base_path, ntotals)
+                    if stale:
+                        logger.warning(
+                            f"통합 인덱스 생성 후 바뀐 컬렉션({', '.join(stale)})이 있어 컬렉션별 검색을 사용합니다. "
+                            "models.unified_index로 다시 생성하세요."
+                        )
+                        self._unified_index_stale = True
+                    else:
+                        self._unified_index = unified_index
+                        logger.info(f"통합 인덱스 로드 완료: {unified_index.index.ntotal}개 벡터")
+        return self._unified_index
+
+    def preload(self, collection_names: Optional[Iterable[InsuFileName]] = None) -> None:
+        for collection_name in collection_names or insu_match.values():
+            self.get(collection_name)
+        self.get_unified_index()
+
+    def is_loaded(self, collection_name: InsuFileName) -> bool:
+        return collection_name in self._collections
+
+    def stats(self) -> list[CollectionLoadStats]:
+        return [stats.copy() for stats in list(self._stats.values())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._collections.clear()
+            self._stats.clear()
+            self._unified_index = None
+            self._unified_index_stale = False
+
+
+collection_registry = CollectionRegistry(
+    os.path.join(PROJECT_ROOT, settings.vector_path),
+    unified_index_path=os.path.join(PROJECT_ROOT, settings.unified_index_path) if settings.use_unified_index else None,
+    hybrid_search=settings.hybrid_search,
+)
@@ -0,0 +1,205 @@
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Iterator, Mapping, NamedTuple, Optional
+
+from config.settings import settings
+from models.dict_types import DEFAULT_COLLECTION, DocId, DocIDMetadata
+from options.enums import DiversifyMode
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def heuristic_token_count(text: str) -> int:
+    """
+    tiktoken 인코딩을 쓸 수 없을 때의 근사치 (한글 1글자 ~ 1토큰, 그 외 4글자 ~ 1토큰)
+    """
+    hangul = len(_HANGUL.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(encoding_name: Optional[str] = None) -> TokenCounter:
+    """
+    tiktoken 인코딩 토큰 수 계산 함수. tiktoken이 없거나 인코딩 파일을 받을 수 없으면 근사치 사용
+    """
+    encoding_name = encoding_name or settings.context_token_encoding
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktoken 인코딩 {encoding_name}을 사용할 수 없어 근사치로 토큰 수 계산: {e}")
+        return heuristic_token_count
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class ChunkTokenCounts(Mapping[DocId, int]):
+    """
+    컬렉션 청크별 text 토큰 수. 검색 결과로 처음 조회될 때만 계산해 기억함
+    - 로드 시 전체 청크를 읽지 않으므로 mmap 메타데이터 저장소의 지연 로드와 빠른 시작을 유지
+    """
+
+    def __init__(self, metadata: Mapping[DocId, DocIDMetadata], count_tokens: Optional[TokenCounter] = None):
+        self.metadata = metadata
+        self.count_tokens = count_tokens
+        self._counts: dict[DocId, int] = {}
+
+    def count(self, doc_id: DocId, item: Optional[DocIDMetadata] = None) -> int:
+        """
+        doc_id의 토큰 수. 이미 꺼낸 메타데이터(item)를 주면 다시 읽지 않음
+        """
+        tokens = self._counts.get(doc_id)
+        if tokens is None:
+            if item is None:
+                item = self.metadata[doc_id]
+            tokens = (self.count_tokens or get_token_counter())(item.get("text") or "")
+            self._counts[doc_id] = tokens
+        return tokens
+
+    def __getitem__(self, doc_id: DocId) -> int:
+        return self.count(doc_id)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.metadata
+
+    def __iter__(self) -> Iterator[DocId]:
+        return iter(self.metadata)
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+
+def has_chunk_text(hit: dict) -> bool:
+    """
+    컨텍스트에 넣을 수 있는 검색 결과인지 (기본 문서가 아니고 text가 비어 있지 않음)
+    """
+    return hit.get("collection") != DEFAULT_COLLECTION and bool((hit.get("metadata", {}).get("text") or "").strip())
+
+
+class PackedContext(NamedTuple):
+    context: str
+    hits: list[dict]  # 컨텍스트에 들어간 검색 결과 (보험사별로 묶인 순서)
+    tokens: int  # 컨텍스트에 들어간 청크 토큰 수
+    retrieved_tokens: int  # 검색된 청크 전체 토큰 수
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.retrieved_tokens - self.tokens
+
+    @property
+    def num_companies(self) -> int:
+        return len({hit.get("collection", "") for hit in self.hits})
+
+
+class ContextBuilder:
+    """
+    검색 결과를 토큰 예산 안에서 프롬프트 컨텍스트로 묶는 무상태 빌더
+    - 모든 컬렉션의 검색 결과를 점수 순으로 한 번에 정렬 (global top-k)
+    - 보험사별로 점수가 높은 min_per_company개는 먼저 포함해 비교 질문에서 빠지는 보험사가 없게 함
+    - 나머지는 min_score 이상인 청크만 점수 순으로 token_budget까지 채움
+    - 기본 문서(검색 결과 없음 안내)는 실제 약관 청크가 아니므로 컨텍스트에 넣지 않음
+    - preserve_order이면 점수 대신 검색 결과 순서(MMR로 고른 순서)를 그대로 우선순위로 사용
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        min_per_company: int = 1,
+        min_score: Optional[float] = None,
+        count_tokens: Optional[TokenCounter] = None,
+        preserve_order: bool = False,
+    ):
+        self.token_budget = token_budget
+        self.min_per_company = min_per_company
+        self.min_score = min_score
+        self.count_tokens = count_tokens
+        self.preserve_order = preserve_order
+
+    @classmethod
+    def from_settings(cls) -> "ContextBuilder":
+        return cls(
+            token_budget=settings.context_token_budget,
+            min_per_company=settings.context_min_per_company,
+            # 하이브리드 검색 점수는 RRF 점수라 코사인 유사도 기준 cutoff를 적용하지 않음
+            min_score=None if settings.hybrid_search else settings.context_min_score,
+            preserve_order=settings.diversify_mode == DiversifyMode.MMR,
+        )
+
+    def rank(self, hits: list[dict]) -> list[dict]:
+        return list(hits) if self.preserve_order else sorted(hits, key=lambda hit: -hit.get("score", 0.0))
+
+    def hit_tokens(self, hit: dict) -> int:
+        # 검색 시 컬렉션에서 가져온 토큰 수가 없는 결과(기본 문서 등)만 직접 계산
+        tokens = hit.get("tokens")
+        if tokens is None:
+            tokens = (self.count_tokens or get_token_counter())(hit.get("metadata", {}).get("text") or "")
+        return tokens
+
+    def select(self, search_results: list[dict]) -> tuple[list[dict], int]:
+        """
+        (컨텍스트에 넣을 검색 결과(우선순위 순), 검색 결과 전체 토큰 수)
+        """
+        hits: list[dict] = []
+        seen: set[tuple[str, str]] = set()
+        for hit in search_results:
+            key = (hit.get("collection", ""), hit.get("doc_id", ""))
+            if not has_chunk_text(hit) or key in seen:
+                continue
+            seen.add(key)
+            hits.append(hit)
+        ranked = self.rank(hits)
+        retrieved_tokens = sum(self.hit_tokens(hit) for hit in ranked)
+
+        per_company: dict[str, int] = {}
+        guaranteed: list[dict] = []
+        rest: list[dict] = []
+        for hit in ranked:
+            company = hit.get("collection", "")
+            if per_company.get(company, 0) < self.min_per_company:
+                per_company[company] = per_company.get(company, 0) + 1
+                guaranteed.append(hit)
+            elif self.min_score is None or hit.get("score", 0.0) >= self.min_score:
+                rest.append(hit)
+
+        selected: list[dict] = []
+        used = 0
+        for hit in guaranteed + rest:
+            tokens = self.hit_tokens(hit)
+            # 예산을 넘는 청크는 건너뛰고 더 작은 청크로 계속 채움 (가장 관련 있는 청크 하나는 항상 포함)
+            if selected and used + tokens > self.token_budget:
+                continue
+            selected.append(hit)
+            used += tokens
+        # 우선순위(점수 또는 MMR 순서)대로 정렬해 반환
+        chosen = {id(hit) for hit in selected}
+        return [hit for hit in ranked if id(hit) in chosen], retrieved_tokens
+
+    def build(self, search_results: list[dict]) -> PackedContext:
+        selected, retrieved_tokens = self.select(search_results)
+        by_company: dict[str, list[dict]] = {}
+        for hit in selected:
+            by_company.setdefault(hit.get("collection", ""), []).append(hit)
+
+        multiple_companies = len(by_company) > 1
+        context = ""
+        hits: list[dict] = []
+        for company, company_hits in by_company.items():
+            if multiple_companies:
+                context += f"\n\n## {company} 정보:\n"
+            for hit in company_hits:
+                context += f"\n---\n{hit['metadata']['text']}"
+                hits.append(hit)
+
+        packed = PackedContext(context, hits, sum(self.hit_tokens(hit) for hit in hits), retrieved_tokens)
+        ratio = packed.saved_tokens / retrieved_tokens if retrieved_tokens else 0.0
+        logger.info(
+            f"컨텍스트 토큰 {packed.tokens}/{retrieved_tokens} (절약 {packed.saved_tokens}, {ratio:.0%}), "
+            f"청크 {len(hits)}/{len(search_results)}"
+        )
+        return packed
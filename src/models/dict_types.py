@@ -1,10 +1,17 @@
-from typing import Optional, TypedDict
+from typing import TYPE_CHECKING, Mapping, NotRequired, Optional, TypedDict
 
 import faiss
 
+if TYPE_CHECKING:
+    from models.context_builder import ChunkTokenCounts
+    from models.sparse_index import BM25Index
+
 InsuFileName = str
 DocId = str
 
+# 검색할 컬렉션이 없거나 결과를 찾지 못했을 때 FaissSearch가 돌려주는 기본 문서의 컬렉션 이름
+DEFAULT_COLLECTION: InsuFileName = "default"
+
 
 class DocIDMetadata(TypedDict):
     header1: Optional[str]
@@ -15,7 +22,9 @@ class DocIDMetadata(TypedDict):
 class RawCollection(TypedDict):
     name: InsuFileName
     index: faiss.Index
-    metadata: dict[DocId, DocIDMetadata]
+    metadata: Mapping[DocId, DocIDMetadata]
+    sparse_index: NotRequired["BM25Index"]  # hybrid_search 설정 시에만 로드
+    token_counts: NotRequired["ChunkTokenCounts"]  # 청크별 text 토큰 수 (컨텍스트 토큰 예산 계산용, 조회 시 계산)
 
 
 class OrganizedCollection(TypedDict):
@@ -23,3 +32,14 @@ class OrganizedCollection(TypedDict):
     doc_id: DocId
     score: float
     metadata: DocIDMetadata
+    tokens: NotRequired[int]
+
+
+class CollectionLoadStats(TypedDict):
+    name: InsuFileName
+    load_seconds: float
+    rss_bytes: Optional[int]  # 로드 전후 프로세스 RSS 증가량 (/proc이 없으면 None)
+    estimated_index_bytes: int
+    estimated_metadata_bytes: int
+    num_vectors: int
+    num_documents: int
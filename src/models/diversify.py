@@ -0,0 +1,157 @@
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from config.settings import settings
+from models.dict_types import RawCollection
+from options.enums import DiversifyMode
+
+logger = logging.getLogger(__name__)
+
+
+class DroppedChunk(NamedTuple):
+    hit: dict  # 제외된 청크
+    duplicate_of: dict  # 제외된 청크와 가장 비슷한 남은 청크
+    similarity: float
+
+
+class DiversifyResult(NamedTuple):
+    kept: list[dict]
+    dropped: list[DroppedChunk]
+
+
+def hit_vectors(
+    hits: list[dict], collections: Iterable[RawCollection]
+) -> tuple[NDArray[np.float32], NDArray[np.bool_]]:
+    """
+    검색 결과의 저장된 벡터를 index.reconstruct_batch로 꺼내 L2 정규화한 (n, d) 행렬과 벡터 유무 마스크 반환
+    - 복원을 지원하지 않는 인덱스(direct map이 없는 IVF 등)나 기본 문서는 벡터 없음으로 처리
+    - 컬렉션마다 차원이 다르면 가장 작은 차원으로 잘라서 비교
+    """
+    indexes = {collection["name"]: collection["index"] for collection in collections}
+    positions: dict[str, list[int]] = {}
+    for position, hit in enumerate(hits):
+        if hit.get("collection") in indexes and str(hit.get("doc_id", "")).isdigit():
+            positions.setdefault(hit["collection"], []).append(position)
+
+    rows: dict[int, NDArray[np.float32]] = {}
+    for name, collection_positions in positions.items():
+        doc_ids = np.array([int(hits[position]["doc_id"]) for position in collection_positions], dtype=np.int64)
+        try:
+            vectors = indexes[name].reconstruct_batch(doc_ids)
+        except RuntimeError as e:
+            logger.warning(f"{name} 인덱스에서 벡터를 복원할 수 없어 중복 제거에서 제외: {str(e).splitlines()[0]}")
+            continue
+        rows.update(zip(collection_positions, vectors))
+
+    dim = min((len(vector) for vector in rows.values()), default=0)
+    matrix = np.zeros((len(hits), dim), dtype=np.float32)
+    for position, vector in rows.items():
+        matrix[position] = vector[:dim]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, norms[:, 0] > 0
+
+
+class Diversifier:
+    """
+    검색 결과에서 거의 같은 청크(보험사 공통 표준 약관 등)를 저장된 벡터로 걸러냄
+    - dedup: 점수 순으로 보면서 이미 남긴 청크와 코사인 유사도가 threshold 이상이면 제외
+    - mmr: lambda * 관련도 - (1 - lambda) * 남긴 청크와의 최대 유사도 순으로 k개를 고르고, threshold 이상은 제외
+      검색은 컬렉션마다 mmr_fetch_k개 후보를 가져오고, 결과는 MMR로 고른 순서를 유지
+    - 유사도는 한 번의 행렬 곱으로 계산하며, 벡터가 없는 결과는 항상 남김
+    """
+
+    def __init__(
+        self,
+        mode: DiversifyMode = DiversifyMode.DEDUP,
+        threshold: float = 0.95,
+        mmr_lambda: float = 0.7,
+        mmr_fetch_k: int = 10,
+    ):
+        self.mode = mode
+        self.threshold = threshold
+        self.mmr_lambda = mmr_lambda
+        self.mmr_fetch_k = mmr_fetch_k
+
+    @classmethod
+    def from_settings(cls) -> "Diversifier":
+        return cls(
+            settings.diversify_mode,
+            settings.diversify_threshold,
+            settings.diversify_mmr_lambda,
+            settings.diversify_mmr_fetch_k,
+        )
+
+    def candidates_per_collection(self, top_k: int) -> int:
+        """
+        컬렉션마다 가져올 검색 후보 수 (MMR은 top_k보다 넓은 후보 중에서 고름)
+        """
+        return max(top_k, self.mmr_fetch_k) if self.mode == DiversifyMode.MMR else top_k
+
+    @staticmethod
+    def relevance(hits: list[dict]) -> NDArray[np.float32]:
+        # 코사인/RRF 점수 척도가 달라도 lambda가 같은 의미가 되도록 0~1로 맞춤
+        scores = np.array([hit.get("score", 0.0) for hit in hits], dtype=np.float32)
+        spread = scores.max() - scores.min() if len(scores) else 0.0
+        return (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+
+    def select(
+        self,
+        hits: list[dict],
+        vectors: NDArray[np.float32],
+        has_vector: NDArray[np.bool_],
+        k: Optional[int] = None,
+    ) -> DiversifyResult:
+        """
+        k: mmr에서 고를 청크 수 (None이면 후보 전체 순서만 정함, 벡터가 없는 결과는 k와 상관없이 남김)
+        """
+        similarities = vectors @ vectors.T
+        candidates = [i for i in sorted(range(len(hits)), key=lambda i: -hits[i].get("score", 0.0)) if has_vector[i]]
+        relevance = self.relevance(hits)
+        # 남긴 청크와의 최대 유사도, 그 청크 번호
+        max_similarity = np.full(len(hits), -np.inf, dtype=np.float32)
+        nearest = np.full(len(hits), -1, dtype=np.int64)
+
+        kept: list[int] = []
+        dropped: list[DroppedChunk] = []
+        limit = k if self.mode == DiversifyMode.MMR and k is not None else len(hits)
+        while candidates and len(kept) < limit:
+            if self.mode == DiversifyMode.MMR:
+                remaining = np.array(candidates)
+                penalty = np.maximum(max_similarity[remaining], 0.0)
+                mmr = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * penalty
+                pick = candidates.pop(int(np.argmax(mmr)))
+            else:
+                pick = candidates.pop(0)
+            if max_similarity[pick] >= self.threshold:
+                dropped.append(DroppedChunk(hits[pick], hits[nearest[pick]], float(max_similarity[pick])))
+                continue
+            kept.append(pick)
+            closer = similarities[pick] > max_similarity
+            max_similarity[closer] = similarities[pick][closer]
+            nearest[closer] = pick
+
+        kept += [i for i in range(len(hits)) if not has_vector[i]]
+        return DiversifyResult([hits[i] for i in kept], dropped)
+
+    def diversify(
+        self, hits: list[dict], collections: Iterable[RawCollection], k: Optional[int] = None
+    ) -> DiversifyResult:
+        if len(hits) < 2:
+            return DiversifyResult(list(hits), [])
+        vectors, has_vector = hit_vectors(hits, collections)
+        result = self.select(hits, vectors, has_vector, k)
+        for chunk in result.dropped:
+            logger.info(
+                f"중복 청크 제외: {chunk.hit['collection']}#{chunk.hit['doc_id']} "
+                f"≈ {chunk.duplicate_of['collection']}#{chunk.duplicate_of['doc_id']} (유사도 {chunk.similarity:.3f})"
+            )
+        if result.dropped:
+            logger.info(f"중복 청크 {len(result.dropped)}개 제외 ({self.mode}), {len(result.kept)}개 남김")
+        return result
+
+
+chunk_diversifier: Optional[Diversifier] = Diversifier.from_settings() if settings.diversify_mode else None
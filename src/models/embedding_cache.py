@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from config.settings import PROJECT_ROOT, settings
+from util.lru_cache import LRUCache
+
+CacheKey = tuple[str, str]
+
+
+def normalize_embedding_text(text: str) -> str:
+    # 유니코드 정규화(NFC) + 연속 공백 정리. 같은 질문이 다른 키로 저장되지 않도록 함
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class SQLiteEmbeddingStore:
+    """
+    (모델명, 정규화된 텍스트) -> float32 벡터를 저장하는 디스크 캐시. 재시작/배포 후에도 유지됨
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, model: str, text: str) -> Optional[NDArray[np.float32]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT dim, vector, created_at FROM embeddings WHERE model = ? AND text = ?", (model, text)
+            ).fetchone()
+        if row is None:
+            return None
+        dim, vector, created_at = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        return np.frombuffer(vector, dtype=np.float32).reshape(1, dim).copy()
+
+    def put(self, model: str, text: str, vector: NDArray[np.float32]) -> None:
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model, text, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                (model, text, vector.shape[-1], vector.tobytes(), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    임베딩 2단 캐시: 메모리 LRU(항목 수/바이트/TTL 제한) -> 선택적 SQLite 디스크 캐시
+    - 키는 (모델명, 정규화된 텍스트)
+    - 반환값은 복사본이므로 호출 측에서 정규화(normalize_L2) 등으로 수정해도 캐시는 그대로
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 4096,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        disk_store: Optional[SQLiteEmbeddingStore] = None,
+    ):
+        self.model_name = model_name
+        self.memory: LRUCache[CacheKey, NDArray[np.float32]] = LRUCache(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=lambda vector: vector.nbytes
+        )
+        self.disk_store = disk_store
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    @classmethod
+    def from_settings(cls, model_name: str) -> "EmbeddingCache":
+        disk_store = None
+        if settings.embedding_cache_path:
+            path = settings.embedding_cache_path
+            disk_store = SQLiteEmbeddingStore(
+                path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path), ttl=settings.embedding_cache_ttl
+            )
+        return cls(
+            model_name,
+            max_entries=settings.embedding_cache_max_entries,
+            max_bytes=settings.embedding_cache_max_mb * 1024 * 1024,
+            ttl=settings.embedding_cache_ttl,
+            disk_store=disk_store,
+        )
+
+    def get(self, text: str) -> Optional[NDArray[np.float32]]:
+        key = (self.model_name, normalize_embedding_text(text))
+        vector = self.memory.get(key)
+        if vector is None and self.disk_store is not None:
+            vector = self.disk_store.get(*key)
+            if vector is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+            self.memory.put(key, vector)
+        return None if vector is None else vector.copy()
+
+    def put(self, text: str, vector: NDArray[np.float32]) -> None:
+        key = (self.model_name, normalize_embedding_text(text))
+        vector = np.array(vector, dtype=np.float32)
+        self.memory.put(key, vector)
+        if self.disk_store is not None:
+            self.disk_store.put(*key, vector)
+
+    def stats(self) -> dict[str, float]:
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_misses"] = self.disk_misses
+        return stats
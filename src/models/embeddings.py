@@ -1,23 +1,39 @@
 import os
+from typing import Callable, Optional, Sequence
 
 import numpy as np
 from langchain_upstage import UpstageEmbeddings
+from numpy.typing import NDArray
+
+from config.settings import settings
+from models.embedding_cache import EmbeddingCache, normalize_embedding_text
 
 
 class UpstageEmbedding:
-    def __init__(self, upstage_api_key=None):
+    model_name = "solar-embedding-1-large"
+
+    def __init__(
+        self,
+        upstage_api_key=None,
+        cache: Optional[EmbeddingCache] = None,
+        document_cache: Optional[EmbeddingCache] = None,
+    ):
         self.api_key = upstage_api_key or os.getenv("UPSTAGE_API_KEY")
         if not self.api_key or len(self.api_key) < 10:
             raise ValueError(f"유효한 Upstage API 키가 없습니다. 현재 키: {self.api_key}")
-        self.cached_embeddings = {}
+        # embed_query는 query 모델을 사용하므로 캐시 키도 query 모델명으로 구분
+        self.cache = cache or EmbeddingCache.from_settings(f"{self.model_name}-query")
+        # embed_documents는 passage 모델을 사용하므로 별도 캐시에 저장
+        self.document_cache = document_cache or EmbeddingCache.from_settings(f"{self.model_name}-passage")
         self.upstage = UpstageEmbeddings(
             api_key=self.api_key,
-            model="solar-embedding-1-large",
+            model=self.model_name,
         )
 
     def get_upstage_embedding(self, text: str) -> float:
-        if text in self.cached_embeddings:
-            return self.cached_embeddings[text]
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
 
         # 텍스트 임베딩 생성
         embedding = self.upstage.embed_query(text)
@@ -26,5 +42,61 @@ class UpstageEmbedding:
         vector = np.array(embedding, dtype=np.float32).reshape(1, -1)
 
         # 결과 캐시
-        self.cached_embeddings[text] = vector
+        self.cache.put(text, vector)
         return vector
+
+    def embed_query_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        """
+        query 모델로 여러 질문을 한 번에 임베딩 (langchain_upstage에는 query 모델 배치 API가 없어 직접 요청)
+        """
+        params = self.upstage._invocation_params
+        params["model"] = params["model"] + "-query"
+        return [item.embedding for item in self.upstage.client.create(input=list(texts), **params).data]
+
+    def embed_cached(
+        self,
+        texts: Sequence[str],
+        cache: EmbeddingCache,
+        request: Callable[[Sequence[str]], Sequence[Sequence[float]]],
+        batch_size: Optional[int] = None,
+    ) -> NDArray[np.float32]:
+        """
+        여러 텍스트를 (n, d) float32 행렬로 임베딩
+        - 정규화한 텍스트 기준으로 중복을 제거하고 캐시에 있는 것은 재사용
+        - 캐시에 없는 텍스트만 batch_size개씩 request로 요청
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        batch_size = batch_size or settings.embedding_batch_size
+
+        keys = [normalize_embedding_text(text) for text in texts]
+        vectors: dict[str, NDArray[np.float32]] = {}
+        misses: list[str] = []
+        for key in dict.fromkeys(keys):
+            cached = cache.get(key)
+            if cached is None:
+                misses.append(key)
+            else:
+                vectors[key] = cached[0]
+
+        for start in range(0, len(misses), batch_size):
+            end = start + batch_size
+            batch = misses[start:end]
+            for key, embedding in zip(batch, request(batch)):
+                vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+                cache.put(key, vector)
+                vectors[key] = vector[0]
+
+        return np.ascontiguousarray(np.stack([vectors[key] for key in keys]), dtype=np.float32)
+
+    def embed_queries(self, texts: Sequence[str], batch_size: Optional[int] = None) -> NDArray[np.float32]:
+        """
+        질문 배치 임베딩. get_upstage_embedding과 같은 query 모델/캐시를 사용해 단건 검색과 결과가 같음
+        """
+        return self.embed_cached(texts, self.cache, self.embed_query_batch, batch_size)
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> NDArray[np.float32]:
+        """
+        문서(청크) 배치 임베딩. passage 모델과 문서 캐시를 사용
+        """
+        return self.embed_cached(texts, self.document_cache, self.upstage.embed_documents, batch_size)
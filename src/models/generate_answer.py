@@ -1,40 +1,37 @@
+from typing import AsyncIterator, Optional
+
 from langchain.schema import SystemMessage
+from langchain_core.callbacks import UsageMetadataCallbackHandler
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 
 from config.settings import settings
-from options.enums import CompanyNameRelevanceTextPair
+from models.context_builder import ContextBuilder, PackedContext
+from options.enums import TraceStage
+from util.tracing import tracer
+
+NO_RESULTS_MESSAGE = "검색 결과가 없습니다. 다른 질문을 시도해보세요."
+NO_CONTEXT_MESSAGE = "관련 정보를 찾을 수 없습니다. 더 구체적인 질문을 해주시거나, 다른 키워드를 사용해보세요."
+# 검색 컨텍스트 없이 반환하는 안내 문구 (답변 캐시에 저장하지 않음)
+GUIDANCE_MESSAGES = frozenset({NO_RESULTS_MESSAGE, NO_CONTEXT_MESSAGE})
 
 
 class PolicyResponse:
-    def __init__(self, openai_client: str):
+    """
+    검색 결과로 약관 답변 생성. 요청 간에 상태를 가지지 않으므로 여러 세션이 공유해도 됨
+    """
+
+    def __init__(self, openai_client: str, context_builder: Optional[ContextBuilder] = None):
         if not openai_client:
             raise RuntimeError("OpenAI API key가 제공되지 않았습니다. OPENAI_API_KEY를 설정해주세요.")
         self.openai_client = openai_client
-        self.company_results: CompanyNameRelevanceTextPair = {}
+        self.context_builder = context_builder or ContextBuilder.from_settings()
 
-    def extract_company_info(self, search_results: list[dict]) -> str:
-        for result in search_results:
-            collection_name = result.get("collection", "")
-            self.company_results.setdefault(collection_name, []).append(result)
-        self.multiple_companies = len(self.company_results) > 1
-        context = ""
-        for company, results in self.company_results.items():
-            company_context = ""
-            if self.multiple_companies:
-                company_context += f"\n\n## {company} 정보:\n"
-            for result in results:
-                text = result.get("metadata", {}).get("text", "")
-                if text:
-                    company_context += f"\n---\n{text}"
-            context += company_context
-        return context
-
-    def prompt_system(self) -> ChatPromptTemplate:
+    def prompt_system(self, multiple_companies: bool) -> ChatPromptTemplate:
         system_prompt = "너는 보험 약관 전문가야. 항상 한국어로 대답해."
-        if self.multiple_companies:
+        if multiple_companies:
             system_prompt += " \
             사용자 질문에 '비교 | 차이 | 다른 | 다른점 | 비교해 | 비교해줘 | 차이점 | 알려줘 | 뭐가 더 나은가' 키워드가 있다면, \
             여러 보험사의 약관을 비교 분석하여 차이점과 공통점을 명확하게 설명해주세요. 표 형식으로 정리하면 좋습니다."
@@ -53,18 +50,88 @@ class PolicyResponse:
             api_key=settings.openai_api_key,
             temperature=0.3,
             max_tokens=2000,
+            stream_usage=True,
         )
         return llm
 
-    def generate_answer(self, user_input: str, search_results: list[dict]) -> str:
+    def prepare_context(self, user_input: str, search_results: list[dict]) -> tuple[PackedContext, Optional[str]]:
+        """
+        (토큰 예산 안에서 묶은 컨텍스트, 바로 반환할 안내 문구) 반환. 안내 문구가 있으면 LLM을 호출하지 않음
+        """
         if not search_results:
-            return "검색 결과가 없습니다. 다른 질문을 시도해보세요."
+            return PackedContext("", [], 0, 0), NO_RESULTS_MESSAGE
         print("\n-------- 답변 생성 시작 --------")
         print(f"질문: '{user_input}'")
         print(f"검색 결과 수: {len(search_results)}")
-        context = self.extract_company_info(search_results)
-        if not context.strip():
-            return "관련 정보를 찾을 수 없습니다. 더 구체적인 질문을 해주시거나, 다른 키워드를 사용해보세요."
-        chain: Runnable = self.prompt_system() | self.policy_model() | StrOutputParser()
-        response = chain.invoke({"query": user_input, "context": context})
-        return response
+        packed = self.context_builder.build(search_results)
+        if not packed.context.strip():
+            return packed, NO_CONTEXT_MESSAGE
+        return packed, None
+
+    def chain(self, packed: PackedContext) -> Runnable:
+        return self.prompt_system(packed.num_companies > 1) | self.policy_model() | StrOutputParser()
+
+    @staticmethod
+    def usage_config() -> dict:
+        # 트레이싱 중일 때만 LLM 사용량 콜백을 달아 답변 생성 단계에 토큰 수 기록
+        return {"callbacks": [UsageMetadataCallbackHandler()]} if tracer.enabled else {}
+
+    @staticmethod
+    def record_usage(config: dict) -> None:
+        for handler in config.get("callbacks", []):
+            for usage in handler.usage_metadata.values():
+                tracer.record_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+    @staticmethod
+    def format_sources(search_results: list[dict]) -> str:
+        """
+        답변보다 먼저 보여줄 검색 결과 요약 (컬렉션 + 문서 제목, 중복 제거)
+        """
+        lines: list[str] = []
+        for result in search_results:
+            metadata = result.get("metadata", {})
+            line = (
+                f"- {result.get('collection', '')} {metadata.get('header1') or metadata.get('source') or ''}".rstrip()
+            )
+            if line not in lines:
+                lines.append(line)
+        return "참고 문서\n" + "\n".join(lines) if lines else ""
+
+    def generate_answer(self, user_input: str, search_results: list[dict]) -> str:
+        with tracer.span(TraceStage.ANSWER_GENERATION) as span:
+            packed, message = self.prepare_context(user_input, search_results)
+            span.set(context_tokens=packed.tokens)
+            if message is not None:
+                return message
+            config = self.usage_config()
+            response = self.chain(packed).invoke({"query": user_input, "context": packed.context}, config=config)
+            self.record_usage(config)
+            return response
+
+    async def agenerate_answer(self, user_input: str, search_results: list[dict]) -> str:
+        with tracer.span(TraceStage.ANSWER_GENERATION) as span:
+            packed, message = self.prepare_context(user_input, search_results)
+            span.set(context_tokens=packed.tokens)
+            if message is not None:
+                return message
+            config = self.usage_config()
+            response = await self.chain(packed).ainvoke({"query": user_input, "context": packed.context}, config=config)
+            self.record_usage(config)
+            return response
+
+    async def astream_answer(self, user_input: str, search_results: list[dict]) -> AsyncIterator[str]:
+        """
+        답변을 토큰 단위로 반환 (안내 문구는 한 번에 반환)
+        """
+        with tracer.span(TraceStage.ANSWER_GENERATION, stream=True) as span:
+            packed, message = self.prepare_context(user_input, search_results)
+            span.set(context_tokens=packed.tokens)
+            if message is not None:
+                yield message
+                return
+            config = self.usage_config()
+            async for token in self.chain(packed).astream(
+                {"query": user_input, "context": packed.context}, config=config
+            ):
+                yield token
+            self.record_usage(config)
@@ -0,0 +1,137 @@
+import argparse
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+import faiss
+import numpy as np
+from numpy.typing import NDArray
+
+from options.enums import IndexVariant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_NAME = "faiss"
+DEFAULT_INDEX_EXTEND = "index"
+# faiss는 클러스터당 최소 39개의 학습 벡터를 권장
+MIN_POINTS_PER_CENTROID = 39
+
+
+def index_file_name(
+    variant: IndexVariant, index_name: str = DEFAULT_INDEX_NAME, index_extend: str = DEFAULT_INDEX_EXTEND
+) -> str:
+    """
+    변형 인덱스 파일명 (flat은 기존 faiss.index, 나머지는 faiss_<variant>.index)
+    """
+    if variant == IndexVariant.FLAT:
+        return f"{index_name}.{index_extend}"
+    return f"{index_name}_{variant}.{index_extend}"
+
+
+def default_nlist(num_vectors: int) -> int:
+    # 일반적인 권장값 4 * sqrt(n)에서 클러스터당 학습 벡터 수를 보장하도록 제한
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def build_index(
+    vectors: NDArray[np.float32],
+    variant: IndexVariant,
+    metric_type: int = faiss.METRIC_INNER_PRODUCT,
+    nlist: Optional[int] = None,
+    pq_m: int = 64,
+    pq_nbits: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+) -> faiss.Index:
+    """
+    벡터 행렬로 변형 인덱스 생성
+    - 벡터 번호는 원본 인덱스와 같아야 metadata.json의 doc_id와 맞으므로 순서대로 추가
+    - ivfpq: pq_m은 차원의 약수여야 하며, 벡터 수가 적으면 nlist/pq_nbits를 줄여서 학습
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_vectors, dim = vectors.shape
+
+    if variant == IndexVariant.FLAT:
+        index = faiss.IndexFlat(dim, metric_type)
+    elif variant == IndexVariant.SQ8:
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, metric_type)
+    elif variant == IndexVariant.HNSW:
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, metric_type)
+        index.hnsw.efConstruction = ef_construction
+    elif variant == IndexVariant.IVFPQ:
+        if dim % pq_m != 0:
+            raise ValueError(f"pq_m({pq_m})은 임베딩 차원({dim})의 약수여야 합니다.")
+        nlist = min(nlist or default_nlist(num_vectors), max(1, num_vectors // MIN_POINTS_PER_CENTROID))
+        # PQ 코드북은 서브 양자화기당 2^nbits개의 중심점을 학습하므로 벡터 수가 그보다 적으면 학습 불가
+        max_nbits = max(1, int(math.log2(max(2, num_vectors))))
+        if pq_nbits > max_nbits:
+            logger.warning(
+                f"학습 벡터 {num_vectors}개로는 pq_nbits={pq_nbits}를 학습할 수 없어 {max_nbits}로 낮춥니다."
+            )
+            pq_nbits = max_nbits
+        quantizer = faiss.IndexFlat(dim, metric_type)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_nbits, metric_type)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 종류입니다: {variant}")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def apply_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """
+    검색 시점 파라미터 설정 (IVF는 nprobe, HNSW는 efSearch). 다른 인덱스는 그대로 둠
+    """
+    ivf_index = faiss.try_extract_index_ivf(index)
+    if ivf_index is not None and nprobe:
+        ivf_index.nprobe = min(nprobe, ivf_index.nlist)
+    if isinstance(index, faiss.IndexHNSW) and ef_search:
+        index.hnsw.efSearch = ef_search
+
+
+def build_collection_variant(folder_path: str, variant: IndexVariant, **params) -> tuple[str, faiss.Index]:
+    """
+    컬렉션 폴더의 원본 faiss.index를 읽어 변형 인덱스를 같은 폴더에 저장
+    """
+    source_path = Path(folder_path) / index_file_name(IndexVariant.FLAT)
+    if not source_path.exists():
+        raise FileNotFoundError(f"인덱스 파일을 찾을 수 없습니다: {source_path}")
+
+    source = faiss.read_index(str(source_path))
+    vectors = source.reconstruct_n(0, source.ntotal)
+    index = build_index(vectors, variant, metric_type=source.metric_type, **params)
+
+    out_path = str(Path(folder_path) / index_file_name(variant))
+    faiss.write_index(index, out_path)
+    return out_path, index
+
+
+if __name__ == "__main__":
+    from config.settings import PROJECT_ROOT, settings
+    from options.insu_name import insu_match
+
+    parser = argparse.ArgumentParser(description="insu_data 컬렉션을 IVF-PQ/HNSW/SQ8 인덱스로 다시 생성")
+    parser.add_argument("variant", choices=[variant.value for variant in IndexVariant if variant != IndexVariant.FLAT])
+    parser.add_argument("--nlist", type=int, default=None, help="ivfpq 클러스터 수 (기본값: 4*sqrt(n))")
+    parser.add_argument("--pq-m", type=int, default=64, help="ivfpq 서브 양자화기 수 (차원의 약수)")
+    parser.add_argument("--pq-nbits", type=int, default=8, help="ivfpq 서브 양자화기당 비트 수")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="hnsw 노드당 이웃 수")
+    parser.add_argument("--ef-construction", type=int, default=200, help="hnsw 생성 시 탐색 폭")
+    parser.add_argument("collections", nargs="*", help="대상 컬렉션 (기본값: insu_match 전체)")
+    args = parser.parse_args()
+
+    variant = IndexVariant(args.variant)
+    params = {
+        IndexVariant.IVFPQ: {"nlist": args.nlist, "pq_m": args.pq_m, "pq_nbits": args.pq_nbits},
+        IndexVariant.HNSW: {"hnsw_m": args.hnsw_m, "ef_construction": args.ef_construction},
+    }.get(variant, {})
+    for collection_name in args.collections or insu_match.values():
+        folder_path = os.path.join(PROJECT_ROOT, settings.vector_path, collection_name)
+        out_path, index = build_collection_variant(folder_path, variant, **params)
+        print(
+            f"{collection_name}: {index.ntotal}개 벡터 -> {out_path} ({os.path.getsize(out_path) / 1024 / 1024:.1f}MB)"
+        )
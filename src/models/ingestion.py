@@ -0,0 +1,406 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Protocol, Sequence
+
+import faiss
+import numpy as np
+from numpy.typing import NDArray
+
+from config.settings import PROJECT_ROOT, settings
+from models.dict_types import DocIDMetadata
+from models.embedding_cache import normalize_embedding_text
+from models.index_builder import index_file_name
+from models.metadata_store import METADATA_FILE
+from models.unified_index import UNIFIED_INDEX_FILE
+from options.enums import IndexVariant
+from util.atomic_file import atomic_directory
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "ingest_manifest.json"
+DOCUMENT_SUFFIXES = (".md", ".txt", ".jsonl")
+
+_HEADER1 = re.compile(r"^#\s+(.+?)\s*#*\s*$")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# 단계 사이 큐의 종료 표시
+_DONE = object()
+
+
+class DocumentEmbedder(Protocol):
+    """
+    수집 파이프라인에서 사용하는 문서 임베딩 (UpstageEmbedding과 같은 인터페이스)
+    """
+
+    model_name: str
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> NDArray[np.float32]: ...
+
+
+class IngestionStats(NamedTuple):
+    documents: int
+    chunks: int
+    embedded: int  # 새로 임베딩한 청크 수
+    reused: int  # 이전 인덱스에서 벡터를 재사용한 청크 수
+    seconds: float
+
+
+def content_hash(text: str) -> str:
+    """
+    청크 내용 해시. 임베딩 캐시와 같은 정규화를 거쳐 공백만 바뀐 청크는 같은 청크로 봄
+    """
+    return hashlib.sha256(normalize_embedding_text(text).encode("utf-8")).hexdigest()
+
+
+def split_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> list[str]:
+    """
+    문단 경계를 우선해 chunk_size 글자 이하로 나누고, 이전 청크 끝 overlap 글자를 다음 청크 앞에 붙임
+    - chunk_size보다 긴 문단은 chunk_size - overlap 간격으로 잘라서 사용
+    """
+    step = max(1, chunk_size - overlap)
+    pieces: list[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        for start in range(0, len(paragraph), step):
+            end = start + chunk_size
+            pieces.append(paragraph[start:end])
+            if end >= len(paragraph):
+                break
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > chunk_size:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap > 0 else ""
+            current = f"{tail}\n\n{piece}" if tail and len(tail) + len(piece) + 2 <= chunk_size else piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def read_sections(path: Path, source: str) -> list[DocIDMetadata]:
+    """
+    문서를 (header1, source, text) 단위로 읽음
+    - .md: '# 제목' 단위로 나누고 제목을 header1로 사용 (하위 제목은 본문에 남김)
+    - .txt: 파일 전체를 header1 없이 하나로
+    - .jsonl: 한 줄에 {"text", "header1", "source"} 하나 (source가 없으면 파일 경로)
+    """
+    if path.suffix == ".jsonl":
+        sections: list[DocIDMetadata] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    sections.append(
+                        {
+                            "header1": record.get("header1"),
+                            "source": record.get("source") or source,
+                            "text": record.get("text") or "",
+                        }
+                    )
+        return sections
+
+    text = path.read_text(encoding="utf-8")
+    if path.suffix != ".md":
+        return [{"header1": None, "source": source, "text": text}]
+
+    sections = []
+    header1: Optional[str] = None
+    lines: list[str] = []
+    for line in text.splitlines():
+        match = _HEADER1.match(line)
+        if match:
+            sections.append({"header1": header1, "source": source, "text": "\n".join(lines)})
+            header1, lines = match.group(1), []
+        else:
+            lines.append(line)
+    sections.append({"header1": header1, "source": source, "text": "\n".join(lines)})
+    return sections
+
+
+def chunk_document(path: str, source: str, chunk_size: int, overlap: int) -> list[DocIDMetadata]:
+    """
+    문서 하나를 청크 목록으로 변환 (프로세스 풀 워커에서 실행)
+    """
+    chunks: list[DocIDMetadata] = []
+    for section in read_sections(Path(path), source):
+        for text in split_text(section["text"], chunk_size, overlap):
+            chunks.append({"header1": section["header1"], "source": section["source"], "text": text})
+    return chunks
+
+
+def find_documents(source_dir: str) -> list[Path]:
+    # doc_id가 실행마다 같도록 경로 순으로 정렬
+    return sorted(path for path in Path(source_dir).rglob("*") if path.is_file() and path.suffix in DOCUMENT_SUFFIXES)
+
+
+class PreviousIngestion:
+    """
+    이전 수집 결과(faiss.index + ingest_manifest.json)에서 내용 해시가 같은 청크의 벡터를 꺼냄
+    - 임베딩 모델이 다르거나 매니페스트가 없으면 재사용하지 않음
+    """
+
+    def __init__(self, index: Optional[faiss.Index] = None, hashes: Sequence[str] = ()):
+        self.index = index
+        self.doc_ids: dict[str, int] = {}
+        for doc_id, chunk_hash in enumerate(hashes):
+            self.doc_ids.setdefault(chunk_hash, doc_id)
+
+    @classmethod
+    def load(cls, folder_path: str, model_name: str) -> "PreviousIngestion":
+        path = Path(folder_path)
+        index_path = path / index_file_name(IndexVariant.FLAT)
+        manifest_path = path / MANIFEST_FILE
+        if not index_path.exists() or not manifest_path.exists():
+            return cls()
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("embedder") != model_name:
+            logger.info(f"임베딩 모델이 바뀌어 모든 청크를 다시 임베딩: {manifest.get('embedder')} -> {model_name}")
+            return cls()
+        index = faiss.read_index(str(index_path))
+        if index.ntotal != len(manifest.get("hashes", [])):
+            logger.warning(f"인덱스와 매니페스트의 청크 수가 달라 이전 벡터를 사용하지 않음: {index_path}")
+            return cls()
+        return cls(index, manifest["hashes"])
+
+    def get(self, chunk_hash: str) -> Optional[NDArray[np.float32]]:
+        doc_id = self.doc_ids.get(chunk_hash)
+        if doc_id is None or self.index is None:
+            return None
+        return self.index.reconstruct(doc_id)
+
+
+class _Batch(NamedTuple):
+    chunks: list[DocIDMetadata]
+    hashes: list[str]
+    vectors: NDArray[np.float32]
+    embedded: int
+
+
+class IngestionPipeline:
+    """
+    약관 문서 폴더를 insu_data 컬렉션(faiss.index + metadata.json)으로 만드는 스트리밍 파이프라인
+    - 청크 분할: 프로세스 풀에서 문서 단위로 병렬 처리하고, 진행 중인 문서 수를 제한
+    - 임베딩: 내용 해시가 이전 수집과 같은 청크는 기존 벡터를 재사용하고 나머지만 batch_size개씩 요청
+    - 인덱스 기록: 배치가 도착하는 대로 정규화해 내적 인덱스에 추가하고, 끝나면 파일을 한 번에 교체
+    - 단계 사이는 크기가 정해진 큐로 연결해 느린 단계가 앞 단계를 멈추게 함 (backpressure)
+    """
+
+    def __init__(
+        self,
+        embedder: DocumentEmbedder,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 100,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: int = 8,
+    ):
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(f"chunk_overlap({chunk_overlap})은 0 이상 chunk_size({chunk_size}) 미만이어야 합니다.")
+        self.embedder = embedder
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+
+    def _put(self, stage_queue: queue.Queue, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, stage_queue: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, target: Callable, errors: list[BaseException], *args: Any) -> threading.Thread:
+        def run() -> None:
+            try:
+                target(*args)
+            except BaseException as e:
+                errors.append(e)
+                self._stop.set()
+
+        thread = threading.Thread(target=run, name=f"ingest-{target.__name__}", daemon=True)
+        thread.start()
+        return thread
+
+    def chunk_stage(self, documents: Sequence[Path], source_dir: str, out_queue: queue.Queue) -> None:
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending: deque[Future] = deque()
+            for path in documents:
+                if self._stop.is_set():
+                    break
+                source = path.relative_to(source_dir).as_posix()
+                pending.append(executor.submit(chunk_document, str(path), source, self.chunk_size, self.chunk_overlap))
+                # 문서 순서대로 내보내고, 워커 수의 두 배까지만 미리 처리
+                while len(pending) >= self.workers * 2:
+                    self._put(out_queue, pending.popleft().result())
+            while pending and not self._stop.is_set():
+                self._put(out_queue, pending.popleft().result())
+        self._put(out_queue, _DONE)
+
+    def embed_batch(self, chunks: list[DocIDMetadata], previous: PreviousIngestion) -> _Batch:
+        hashes = [content_hash(chunk["text"]) for chunk in chunks]
+        vectors: list[Optional[NDArray[np.float32]]] = [previous.get(chunk_hash) for chunk_hash in hashes]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            embedded = self.embedder.embed_many([chunks[i]["text"] for i in misses], batch_size=self.batch_size)
+            for i, vector in zip(misses, embedded):
+                vectors[i] = vector
+        return _Batch(chunks, hashes, np.stack(vectors).astype(np.float32), len(misses))
+
+    def embed_stage(self, in_queue: queue.Queue, out_queue: queue.Queue, previous: PreviousIngestion) -> None:
+        buffer: list[DocIDMetadata] = []
+        while True:
+            chunks = self._get(in_queue)
+            if chunks is _DONE:
+                break
+            buffer += [chunk for chunk in chunks if chunk["text"].strip()]
+            batch_size = self.batch_size
+            while len(buffer) >= batch_size:
+                batch, buffer = buffer[:batch_size], buffer[batch_size:]
+                self._put(out_queue, self.embed_batch(batch, previous))
+        if buffer and not self._stop.is_set():
+            self._put(out_queue, self.embed_batch(buffer, previous))
+        self._put(out_queue, _DONE)
+
+    def run(self, source_dir: str, collection_dir: str) -> IngestionStats:
+        """
+        source_dir 아래 문서(.md/.txt/.jsonl)로 collection_dir의 faiss.index, metadata.json, ingest_manifest.json 생성
+        """
+        started = time.perf_counter()
+        documents = find_documents(source_dir)
+        if not documents:
+            raise FileNotFoundError(f"수집할 문서가 없습니다: {source_dir}")
+        previous = PreviousIngestion.load(collection_dir, self.embedder.model_name)
+
+        self._stop.clear()
+        errors: list[BaseException] = []
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        batch_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            self._run_stage(self.chunk_stage, errors, documents, source_dir, chunk_queue),
+            self._run_stage(self.embed_stage, errors, chunk_queue, batch_queue, previous),
+        ]
+
+        index: Optional[faiss.Index] = None
+        metadata: dict[str, DocIDMetadata] = {}
+        hashes: list[str] = []
+        embedded = 0
+        try:
+            while True:
+                batch = self._get(batch_queue)
+                if batch is _DONE:
+                    break
+                vectors = np.ascontiguousarray(batch.vectors)
+                faiss.normalize_L2(vectors)
+                if index is None:
+                    index = faiss.IndexFlat(vectors.shape[1], faiss.METRIC_INNER_PRODUCT)
+                index.add(vectors)
+                for chunk in batch.chunks:
+                    metadata[str(len(metadata))] = chunk
+                hashes += batch.hashes
+                embedded += batch.embedded
+        finally:
+            # 정상 종료면 두 단계 모두 끝난 뒤이고, 예외면 남은 단계를 멈춤
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        if index is None:
+            raise ValueError(f"문서에서 청크를 만들지 못했습니다: {source_dir}")
+
+        self.write(collection_dir, index, metadata, hashes)
+        elapsed = time.perf_counter() - started
+        stats = IngestionStats(len(documents), len(metadata), embedded, len(metadata) - embedded, elapsed)
+        logger.info(
+            f"{collection_dir} 수집 완료: 문서 {stats.documents}개, 청크 {stats.chunks}개 "
+            f"(임베딩 {stats.embedded}, 재사용 {stats.reused}), {stats.seconds:.1f}s"
+        )
+        return stats
+
+    def write(
+        self, collection_dir: str, index: faiss.Index, metadata: dict[str, DocIDMetadata], hashes: list[str]
+    ) -> None:
+        """
+        faiss.index, ingest_manifest.json, metadata.json을 임시 폴더에 모두 쓴 뒤 컬렉션 폴더와 한 번에 교체
+        - 중간에 실패해도 새 인덱스와 이전 메타데이터가 섞인 컬렉션이 남지 않음
+        - 이전 폴더의 파생 파일(mmap 저장소, BM25, 변형 인덱스)은 옮기지 않음. mmap 저장소/BM25는 다음 로드 때 다시 생성
+        """
+        path = Path(collection_dir)
+        variants = [variant for variant in IndexVariant if variant != IndexVariant.FLAT]
+        removed = [variant for variant in variants if (path / index_file_name(variant)).exists()]
+        with atomic_directory(path) as staging:
+            faiss.write_index(index, str(staging / index_file_name(IndexVariant.FLAT)))
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump({"embedder": self.embedder.model_name, "dim": index.d, "hashes": hashes}, f)
+            with open(staging / METADATA_FILE, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False)
+
+        if removed:
+            logger.warning(
+                f"{collection_dir}의 변형 인덱스({', '.join(removed)})를 지웠으므로 다시 생성해야 합니다 (models.index_builder)"
+            )
+        if os.path.exists(os.path.join(PROJECT_ROOT, settings.unified_index_path, UNIFIED_INDEX_FILE)):
+            logger.warning(
+                f"통합 인덱스는 {collection_dir} 변경 전 벡터로 만들어져 다시 생성 전까지 사용되지 않습니다 (models.unified_index)"
+            )
+
+
+if __name__ == "__main__":
+    from models.embeddings import UpstageEmbedding
+    from options.insu_name import insu_match
+
+    parser = argparse.ArgumentParser(description="약관 문서 폴더(<source>/<컬렉션>/)로 insu_data 컬렉션 생성")
+    parser.add_argument("source", help="컬렉션별 하위 폴더에 .md/.txt/.jsonl 문서가 있는 폴더")
+    parser.add_argument("collections", nargs="*", help="대상 컬렉션 (기본값: source의 하위 폴더 전체)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="청크 최대 글자 수")
+    parser.add_argument("--chunk-overlap", type=int, default=100, help="청크 간 겹치는 글자 수")
+    parser.add_argument("--workers", type=int, default=None, help="청크 분할 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument("--batch-size", type=int, default=None, help="임베딩 요청당 청크 수")
+    args = parser.parse_args()
+
+    collection_names = args.collections or sorted(path.name for path in Path(args.source).iterdir() if path.is_dir())
+    for collection_name in collection_names:
+        if collection_name not in insu_match.values():
+            logger.warning(f"{collection_name}은 insu_match에 없어 검색 대상에 포함되지 않습니다.")
+
+    pipeline = IngestionPipeline(
+        UpstageEmbedding(),
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+    for collection_name in collection_names:
+        stats = pipeline.run(
+            os.path.join(args.source, collection_name),
+            os.path.join(PROJECT_ROOT, settings.vector_path, collection_name),
+        )
+        print(
+            f"{collection_name}: 문서 {stats.documents}개, 청크 {stats.chunks}개 "
+            f"(임베딩 {stats.embedded}, 재사용 {stats.reused}), {stats.seconds:.1f}s"
+        )
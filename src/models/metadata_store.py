@@ -0,0 +1,171 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from models.dict_types import DocId, DocIDMetadata
+from util.atomic_file import atomic_write
+
+METADATA_FILE = "metadata.json"
+OFFSETS_FILE = "metadata.offsets.npy"
+BLOB_FILE = "metadata.blob"
+# blob 헤더: 매직, 슬롯 수, 오프셋 테이블 CRC32. 오프셋 파일과 blob이 같은 build에서 나왔는지 확인하는 데 사용
+BLOB_HEADER = struct.Struct("<8sQQ")
+BLOB_MAGIC = b"INSUMETA"
+
+logger = logging.getLogger(__name__)
+
+
+def read_metadata_json(folder_path: str) -> dict[DocId, DocIDMetadata]:
+    metadata_path = os.path.join(folder_path, METADATA_FILE)
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        metadata_raw = json.load(f)
+
+    if isinstance(metadata_raw, list):
+        return {str(i): item for i, item in enumerate(metadata_raw)}
+    return metadata_raw
+
+
+def offsets_checksum(offsets: NDArray[np.int64]) -> int:
+    return zlib.crc32(np.ascontiguousarray(offsets, dtype=np.int64).tobytes())
+
+
+class MmapMetadataStore(Mapping[DocId, DocIDMetadata]):
+    """
+    metadata.json을 오프셋 테이블(int64) + UTF-8 JSON 레코드 blob으로 저장해 mmap으로 읽는 저장소
+    - 조회한 청크만 역직렬화하므로 전체 메타데이터를 파이썬 dict로 올리지 않음
+    - 여러 워커 프로세스가 같은 페이지 캐시를 공유
+    - 오프셋 i ~ i+1 구간이 비어 있으면 해당 doc_id가 없는 것으로 간주
+    - 두 파일은 따로 교체되므로 blob 헤더(슬롯 수 + 오프셋 CRC32)가 오프셋과 맞지 않으면 ValueError
+    """
+
+    def __init__(self, folder_path: str):
+        path = Path(folder_path)
+        self.folder_path = folder_path
+        self.offsets: NDArray[np.int64] = np.load(path / OFFSETS_FILE, mmap_mode="r")
+        self._file = open(path / BLOB_FILE, "rb")
+        self.nbytes = os.fstat(self._file.fileno()).st_size
+        self._blob: Any = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.nbytes else b""
+        if not self._matches_offsets():
+            self.close()
+            raise ValueError(f"mmap 메타데이터 저장소의 blob과 오프셋 파일이 맞지 않습니다: {folder_path}")
+        self._present = np.flatnonzero(np.diff(self.offsets))
+
+    def _matches_offsets(self) -> bool:
+        if self.nbytes < BLOB_HEADER.size:
+            return False
+        magic, size, checksum = BLOB_HEADER.unpack_from(self._blob, 0)
+        return (
+            magic == BLOB_MAGIC
+            and size == len(self.offsets) - 1
+            and BLOB_HEADER.size + int(self.offsets[-1]) == self.nbytes
+            and checksum == offsets_checksum(self.offsets)
+        )
+
+    @classmethod
+    def is_stale(cls, folder_path: str) -> bool:
+        path = Path(folder_path)
+        offsets_path, blob_path = path / OFFSETS_FILE, path / BLOB_FILE
+        if not offsets_path.exists() or not blob_path.exists():
+            return True
+        source_mtime = (path / METADATA_FILE).stat().st_mtime
+        return min(offsets_path.stat().st_mtime, blob_path.stat().st_mtime) < source_mtime
+
+    @classmethod
+    def build(cls, folder_path: str) -> None:
+        """
+        metadata.json으로부터 오프셋 테이블과 blob 파일 생성 (프로세스별 임시 파일에 쓴 뒤 교체)
+        """
+        metadata = read_metadata_json(folder_path)
+        slots: dict[int, DocIDMetadata] = {}
+        for doc_id, item in metadata.items():
+            if not doc_id.isdigit():
+                raise ValueError(f"mmap 메타데이터는 정수 doc_id만 지원합니다: {doc_id}")
+            slots[int(doc_id)] = item
+
+        size = max(slots) + 1 if slots else 0
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        path = Path(folder_path)
+        # 같은 metadata.json으로 만든 결과라 여러 워커가 동시에 만들어도 어느 쪽 파일이 남든 짝이 맞음
+        with atomic_write(path / BLOB_FILE) as f:
+            f.write(bytes(BLOB_HEADER.size))
+            position = 0
+            for slot in range(size):
+                if slot in slots:
+                    record = json.dumps(slots[slot], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    f.write(record)
+                    position += len(record)
+                offsets[slot + 1] = position
+            f.seek(0)
+            f.write(BLOB_HEADER.pack(BLOB_MAGIC, size, offsets_checksum(offsets)))
+        with atomic_write(path / OFFSETS_FILE) as f:
+            np.save(f, offsets)
+
+    @classmethod
+    def load(cls, folder_path: str) -> Mapping[DocId, DocIDMetadata]:
+        """
+        저장소가 없거나 metadata.json보다 오래됐으면 생성 후 로드
+        - 다른 워커가 두 파일을 교체하는 사이에 읽어 짝이 맞지 않으면 다시 생성하고, 그래도 맞지 않으면 metadata.json 사용
+        """
+        if cls.is_stale(folder_path):
+            cls.build(folder_path)
+        try:
+            return cls(folder_path)
+        except ValueError:
+            cls.build(folder_path)
+        try:
+            return cls(folder_path)
+        except ValueError as e:
+            logger.warning(f"{e}. metadata.json을 메모리로 읽습니다.")
+            return read_metadata_json(folder_path)
+
+    def _slot(self, doc_id: object) -> Optional[int]:
+        if not isinstance(doc_id, str) or not doc_id.isdigit():
+            return None
+        slot = int(doc_id)
+        if slot >= len(self.offsets) - 1 or self.offsets[slot] == self.offsets[slot + 1]:
+            return None
+        return slot
+
+    def __getitem__(self, doc_id: DocId) -> DocIDMetadata:
+        slot = self._slot(doc_id)
+        if slot is None:
+            raise KeyError(doc_id)
+        start, end = BLOB_HEADER.size + int(self.offsets[slot]), BLOB_HEADER.size + int(self.offsets[slot + 1])
+        return json.loads(bytes(self._blob[start:end]).decode("utf-8"))
+
+    def __contains__(self, doc_id: object) -> bool:
+        return self._slot(doc_id) is not None
+
+    def __iter__(self) -> Iterator[DocId]:
+        return (str(slot) for slot in self._present)
+
+    def __len__(self) -> int:
+        return len(self._present)
+
+    def close(self) -> None:
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._file.close()
+
+
+if __name__ == "__main__":
+    from config.settings import PROJECT_ROOT, settings
+    from options.insu_name import insu_match
+
+    parser = argparse.ArgumentParser(description="insu_data 컬렉션의 mmap 메타데이터 저장소 생성")
+    parser.add_argument("collections", nargs="*", help="대상 컬렉션 (기본값: insu_match 전체)")
+    args = parser.parse_args()
+
+    for collection_name in args.collections or insu_match.values():
+        collection_dir = os.path.join(PROJECT_ROOT, settings.vector_path, collection_name)
+        MmapMetadataStore.build(collection_dir)
+        print(f"{collection_name}: {len(MmapMetadataStore(collection_dir))}개 청크 저장 완료")
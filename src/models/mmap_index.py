@@ -0,0 +1,90 @@
+import os
+from typing import Any
+
+import faiss
+import numpy as np
+from numpy.typing import NDArray
+
+from util.atomic_file import atomic_write
+
+VECTORS_SUFFIX = ".vectors.npy"
+
+
+def vectors_file_name(index_path: str) -> str:
+    """
+    flat 인덱스 옆에 두는 벡터 파일 경로 (faiss.index -> faiss.vectors.npy)
+    """
+    return os.path.splitext(index_path)[0] + VECTORS_SUFFIX
+
+
+class MmapFlatIndex:
+    """
+    flat(내적) 인덱스의 벡터를 .npy로 두고 np.load(mmap_mode="r")로 읽어 정확 검색하는 인덱스
+    - faiss 1.10의 IO_FLAG_MMAP은 IndexFlat 벡터를 힙으로 복사하므로, 워커 간 페이지 캐시 공유에 사용
+    - FaissSearch, Diversifier, UnifiedIndex.build가 쓰는 faiss.Index 메서드만 제공
+    """
+
+    metric_type = faiss.METRIC_INNER_PRODUCT
+
+    def __init__(self, vectors: NDArray[np.float32]):
+        self.vectors = vectors
+        self.ntotal, self.d = vectors.shape
+
+    @classmethod
+    def is_stale(cls, index_path: str) -> bool:
+        vectors_path = vectors_file_name(index_path)
+        return not os.path.exists(vectors_path) or os.path.getmtime(vectors_path) < os.path.getmtime(index_path)
+
+    @classmethod
+    def build(cls, index_path: str) -> None:
+        """
+        flat 인덱스에서 벡터를 꺼내 .npy로 저장 (프로세스별 임시 파일에 쓴 뒤 교체)
+        """
+        index = faiss.read_index(index_path)
+        if not isinstance(index, faiss.IndexFlat) or index.metric_type != cls.metric_type:
+            raise ValueError(f"내적 flat 인덱스만 mmap 벡터 파일로 만들 수 있습니다: {index_path}")
+        vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else np.zeros((0, index.d), np.float32)
+        with atomic_write(vectors_file_name(index_path)) as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, index_path: str) -> "MmapFlatIndex":
+        if cls.is_stale(index_path):
+            cls.build(index_path)
+        return cls(np.load(vectors_file_name(index_path), mmap_mode="r"))
+
+    def sa_code_size(self) -> int:
+        return self.d * self.vectors.itemsize
+
+    def search(
+        self, x: NDArray[np.float32], k: int, params: Any = None
+    ) -> tuple[NDArray[np.float32], NDArray[np.int64]]:
+        if params is not None:
+            raise ValueError("MmapFlatIndex는 검색 파라미터를 지원하지 않습니다.")
+        distances = np.full((len(x), k), -np.finfo(np.float32).max, dtype=np.float32)
+        labels = np.full((len(x), k), -1, dtype=np.int64)
+        top = min(k, self.ntotal)
+        if top == 0:
+            return distances, labels
+
+        scores = np.asarray(self.vectors @ np.asarray(x, dtype=np.float32).T).T
+        for row, row_scores in enumerate(scores):
+            candidates = np.argpartition(-row_scores, top - 1)[:top] if top < self.ntotal else np.arange(self.ntotal)
+            # 점수 내림차순, 같은 점수는 작은 번호 먼저 (faiss와 같은 순서)
+            order = candidates[np.lexsort((candidates, -row_scores[candidates]))]
+            distances[row, :top] = row_scores[order]
+            labels[row, :top] = order
+        return distances, labels
+
+    def reconstruct(self, key: int) -> NDArray[np.float32]:
+        return np.array(self.vectors[key])
+
+    def reconstruct_n(self, i0: int, ni: int) -> NDArray[np.float32]:
+        end = i0 + ni
+        return np.array(self.vectors[i0:end])
+
+    def reconstruct_batch(self, keys: NDArray[np.int64]) -> NDArray[np.float32]:
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(keys) and (keys.min() < 0 or keys.max() >= self.ntotal):
+            raise RuntimeError("벡터 번호가 인덱스 범위를 벗어났습니다.")
+        return np.array(self.vectors[keys])
@@ -1,16 +1,57 @@
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Mapping, Optional
 
 import faiss
 import numpy as np
 from numpy.typing import NDArray
 
 from config.settings import settings
-from models.dict_types import DocId, DocIDMetadata, OrganizedCollection, RawCollection
+from models.context_builder import ChunkTokenCounts
+from models.dict_types import DEFAULT_COLLECTION, DocId, DocIDMetadata, OrganizedCollection, RawCollection
+from models.diversify import Diversifier
 from models.embeddings import UpstageEmbedding
+from models.sparse_index import reciprocal_rank_fusion
+from models.unified_index import UnifiedIndex
+from options.enums import TraceStage
+from util.tracing import tracer
 
 InsuFileNames = str
 upembedding = UpstageEmbedding(settings.upstage_api_key)
 
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def configure_faiss_threads(search_workers: int, omp_threads: Optional[int] = None) -> int:
+    """
+    FAISS OpenMP 스레드 수 설정
+    - 컬렉션 병렬 검색과 OpenMP가 코어를 나눠 쓰도록 지정하지 않으면 (코어 수 // 검색 스레드 수)
+    """
+    if omp_threads is None:
+        omp_threads = max(1, (os.cpu_count() or 1) // max(1, search_workers))
+    faiss.omp_set_num_threads(omp_threads)
+    return omp_threads
+
+
+def get_search_executor() -> Optional[ThreadPoolExecutor]:
+    """
+    컬렉션 병렬 검색용 공용 스레드 풀 (faiss_search_workers가 1 이하이면 순차 검색)
+    """
+    global _search_executor
+    if settings.faiss_search_workers <= 1:
+        return None
+    with _search_executor_lock:
+        if _search_executor is None:
+            configure_faiss_threads(settings.faiss_search_workers, settings.faiss_omp_threads)
+            _search_executor = ThreadPoolExecutor(
+                max_workers=settings.faiss_search_workers, thread_name_prefix="faiss-search"
+            )
+        return _search_executor
+
 
 class FaissSearch:
     def __init__(
@@ -19,10 +60,14 @@ class FaissSearch:
         total_collections: list[RawCollection],
         collection_names: list[InsuFileNames] = [],
         top_k: int = 2,
+        unified_index: Optional[UnifiedIndex] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        hybrid: Optional[bool] = None,
+        diversifier: Optional[Diversifier] = None,
     ):
         self.query = query
         self.default_document = {
-            "collection": "default",
+            "collection": DEFAULT_COLLECTION,
             "id": "0",
             "score": 1.0,
             "metadata": {"text": "로드된 컬렉션이 없습니다."},
@@ -35,6 +80,14 @@ class FaissSearch:
         ]
         self.logger = logging.getLogger(self.__class__.__name__)
         self.top_k = top_k
+        self.unified_index = unified_index
+        self.executor = executor if executor is not None else get_search_executor()
+        self.diversifier = diversifier
+        # 컬렉션마다 남길 결과 수 (MMR은 더 넓은 후보를 가져온 뒤 전체에서 top_k * 컬렉션 수만큼 고름)
+        self.collection_k = diversifier.candidates_per_collection(top_k) if diversifier is not None else top_k
+        # 하이브리드 검색은 벡터/BM25 후보를 더 많이 가져와 RRF로 합친 뒤 collection_k개만 남김
+        self.hybrid = settings.hybrid_search if hybrid is None else hybrid
+        self.search_k = max(self.collection_k, settings.hybrid_candidates) if self.hybrid else self.collection_k
 
     def pad_embedding(
         self, query_embedding: NDArray[np.float32], index: faiss.Index, query_dim: int
@@ -45,11 +98,11 @@ class FaissSearch:
             return query_embedding
 
         if query_dim < index_dim:
-            padded_embedding = np.zeros((1, index_dim), dtype=query_embedding.dtype)
-            padded_embedding[0, :query_dim] = query_embedding[0, :]
+            padded_embedding = np.zeros((query_embedding.shape[0], index_dim), dtype=query_embedding.dtype)
+            padded_embedding[:, :query_dim] = query_embedding
             return padded_embedding
 
-        trimmed_embedding = query_embedding[0, :index_dim].reshape(1, -1)
+        trimmed_embedding = np.ascontiguousarray(query_embedding[:, :index_dim])
         return trimmed_embedding
 
     def search_L2_index_by_query(
@@ -57,16 +110,78 @@ class FaissSearch:
     ) -> tuple[NDArray[np.float32], NDArray[np.int64]]:
         faiss.normalize_L2(query_embedding)
 
-        distance, indices = index.search(query_embedding, self.top_k)
+        distance, indices = index.search(query_embedding, self.search_k)
         distance = np.minimum(distance, 1.0)
         return distance[0], indices[0]
 
+    def search_unified_index(
+        self, unified_index: UnifiedIndex, query_embedding: NDArray[np.float32], query_dim: int
+    ) -> dict[InsuFileNames, tuple[NDArray[np.float32], NDArray[np.int64]]]:
+        """
+        통합 인덱스에서 한 번에 검색한 뒤 컬렉션별 (distance, indices)로 나눔
+        """
+        query_embedding = self.pad_embedding(query_embedding, unified_index.index, query_dim).copy()
+        faiss.normalize_L2(query_embedding)
+        collection_names = [collection["name"] for collection in self.target_collections]
+        hits = unified_index.search(query_embedding, collection_names, self.search_k)
+        return {name: (np.minimum(distance, 1.0), indices) for name, (distance, indices) in hits.items()}
+
+    def search_collection(
+        self, collection: RawCollection, query_embedding: NDArray[np.float32], query_dim: int
+    ) -> tuple[NDArray[np.float32], NDArray[np.int64], float]:
+        """
+        컬렉션 하나를 검색하고 (distance, indices, 소요 시간)을 반환
+        - 병렬 검색 시 스레드끼리 공유하지 않도록 쿼리 벡터를 복사해서 사용
+        """
+        started = time.perf_counter()
+        index = collection["index"]
+        padded_embedding = self.pad_embedding(query_embedding, index, query_dim).copy()
+        score, indices = self.search_L2_index_by_query(index, padded_embedding)
+        return score, indices, time.perf_counter() - started
+
+    def search_collections(
+        self, collections: list[RawCollection], query_embedding: NDArray[np.float32], query_dim: int
+    ) -> list[tuple[NDArray[np.float32], NDArray[np.int64], float]]:
+        """
+        컬렉션별 검색 결과를 collections 순서대로 반환 (executor가 있으면 병렬 검색)
+        """
+        if self.executor is None or len(collections) <= 1:
+            return [self.search_collection(collection, query_embedding, query_dim) for collection in collections]
+        futures = [
+            self.executor.submit(self.search_collection, collection, query_embedding, query_dim)
+            for collection in collections
+        ]
+        return [future.result() for future in futures]
+
+    def fuse_sparse_hits(
+        self, collection: RawCollection, distances: NDArray[np.float32], indices: NDArray[np.int64]
+    ) -> tuple[NDArray[np.float32], NDArray[np.int64]]:
+        """
+        벡터 검색 순위와 BM25 순위를 RRF로 합쳐 collection_k개의 (RRF 점수, 문서 번호) 반환
+        - BM25 인덱스가 없는 컬렉션은 벡터 검색 결과를 그대로 사용
+        """
+        sparse_index = collection.get("sparse_index")
+        collection_k = self.collection_k
+        if not self.hybrid or sparse_index is None:
+            return distances[:collection_k], indices[:collection_k]
+
+        sparse_ids, _ = sparse_index.search(self.query, self.search_k)
+        vector_ids = [int(doc_id) for doc_id in indices if doc_id != -1]
+        fused = reciprocal_rank_fusion([vector_ids, sparse_ids.tolist()], k=settings.rrf_k)[:collection_k]
+        if not fused:
+            return distances[:collection_k], indices[:collection_k]
+        return (
+            np.array([score for _, score in fused], dtype=np.float32),
+            np.array([doc_id for doc_id, _ in fused], dtype=np.int64),
+        )
+
     def search_metadata_by_index(
         self,
         distances: NDArray[np.float32],
         indices: NDArray[np.int64],
-        metadata: dict[DocId, DocIDMetadata],
+        metadata: Mapping[DocId, DocIDMetadata],
         collection_filename: str,
+        token_counts: Optional[ChunkTokenCounts] = None,
     ) -> list[OrganizedCollection]:
         self.logger.info(f"검색 중: {collection_filename} 컬렉션")
         collection_results: list[OrganizedCollection] = []
@@ -78,15 +193,15 @@ class FaissSearch:
                 collection_results.append(self.default_document)
                 continue
 
-            doc_metadata = metadata[doc_id]
-            collection_results.append(
-                {
-                    "collection": collection_filename,
-                    "doc_id": doc_id,
-                    "score": float(dist),
-                    "metadata": doc_metadata,
-                }
-            )
+            result: OrganizedCollection = {
+                "collection": collection_filename,
+                "doc_id": doc_id,
+                "score": float(dist),
+                "metadata": metadata[doc_id],
+            }
+            if token_counts is not None:
+                result["tokens"] = token_counts.count(doc_id, result["metadata"])
+            collection_results.append(result)
         return collection_results
 
     def get_results(self) -> list[dict[DocId, DocIDMetadata]]:
@@ -99,16 +214,90 @@ class FaissSearch:
             return [self.default_document]
 
         total_collection_result: list[dict[DocId, DocIDMetadata]] = []
-        query_embedding = upembedding.get_upstage_embedding(self.query)
+        with tracer.span(TraceStage.EMBEDDING):
+            query_embedding = upembedding.get_upstage_embedding(self.query)
         query_dim = query_embedding.shape[1]
+        with tracer.span(TraceStage.FAISS_SEARCH, collections=len(self.target_collections)):
+            unified_hits = (
+                self.search_unified_index(self.unified_index, query_embedding, query_dim) if self.unified_index else {}
+            )
+            # 통합 인덱스에 없는 컬렉션만 개별 검색, 결과는 target_collections 순서로 합침
+            pending = [collection for collection in self.target_collections if collection["name"] not in unified_hits]
+            started = time.perf_counter()
+            collection_hits = {
+                collection["name"]: hit
+                for collection, hit in zip(pending, self.search_collections(pending, query_embedding, query_dim))
+            }
+        if pending:
+            mode = "병렬" if self.executor and len(pending) > 1 else "순차"
+            self.logger.info(f"컬렉션 {len(pending)}개 검색 ({mode}): {(time.perf_counter() - started) * 1000:.1f}ms")
         for collection in self.target_collections:
-            index = collection["index"]
-            metadata = collection["metadata"]
             collection_name = collection["name"]
-            query_embedding = self.pad_embedding(query_embedding, index, query_dim)
-            score, indices = self.search_L2_index_by_query(index, query_embedding)
-            collection_results = self.search_metadata_by_index(score, indices, metadata, collection_name)
+            if collection_name in unified_hits:
+                score, indices = unified_hits[collection_name]
+            else:
+                score, indices, elapsed = collection_hits[collection_name]
+                self.logger.info(f"{collection_name} 검색 시간: {elapsed * 1000:.1f}ms")
+            score, indices = self.fuse_sparse_hits(collection, score, indices)
+            collection_results = self.search_metadata_by_index(
+                score, indices, collection["metadata"], collection_name, collection.get("token_counts")
+            )
             total_collection_result.extend(collection_results)
         self.logger.info(f"총 {len(total_collection_result)}개 청크 검색됨")
+        if self.diversifier is not None:
+            total_collection_result = self.diversifier.diversify(
+                total_collection_result, self.target_collections, k=self.top_k * len(self.target_collections)
+            ).kept
         self.logger.info("-------- 벡터 검색 완료 --------")
         return total_collection_result if total_collection_result else [self.default_document]
+
+
+class BatchFaissSearch(FaissSearch):
+    """
+    여러 질문을 (n, d) 행렬로 한 번에 검색하는 배치 모드 (회귀 평가/캐시 워밍용)
+    - 컬렉션마다 index.search를 행렬 전체에 대해 한 번만 호출
+    - 질문별 결과는 FaissSearch.get_results와 같은 형식 (벡터 검색만 수행)
+    """
+
+    def __init__(
+        self,
+        queries: list[str],
+        total_collections: list[RawCollection],
+        collection_names: list[InsuFileNames] = [],
+        top_k: int = 2,
+    ):
+        super().__init__("", total_collections, collection_names, top_k, hybrid=False)
+        self.queries = queries
+
+    def search_L2_index_by_queries(
+        self, index: faiss.Index, query_embeddings: NDArray[np.float32]
+    ) -> tuple[NDArray[np.float32], NDArray[np.int64]]:
+        faiss.normalize_L2(query_embeddings)
+        distances, indices = index.search(query_embeddings, self.top_k)
+        return np.minimum(distances, 1.0), indices
+
+    def get_batch_results(
+        self, query_embeddings: Optional[NDArray[np.float32]] = None
+    ) -> list[list[OrganizedCollection]]:
+        if not self.queries:
+            return []
+        if not self.collections or not self.target_collections:
+            return [[self.default_document] for _ in self.queries]
+
+        if query_embeddings is None:
+            query_embeddings = upembedding.embed_queries(self.queries)
+        query_dim = query_embeddings.shape[1]
+        self.logger.info(f"배치 검색: 질문 {len(self.queries)}개, 컬렉션 {len(self.target_collections)}개")
+
+        batch_results: list[list[OrganizedCollection]] = [[] for _ in self.queries]
+        for collection in self.target_collections:
+            index = collection["index"]
+            padded = self.pad_embedding(query_embeddings, index, query_dim).copy()
+            distances, indices = self.search_L2_index_by_queries(index, padded)
+            for query_results, distance, index_row in zip(batch_results, distances, indices):
+                query_results.extend(
+                    self.search_metadata_by_index(
+                        distance, index_row, collection["metadata"], collection["name"], collection.get("token_counts")
+                    )
+                )
+        return [query_results or [self.default_document] for query_results in batch_results]
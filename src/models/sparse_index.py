@@ -0,0 +1,179 @@
+import argparse
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from models.dict_types import DocId, DocIDMetadata
+from models.metadata_store import METADATA_FILE, read_metadata_json
+from util.atomic_file import atomic_write
+
+SPARSE_INDEX_FILE = "bm25.npz"
+# 한글/영문/숫자와 질병코드의 "."(F43.1)을 한 단어로 취급
+WORD_PATTERN = re.compile(r"[0-9a-z가-힣]+(?:\.[0-9a-z가-힣]+)*")
+
+
+def tokenize(text: str, ngram: int = 2) -> list[str]:
+    """
+    단어 자체 + 단어 내부 글자 n-gram
+    - 조사가 붙은 한국어 단어("보험은")도 n-gram("보험")으로 매칭
+    - 약관 조항 번호, KCD 코드(F43.1), 영문 약어(PTSD)는 단어 단위로도 정확히 매칭
+    """
+    tokens: list[str] = []
+    for word in WORD_PATTERN.findall(unicodedata.normalize("NFC", text).lower()):
+        tokens.append(word)
+        if len(word) > ngram:
+            tokens.extend(word[start:stop] for start, stop in zip(range(len(word)), range(ngram, len(word) + 1)))
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = 60) -> list[tuple[int, float]]:
+    """
+    여러 순위 목록을 RRF(1 / (k + 순위))로 합쳐 점수 내림차순으로 반환 (동점이면 먼저 등장한 문서 우선)
+    """
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """
+    컬렉션 metadata.json의 청크 text에 대한 BM25 역색인
+    - 단어별 posting(문서 번호, BM25 가중치)을 미리 계산해 검색은 배열 덧셈만 수행
+    - doc_ids는 FAISS 벡터 번호(= metadata.json 키)와 같음
+    """
+
+    def __init__(
+        self,
+        terms: NDArray[np.str_],
+        offsets: NDArray[np.int64],
+        postings: NDArray[np.int32],
+        weights: NDArray[np.float32],
+        doc_ids: NDArray[np.int64],
+    ):
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.weights = weights
+        self.doc_ids = doc_ids
+        self.vocabulary = {term: term_id for term_id, term in enumerate(terms.tolist())}
+
+    @classmethod
+    def build(cls, metadata: Mapping[DocId, DocIDMetadata], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        doc_ids: list[int] = []
+        term_freqs: list[Counter[str]] = []
+        for doc_id, item in metadata.items():
+            if not doc_id.isdigit():
+                continue
+            doc_ids.append(int(doc_id))
+            term_freqs.append(Counter(tokenize(item.get("text") or "")))
+
+        num_docs = len(doc_ids)
+        doc_lengths = np.array([sum(freqs.values()) for freqs in term_freqs], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if num_docs and doc_lengths.mean() > 0 else 1.0
+
+        postings_by_term: dict[str, list[tuple[int, int]]] = {}
+        for slot, freqs in enumerate(term_freqs):
+            for term, freq in freqs.items():
+                postings_by_term.setdefault(term, []).append((slot, freq))
+
+        terms = sorted(postings_by_term)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        postings: list[int] = []
+        weights: list[float] = []
+        for term_id, term in enumerate(terms):
+            term_postings = postings_by_term[term]
+            idf = math.log(1.0 + (num_docs - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for slot, freq in term_postings:
+                norm = k1 * (1.0 - b + b * doc_lengths[slot] / avg_length)
+                postings.append(slot)
+                weights.append(idf * freq * (k1 + 1.0) / (freq + norm))
+            offsets[term_id + 1] = len(postings)
+
+        return cls(
+            np.array(terms, dtype=np.str_),
+            offsets,
+            np.array(postings, dtype=np.int32),
+            np.array(weights, dtype=np.float32),
+            np.array(doc_ids, dtype=np.int64),
+        )
+
+    def search(self, query: str, top_k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        (doc_ids, scores)를 점수 내림차순으로 반환. 질의 단어가 하나도 없는 문서는 제외
+        """
+        term_ids = {self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary}
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.postings[start:end]] += self.weights[start:end]
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        # 동점이면 문서 번호 순으로 정렬해 결과를 결정적으로 유지
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return self.doc_ids[candidates], scores[candidates]
+
+    def save(self, folder_path: str) -> None:
+        # 여러 워커가 같은 컬렉션을 동시에 로드해도 서로의 임시 파일을 덮어쓰지 않도록 프로세스별 임시 파일 사용
+        with atomic_write(Path(folder_path) / SPARSE_INDEX_FILE) as f:
+            np.savez(
+                f,
+                terms=self.terms,
+                offsets=self.offsets,
+                postings=self.postings,
+                weights=self.weights,
+                doc_ids=self.doc_ids,
+            )
+
+    @classmethod
+    def is_stale(cls, folder_path: str) -> bool:
+        path = Path(folder_path)
+        index_path = path / SPARSE_INDEX_FILE
+        if not index_path.exists():
+            return True
+        return index_path.stat().st_mtime < (path / METADATA_FILE).stat().st_mtime
+
+    @classmethod
+    def load(cls, folder_path: str, metadata: Optional[Mapping[DocId, DocIDMetadata]] = None) -> "BM25Index":
+        """
+        bm25.npz 로드. 파일이 없거나 metadata.json보다 오래됐으면 metadata로 다시 생성해 저장
+        """
+        if cls.is_stale(folder_path):
+            index = cls.build(metadata if metadata is not None else read_metadata_json(folder_path))
+            index.save(folder_path)
+            return index
+
+        with np.load(Path(folder_path) / SPARSE_INDEX_FILE) as data:
+            return cls(data["terms"], data["offsets"], data["postings"], data["weights"], data["doc_ids"])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.terms.nbytes + self.offsets.nbytes + self.postings.nbytes + self.weights.nbytes)
+
+
+if __name__ == "__main__":
+    from config.settings import PROJECT_ROOT, settings
+    from options.insu_name import insu_match
+
+    parser = argparse.ArgumentParser(description="insu_data 컬렉션별 BM25 희소 인덱스(bm25.npz) 생성")
+    parser.add_argument("collections", nargs="*", help="대상 컬렉션 (기본값: insu_match 전체)")
+    args = parser.parse_args()
+
+    for collection_name in args.collections or insu_match.values():
+        folder_path = os.path.join(PROJECT_ROOT, settings.vector_path, collection_name)
+        sparse_index = BM25Index.build(read_metadata_json(folder_path))
+        sparse_index.save(folder_path)
+        print(
+            f"{collection_name}: 문서 {len(sparse_index.doc_ids)}개, 단어 {len(sparse_index.terms)}개, "
+            f"{sparse_index.nbytes / 1024 / 1024:.1f}MB"
+        )
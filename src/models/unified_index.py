@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+import faiss
+import numpy as np
+from numpy.typing import NDArray
+
+from models.dict_types import InsuFileName
+from models.index_builder import index_file_name
+from options.enums import IndexVariant
+from util.atomic_file import atomic_write
+
+# 통합 인덱스의 벡터 id = (컬렉션 번호 << COLLECTION_ID_SHIFT) | 컬렉션 내 벡터 번호
+COLLECTION_ID_SHIFT = 40
+UNIFIED_INDEX_FILE = "faiss.index"
+UNIFIED_COLLECTIONS_FILE = "collections.json"
+
+CollectionHits = tuple[NDArray[np.float32], NDArray[np.int64]]
+SourceFingerprint = dict[str, int]
+
+
+def source_fingerprint(collection_dir: str, ntotal: int) -> SourceFingerprint:
+    """
+    통합 인덱스를 만든 원본 컬렉션 식별값 (벡터 수 + 원본 faiss.index 크기/수정 시각)
+    """
+    stat = os.stat(os.path.join(collection_dir, index_file_name(IndexVariant.FLAT)))
+    return {"ntotal": int(ntotal), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class UnifiedIndex:
+    """
+    모든 insu_data 컬렉션을 하나로 합친 인덱스
+    - 한 번의 index.search로 여러 보험사 결과를 가져온 뒤 컬렉션 id로 나눔
+    - top_k를 채우지 못한 컬렉션만 IDSelectorRange로 해당 컬렉션만 다시 검색
+    - 컬렉션별로 따로 검색한 결과와 동일한 결과를 보장
+    - 원본 컬렉션 식별값(sources)을 함께 저장해 컬렉션을 다시 수집하면 stale_collections로 감지
+    """
+
+    def __init__(
+        self,
+        index: faiss.Index,
+        collection_names: list[InsuFileName],
+        collection_sizes: list[int],
+        sources: Optional[list[SourceFingerprint]] = None,
+    ):
+        self.index = index
+        self.collection_names = collection_names
+        self.collection_sizes = collection_sizes
+        self.sources = sources
+        self.collection_ids = {name: i for i, name in enumerate(collection_names)}
+
+    @property
+    def d(self) -> int:
+        return self.index.d
+
+    @property
+    def _empty_distance(self) -> float:
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return float(-np.finfo(np.float32).max)
+        return float(np.finfo(np.float32).max)
+
+    @classmethod
+    def build(
+        cls, collections: Iterable[tuple[InsuFileName, faiss.Index]], base_path: Optional[str] = None
+    ) -> "UnifiedIndex":
+        """
+        base_path를 주면 각 컬렉션(base_path/<이름>)의 식별값을 함께 기록
+        """
+        unified: Optional[faiss.Index] = None
+        names: list[InsuFileName] = []
+        sizes: list[int] = []
+        sources: Optional[list[SourceFingerprint]] = [] if base_path else None
+        for collection_id, (name, index) in enumerate(collections):
+            if unified is None:
+                unified = faiss.IndexIDMap2(faiss.IndexFlat(index.d, index.metric_type))
+            if index.d != unified.d or index.metric_type != unified.metric_type:
+                raise ValueError(f"{name} 컬렉션의 차원 또는 거리 기준이 다른 컬렉션과 다릅니다.")
+            vectors = index.reconstruct_n(0, index.ntotal)
+            ids = (np.int64(collection_id) << COLLECTION_ID_SHIFT) | np.arange(index.ntotal, dtype=np.int64)
+            unified.add_with_ids(vectors, ids)
+            names.append(name)
+            sizes.append(int(index.ntotal))
+            if sources is not None and base_path:
+                sources.append(source_fingerprint(os.path.join(base_path, name), index.ntotal))
+
+        if unified is None:
+            raise ValueError("통합 인덱스를 만들 컬렉션이 없습니다.")
+        return cls(unified, names, sizes, sources)
+
+    def save(self, folder_path: str) -> None:
+        path = Path(folder_path)
+        path.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path / UNIFIED_INDEX_FILE) as f:
+            faiss.write_index(self.index, f.name)
+        with atomic_write(path / UNIFIED_COLLECTIONS_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {"names": self.collection_names, "sizes": self.collection_sizes, "sources": self.sources},
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, folder_path: str) -> "UnifiedIndex":
+        path = Path(folder_path)
+        index = faiss.read_index(str(path / UNIFIED_INDEX_FILE))
+        with open(path / UNIFIED_COLLECTIONS_FILE, "r", encoding="utf-8") as f:
+            collections = json.load(f)
+        return cls(index, collections["names"], collections["sizes"], collections.get("sources"))
+
+    def stale_collections(
+        self, base_path: str, ntotals: Optional[Mapping[InsuFileName, int]] = None
+    ) -> list[InsuFileName]:
+        """
+        통합 인덱스를 만든 뒤 바뀐(다시 수집되거나 사라진) 컬렉션 목록. 식별값이 없는 이전 형식은 전체를 반환
+        - ntotals: 이미 로드된 컬렉션의 현재 벡터 수
+        """
+        if self.sources is None:
+            return list(self.collection_names)
+        stale = []
+        for name, source in zip(self.collection_names, self.sources):
+            ntotal = (ntotals or {}).get(name, source["ntotal"])
+            try:
+                current = source_fingerprint(os.path.join(base_path, name), ntotal)
+            except FileNotFoundError:
+                current = None
+            if current != source:
+                stale.append(name)
+        return stale
+
+    def _search_collection(self, query: NDArray[np.float32], collection_id: int, top_k: int) -> CollectionHits:
+        lower = collection_id << COLLECTION_ID_SHIFT
+        params = faiss.SearchParameters(sel=faiss.IDSelectorRange(lower, lower + (1 << COLLECTION_ID_SHIFT)))
+        distances, ids = self.index.search(query, top_k, params=params)
+        local_ids = np.where(ids[0] >= 0, ids[0] & ((1 << COLLECTION_ID_SHIFT) - 1), -1)
+        return distances[0], local_ids
+
+    def search(
+        self, query: NDArray[np.float32], collection_names: list[InsuFileName], top_k: int
+    ) -> dict[InsuFileName, CollectionHits]:
+        """
+        정규화된 (1, d) 쿼리로 컬렉션별 top_k 반환. 통합 인덱스에 없는 컬렉션은 결과에서 빠짐
+        """
+        collection_ids = [self.collection_ids[name] for name in collection_names if name in self.collection_ids]
+        if not collection_ids:
+            return {}
+
+        search_k = min(top_k * len(collection_ids), self.index.ntotal)
+        distances, ids = self.index.search(query, search_k) if search_k > 0 else (np.empty((1, 0)), np.empty((1, 0)))
+        hits: dict[int, tuple[list[float], list[int]]] = {collection_id: ([], []) for collection_id in collection_ids}
+        for distance, vector_id in zip(distances[0], ids[0]):
+            if vector_id < 0:
+                continue
+            collection_hits = hits.get(int(vector_id >> COLLECTION_ID_SHIFT))
+            if collection_hits is not None and len(collection_hits[0]) < top_k:
+                collection_hits[0].append(float(distance))
+                collection_hits[1].append(int(vector_id & ((1 << COLLECTION_ID_SHIFT) - 1)))
+
+        results: dict[InsuFileName, CollectionHits] = {}
+        for collection_id in collection_ids:
+            collection_distances, local_ids = hits[collection_id]
+            name = self.collection_names[collection_id]
+            if len(local_ids) < min(top_k, self.collection_sizes[collection_id]):
+                # 다른 보험사 결과에 밀려 top_k를 채우지 못한 경우 해당 컬렉션만 다시 검색
+                results[name] = self._search_collection(query, collection_id, top_k)
+                continue
+            padding = top_k - len(local_ids)
+            results[name] = (
+                np.array(collection_distances + [self._empty_distance] * padding, dtype=np.float32),
+                np.array(local_ids + [-1] * padding, dtype=np.int64),
+            )
+        return results
+
+
+if __name__ == "__main__":
+    from config.settings import PROJECT_ROOT, settings
+    from models.collection_loader import CollectionLoader
+    from options.insu_name import insu_match
+
+    parser = argparse.ArgumentParser(description="insu_data 컬렉션을 하나의 통합 인덱스로 생성")
+    parser.add_argument("--out", default=settings.unified_index_path, help="통합 인덱스 저장 경로")
+    parser.add_argument("collections", nargs="*", help="대상 컬렉션 (기본값: insu_match 전체)")
+    args = parser.parse_args()
+
+    def read_collections() -> Iterable[tuple[InsuFileName, faiss.Index]]:
+        for collection_name in args.collections or insu_match.values():
+            index, _ = CollectionLoader.load_local(os.path.join(PROJECT_ROOT, settings.vector_path, collection_name))
+            print(f"{collection_name}: {index.ntotal}개 벡터 추가")
+            yield collection_name, index
+
+    unified_index = UnifiedIndex.build(read_collections(), base_path=os.path.join(PROJECT_ROOT, settings.vector_path))
+    out_path = args.out if os.path.isabs(args.out) else os.path.join(PROJECT_ROOT, args.out)
+    unified_index.save(out_path)
+    print(f"통합 인덱스 저장 완료: {out_path} ({unified_index.index.ntotal}개 벡터)")
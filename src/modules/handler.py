@@ -1,47 +1,128 @@
+import asyncio
 import copy
 import os
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, NamedTuple, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from config.settings import settings
+from db.premium_cube import PremiumCubeStore, premium_cube_store
+from db.query_cache import QueryCache, query_cache
+from db.sql_templates import SQLQuery, parse_comparison_question
 from db.sql_utils import QueryExecutor, SQLGenerator, TemplateManager
+from models.answer_cache import SemanticAnswerCache, answer_cache, collection_scope
 from models.collection_loader import CollectionLoader
+from models.collection_registry import collection_registry
+from models.diversify import Diversifier, chunk_diversifier
 from models.embeddings import UpstageEmbedding
-from models.generate_answer import PolicyResponse
+from models.generate_answer import GUIDANCE_MESSAGES, PolicyResponse
 from models.search import FaissSearch
+from modules.intent_classifier import LocalIntentClassifier
 from modules.user_state import UserState
-from options.enums import IntentType, ModelType
+from options.enums import IntentType, ModelType, StreamChunkKind, TraceStage
+from util.tracing import tracer
 from util.utils import find_matching_collections
 
 
+class StreamTimings(NamedTuple):
+    first_token: Optional[float]  # 요청 시작부터 첫 답변 토큰까지 (초)
+    total: float  # 요청 시작부터 마지막 토큰까지 (초)
+
+
+class StreamChunk(NamedTuple):
+    kind: StreamChunkKind
+    content: str = ""
+    timings: Optional[StreamTimings] = None
+
+
 class Handler(ABC):
-    def __init__(self, openai_client: OpenAI, template_manager: TemplateManager):
+    def __init__(
+        self,
+        openai_client: OpenAI,
+        template_manager: TemplateManager,
+        async_openai_client: Optional[AsyncOpenAI] = None,
+    ):
         self.openai_client = openai_client
         self.template_manager = template_manager
+        self.async_openai_client = async_openai_client
 
     @abstractmethod
     def handle(self, user_input: str) -> str:
         raise NotImplementedError("Handler should be implemented")
 
+    async def ahandle(self, user_input: str) -> str:
+        # 비동기 구현이 없는 핸들러는 워커 스레드에서 실행해 이벤트 루프를 막지 않음
+        return await asyncio.to_thread(self.handle, user_input)
+
+    async def astream(self, user_input: str) -> AsyncIterator[StreamChunk]:
+        # 스트리밍 구현이 없는 핸들러는 전체 응답을 토큰 하나로 보냄
+        yield StreamChunk(StreamChunkKind.TOKEN, await self.ahandle(user_input))
+
+
+intent_classifier = (
+    LocalIntentClassifier(threshold=settings.intent_confidence_threshold) if settings.local_intent_enabled else None
+)
+
 
 class IntentHandler(Handler):
     system_prompt = "너는 GA 보험설계사들이 사용하는 보험전문 챗봇이야."
 
-    def __init__(self, openai_client: OpenAI, template_manager: TemplateManager):
-        super().__init__(openai_client, template_manager)
+    def __init__(
+        self,
+        openai_client: OpenAI,
+        template_manager: TemplateManager,
+        classifier: Optional[LocalIntentClassifier] = intent_classifier,
+        async_openai_client: Optional[AsyncOpenAI] = None,
+    ):
+        super().__init__(openai_client, template_manager, async_openai_client)
+        self.classifier = classifier
 
-    def handle(self, user_input: str) -> str:
+    def classify_locally(self, user_input: str) -> Optional[str]:
+        # 키워드만으로 확실한 질문은 LLM 호출 없이 바로 분류
+        if self.classifier is None:
+            return None
+        return self.classifier.classify(user_input)
+
+    def messages(self, user_input: str) -> list[dict[str, str]]:
         intent_template_prompt = self.template_manager.render("intent_prompt.jinja2", question=user_input)
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": intent_template_prompt},
+        ]
+
+    def request_intent(self, user_input: str) -> str:
         response = self.openai_client.chat.completions.create(
             model=ModelType.INTENT_MODEL,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": intent_template_prompt},
-            ],
+            messages=self.messages(user_input),
         )
+        tracer.record_openai_usage(response)
         return response.choices[0].message.content
 
+    def handle(self, user_input: str) -> str:
+        with tracer.span(TraceStage.INTENT) as span:
+            intent = self.classify_locally(user_input)
+            span.set(source="local" if intent is not None else "llm")
+            if intent is not None:
+                return intent
+            return self.request_intent(user_input)
+
+    async def ahandle(self, user_input: str) -> str:
+        with tracer.span(TraceStage.INTENT) as span:
+            intent = self.classify_locally(user_input)
+            span.set(source="local" if intent is not None else "llm")
+            if intent is not None:
+                return intent
+
+            if self.async_openai_client is None:
+                return await asyncio.to_thread(self.request_intent, user_input)
+            response = await self.async_openai_client.chat.completions.create(
+                model=ModelType.INTENT_MODEL,
+                messages=self.messages(user_input),
+            )
+            tracer.record_openai_usage(response)
+            return response.choices[0].message.content
+
 
 class CompareHandler(Handler):
     def __init__(
@@ -51,23 +132,74 @@ class CompareHandler(Handler):
         execute_query: QueryExecutor,
         sql_generator: SQLGenerator,
         user_state: UserState,
+        async_openai_client: Optional[AsyncOpenAI] = None,
+        query_cache: Optional[QueryCache] = None,
+        premium_cube: Optional[PremiumCubeStore] = None,
     ):
-        super().__init__(openai_client, template_manager)
+        super().__init__(openai_client, template_manager, async_openai_client)
         self.user_state = copy.copy(user_state)
         self.sql_generator = sql_generator
         self.execute_query = execute_query
+        self.query_cache = query_cache
+        self.premium_cube = premium_cube
 
     def print_settings(self, user_state: UserState) -> None:
         print(repr(user_state))
 
+    def cached_sql(self, user_input: str) -> Optional[SQLQuery]:
+        if self.query_cache is None:
+            return None
+        generated_sql = self.query_cache.get_sql(user_input, self.user_state)
+        if generated_sql is not None:
+            print("[캐시] SQL 캐시 적중")
+        return generated_sql
+
+    def cache_sql(self, user_input: str, generated_sql: SQLQuery) -> None:
+        if self.query_cache is not None:
+            self.query_cache.put_sql(user_input, self.user_state, generated_sql)
+
+    def answer_from_cube(self, user_input: str) -> Optional[str]:
+        """
+        템플릿으로 해석되는 질문은 SQL 대신 메모리의 보험료 큐브에서 바로 집계
+        """
+        if self.premium_cube is None:
+            return None
+        comparison_query = parse_comparison_question(user_input)
+        if comparison_query is None:
+            return None
+        with tracer.span(TraceStage.DB_EXECUTE, source="premium_cube"):
+            results = self.premium_cube.get().answer(comparison_query, self.user_state)
+        self.print_settings(self.user_state)
+        print(f"[보험료 큐브] {comparison_query.kind}")
+        return self.execute_query.format_cube_results(f"premium_cube:{comparison_query.kind}", self.user_state, results)
+
     def handle(self, user_input: str) -> str:
         curr_user_state = UserState.update_by_user_input_none(self.user_state, user_input)
         self.user_state = curr_user_state
-        generated_sql = self.sql_generator.generate(user_input, self.user_state)
+        cube_answer = self.answer_from_cube(user_input)
+        if cube_answer is not None:
+            return cube_answer
+        generated_sql = self.cached_sql(user_input)
+        if generated_sql is None:
+            generated_sql = self.sql_generator.generate(user_input, self.user_state)
+            self.cache_sql(user_input, generated_sql)
         self.print_settings(self.user_state)
         search_result = self.execute_query.execute_sql_query(generated_sql, self.user_state)
         return search_result
 
+    async def ahandle(self, user_input: str) -> str:
+        self.user_state = UserState.update_by_user_input_none(self.user_state, user_input)
+        # 큐브 집계는 마이크로초 단위지만 첫 로드/갱신 확인은 DB를 읽으므로 워커 스레드에서 실행
+        cube_answer = await asyncio.to_thread(self.answer_from_cube, user_input)
+        if cube_answer is not None:
+            return cube_answer
+        generated_sql = self.cached_sql(user_input)
+        if generated_sql is None:
+            generated_sql = await self.sql_generator.agenerate(user_input, self.user_state)
+            self.cache_sql(user_input, generated_sql)
+        self.print_settings(self.user_state)
+        return await self.execute_query.aexecute_sql_query(generated_sql, self.user_state)
+
 
 class PolicyHandler(Handler):
     def __init__(
@@ -76,12 +208,18 @@ class PolicyHandler(Handler):
         template_manager: TemplateManager,
         collection_loader: CollectionLoader,
         response_policy: PolicyResponse,
+        async_openai_client: Optional[AsyncOpenAI] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        diversifier: Optional[Diversifier] = None,
     ):
-        super().__init__(openai_client, template_manager)
+        super().__init__(openai_client, template_manager, async_openai_client)
         self.collections: list[str] = []
         self.loader = collection_loader
         self.response_policy = response_policy
+        self.answer_cache = answer_cache
+        self.diversifier = diversifier
 
+    @tracer.traced(TraceStage.COLLECTION_LOAD)
     def load_collections(self, user_input: str) -> None:
         available_collections = [
             collection_name
@@ -96,26 +234,103 @@ class PolicyHandler(Handler):
         for use_collection_name in self.use_collections:
             self.loader.load_collection(use_collection_name)
 
-    def handle(self, user_input: str) -> str:
-        self.load_collections(user_input)
+    def search(self, user_input: str) -> list[dict]:
+        unified_index = self.loader.registry.get_unified_index() if self.loader.registry else None
+        return FaissSearch(
+            user_input,
+            self.loader.collections,
+            self.use_collections,
+            top_k=2,
+            unified_index=unified_index,
+            diversifier=self.diversifier,
+        ).get_results()
+
+    def find_cached_answer(self, user_input: str) -> Optional[str]:
+        if self.answer_cache is None:
+            return None
+        return self.answer_cache.lookup(user_input, collection_scope(self.loader.base_path, self.use_collections))
 
-        search_results = FaissSearch(user_input, self.loader.collections, self.use_collections, top_k=2).get_results()
+    def cache_answer(self, user_input: str, answer: str) -> None:
+        # 검색 컨텍스트 없이 나온 안내 문구는 캐시하지 않음 (컬렉션 재적재 후에도 계속 반환되지 않도록)
+        if self.answer_cache is None or not answer.strip() or answer in GUIDANCE_MESSAGES:
+            return
+        self.answer_cache.store(user_input, collection_scope(self.loader.base_path, self.use_collections), answer)
 
+    def handle(self, user_input: str) -> str:
+        self.load_collections(user_input)
+        cached_answer = self.find_cached_answer(user_input)
+        if cached_answer is not None:
+            return cached_answer
+        search_results = self.search(user_input)
         answer = self.response_policy.generate_answer(user_input, search_results)
+        self.cache_answer(user_input, answer)
+        return answer
+
+    async def ahandle(self, user_input: str) -> str:
+        # 컬렉션 로드/임베딩/FAISS 검색은 블로킹이므로 워커 스레드에서 실행 (to_thread는 트레이싱 컨텍스트도 이어받음)
+        await asyncio.to_thread(self.load_collections, user_input)
+        cached_answer = await asyncio.to_thread(self.find_cached_answer, user_input)
+        if cached_answer is not None:
+            return cached_answer
+        search_results = await asyncio.to_thread(self.search, user_input)
+        answer = await self.response_policy.agenerate_answer(user_input, search_results)
+        await asyncio.to_thread(self.cache_answer, user_input, answer)
         return answer
 
+    async def astream(self, user_input: str) -> AsyncIterator[StreamChunk]:
+        """
+        검색 결과(참고 문서)를 먼저 보내고 답변은 토큰 단위로 스트리밍
+        """
+        await asyncio.to_thread(self.load_collections, user_input)
+        cached_answer = await asyncio.to_thread(self.find_cached_answer, user_input)
+        if cached_answer is not None:
+            yield StreamChunk(StreamChunkKind.TOKEN, cached_answer)
+            return
+        search_results = await asyncio.to_thread(self.search, user_input)
+        sources = self.response_policy.format_sources(search_results)
+        if sources:
+            yield StreamChunk(StreamChunkKind.CONTEXT, sources)
+        tokens: list[str] = []
+        async for token in self.response_policy.astream_answer(user_input, search_results):
+            tokens.append(token)
+            yield StreamChunk(StreamChunkKind.TOKEN, token)
+        await asyncio.to_thread(self.cache_answer, user_input, "".join(tokens))
+
 
 class HandlerFactory:
     @staticmethod
     def get_handler(
-        intent: str, openai_client: OpenAI, template_manager: TemplateManager, user_state: UserState
+        intent: str,
+        openai_client: OpenAI,
+        template_manager: TemplateManager,
+        user_state: UserState,
+        async_openai_client: Optional[AsyncOpenAI] = None,
     ) -> Handler:
-        generate_sql_query = SQLGenerator(openai_client, template_manager)
-        query_executor = QueryExecutor(openai_client, template_manager)
-        collection_loader = CollectionLoader(settings.vector_path, UpstageEmbedding)
+        generate_sql_query = SQLGenerator(openai_client, template_manager, async_openai_client=async_openai_client)
+        query_executor = QueryExecutor(
+            openai_client, template_manager, async_openai_client=async_openai_client, query_cache=query_cache
+        )
+        collection_loader = CollectionLoader(settings.vector_path, UpstageEmbedding, registry=collection_registry)
         response_policy = PolicyResponse(openai_client)
         if intent == IntentType.COMPARE_QUESTION:
-            return CompareHandler(openai_client, template_manager, query_executor, generate_sql_query, user_state)
+            return CompareHandler(
+                openai_client,
+                template_manager,
+                query_executor,
+                generate_sql_query,
+                user_state,
+                async_openai_client=async_openai_client,
+                query_cache=query_cache,
+                premium_cube=premium_cube_store,
+            )
         if intent == IntentType.POLICY_QUESTION:
-            return PolicyHandler(openai_client, template_manager, collection_loader, response_policy)
+            return PolicyHandler(
+                openai_client,
+                template_manager,
+                collection_loader,
+                response_policy,
+                async_openai_client=async_openai_client,
+                answer_cache=answer_cache,
+                diversifier=chunk_diversifier,
+            )
         raise ValueError("올바른 intent type이 아닙니다.")
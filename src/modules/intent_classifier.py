@@ -0,0 +1,105 @@
+import logging
+import re
+import threading
+from typing import NamedTuple, Optional
+
+from options.enums import IntentType
+
+logger = logging.getLogger(__name__)
+
+# (패턴, 가중치) - 비교설계 DB로 답할 수 있는 질문의 단서
+COMPARE_LEXICON: list[tuple[str, float]] = [
+    (r"보험료", 3.0),
+    (r"얼마", 1.5),
+    (r"가격", 2.0),
+    (r"저렴|싼|싸\?|싸$|비싼|비싸", 2.0),
+    (r"기본플랜|기본보장|기본담보|확장플랜", 3.0),
+    (r"보장항목별|상세하게|상세 ", 2.0),
+    (r"합계|총액|평균", 1.5),
+    (r"순위|순서|\d+개", 1.5),
+    (r"\d+\s*세\s*(남|여)|(남|여)(자|성)", 1.5),
+    (r"무해지|해지환급", 2.0),
+    (r"\d+년\s*[/\s]?\s*\d+세|\d+년납|\d+세\s*만기", 2.0),
+]
+
+# 보험약관 검색으로 답해야 하는 질문의 단서
+POLICY_LEXICON: list[tuple[str, float]] = [
+    (r"약관", 3.0),
+    (r"정의|뜻", 2.5),
+    (r"지급|보험금", 2.0),
+    (r"조건|기준|범위|한도", 1.5),
+    (r"보장(하는|되|돼|받|해)|보장\s*내용", 2.0),
+    (r"청구|서류|면책|거절|알릴\s*의무|납입면제", 2.5),
+    (r"치료|수술|입원|장애|골절|치매|우울증|뇌졸중", 1.0),
+    (r"[A-Z]\d{2}(\.\d+)?|PTSD", 3.0),
+    (r"생명보험|삼성생명|교보생명|한화생명", 3.0),
+    (r"무엇|뭐야|궁금|어떻게|되나요|가능해", 1.0),
+]
+
+
+class IntentPrediction(NamedTuple):
+    intent: Optional[IntentType]
+    confidence: float
+    compare_score: float
+    policy_score: float
+
+
+class LocalIntentClassifier:
+    """
+    키워드 사전 기반의 로컬 1차 의도분류기
+    - 비교설계/보험약관 단서 가중치 합의 차이로 신뢰도를 계산
+    - 신뢰도가 threshold 이상일 때만 결과를 사용하고, 아니면 LLM으로 넘김
+    - 로컬에서 바로 결정한 비율(short-circuit)을 집계
+    """
+
+    def __init__(self, threshold: float = 0.7, smoothing: float = 1.0):
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.compare_patterns = [(re.compile(pattern), weight) for pattern, weight in COMPARE_LEXICON]
+        self.policy_patterns = [(re.compile(pattern), weight) for pattern, weight in POLICY_LEXICON]
+        self._lock = threading.Lock()
+        self.total = 0
+        self.short_circuited = 0
+
+    @staticmethod
+    def _score(patterns: list[tuple[re.Pattern[str], float]], user_input: str) -> float:
+        return sum(weight for pattern, weight in patterns if pattern.search(user_input))
+
+    def predict(self, user_input: str) -> IntentPrediction:
+        compare_score = self._score(self.compare_patterns, user_input)
+        policy_score = self._score(self.policy_patterns, user_input)
+        confidence = abs(compare_score - policy_score) / (compare_score + policy_score + self.smoothing)
+        if compare_score == policy_score:
+            return IntentPrediction(None, confidence, compare_score, policy_score)
+        intent = IntentType.COMPARE_QUESTION if compare_score > policy_score else IntentType.POLICY_QUESTION
+        return IntentPrediction(intent, confidence, compare_score, policy_score)
+
+    def classify(self, user_input: str) -> Optional[IntentType]:
+        """
+        신뢰도가 충분하면 의도를 반환하고, 애매하면 None을 반환 (LLM fallback 필요)
+        """
+        prediction = self.predict(user_input)
+        confident = prediction.intent is not None and prediction.confidence >= self.threshold
+        with self._lock:
+            self.total += 1
+            if confident:
+                self.short_circuited += 1
+        logger.info(
+            f"로컬 의도분류: {prediction.intent} (신뢰도 {prediction.confidence:.2f}, "
+            f"비교 {prediction.compare_score:.1f} / 약관 {prediction.policy_score:.1f}) "
+            f"short-circuit {self.short_circuit_rate:.1%}"
+        )
+        return prediction.intent if confident else None
+
+    @property
+    def short_circuit_rate(self) -> float:
+        return self.short_circuited / self.total if self.total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "total": self.total,
+                "short_circuited": self.short_circuited,
+                "llm_fallback": self.total - self.short_circuited,
+                "short_circuit_rate": self.short_circuit_rate,
+            }
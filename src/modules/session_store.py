@@ -0,0 +1,64 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from config.settings import settings
+from modules.user_state import UserState
+from util.lru_cache import LRUCache
+
+SessionId = str
+DEFAULT_SESSION_ID = "default"
+
+
+class SessionStore(ABC):
+    """
+    세션별 UserState 저장소. 세션마다 독립된 상태를 가지므로 핸들러 간 공유 상태가 없음
+    """
+
+    @abstractmethod
+    def get_user_state(self, session_id: SessionId) -> UserState:
+        raise NotImplementedError("SessionStore should be implemented")
+
+    @abstractmethod
+    def save_user_state(self, session_id: SessionId, user_state: UserState) -> None:
+        raise NotImplementedError("SessionStore should be implemented")
+
+    @abstractmethod
+    def drop(self, session_id: SessionId) -> None:
+        raise NotImplementedError("SessionStore should be implemented")
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    프로세스 메모리에 세션별 상태를 보관
+    - on_chat_end 없이 끊긴 세션도 남지 않도록 최대 세션 수(LRU)와 유휴 시간(idle_ttl)으로 제거
+    - 조회할 때마다 다시 넣어 마지막 사용 시각부터 만료 시간을 계산
+    - 조회 후 생성/갱신을 한 번에 하도록 락 사용 (제거와 겹쳐 같은 세션에 상태가 둘 생기지 않도록)
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: Optional[float] = 3600.0) -> None:
+        self._states: LRUCache[SessionId, UserState] = LRUCache(max_entries=max_sessions, ttl=idle_ttl)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "InMemorySessionStore":
+        return cls(settings.session_max_entries, settings.session_idle_ttl)
+
+    def get_user_state(self, session_id: SessionId) -> UserState:
+        with self._lock:
+            user_state = self._states.peek(session_id)
+            if user_state is None:
+                user_state = UserState()
+            self._states.put(session_id, user_state)
+            return user_state
+
+    def save_user_state(self, session_id: SessionId, user_state: UserState) -> None:
+        with self._lock:
+            self._states.put(session_id, user_state)
+
+    def drop(self, session_id: SessionId) -> None:
+        with self._lock:
+            self._states.invalidate(session_id)
+
+    def __len__(self) -> int:
+        return len(self._states)
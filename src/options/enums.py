@@ -28,6 +28,48 @@ class ModelType(StrEnum):
     KEYWORD_MODEL = "gpt-4o-2024-08-06"
 
 
+class CollectionLoadMode(StrEnum):
+    MEMORY = "memory"  # 인덱스/메타데이터를 모두 메모리로 읽음
+    MMAP = "mmap"  # 인덱스와 메타데이터를 mmap으로 공유
+
+
+class IndexVariant(StrEnum):
+    FLAT = "flat"  # 원본 faiss.index (정확 검색)
+    IVFPQ = "ivfpq"  # IVF + Product Quantization
+    HNSW = "hnsw"  # HNSW 그래프
+    SQ8 = "sq8"  # 8bit Scalar Quantization
+
+
+class DiversifyMode(StrEnum):
+    DEDUP = "dedup"  # 코사인 유사도 threshold 이상인 중복 청크 제외
+    MMR = "mmr"  # Maximal Marginal Relevance 순서로 고르면서 중복 청크 제외
+
+
+class ComparisonKind(StrEnum):
+    PREMIUM_TOTAL = "premium_total"  # 보험사/상품별 보험료 합계 (순위 포함)
+    PLAN_DETAIL = "plan_detail"  # 보험사별 합계 + 보장항목별 상세
+    COVERAGE_PREMIUM = "coverage_premium"  # 특정 보장항목 보험료
+
+
+class StreamChunkKind(StrEnum):
+    CONTEXT = "context"  # 답변 전에 보여줄 검색 결과(참고 문서)
+    TOKEN = "token"  # 답변 토큰
+    DONE = "done"  # 스트림 종료 (지연 시간 포함)
+
+
+class TraceStage(StrEnum):
+    REQUEST = "request"  # 질문 하나의 전체 처리
+    INTENT = "intent"  # 질문 의도 분류
+    KEYWORD_MATCH = "keyword_match"  # 보험사 키워드 -> 컬렉션 매칭
+    COLLECTION_LOAD = "collection_load"
+    EMBEDDING = "embedding"  # 질문 임베딩
+    FAISS_SEARCH = "faiss_search"
+    SQL_GENERATION = "sql_generation"
+    DB_EXECUTE = "db_execute"  # DB 조회 또는 보험료 큐브 집계
+    JSON_CONVERSION = "json_conversion"
+    ANSWER_GENERATION = "answer_generation"  # 약관 답변 생성
+
+
 class ServiceEnv(StrEnum):
     DEV = "DEV"
     STG = "STG"
@@ -31,3 +31,6 @@ insu_match: InsuMatch = {
 
 nh_keywords = ["NH농협손해보험", "NH손해보험", "농협손해보험", "NH손보", "농협손보", "NH", "농협"]
 db_keywords = ["db손해보험", "db손해", "db보험", "db", "디비손해보험", "디비"]
+
+insurance_type_keywords = ["암", "상해", "질병", "재물", "화재", "운전자", "자동차", "실손"]
+comparison_keywords = ["비교", "차이", "다른", "다른점", "비교해", "비교해줘", "차이점", "알려줘", "뭐가 더 나은가"]
@@ -1,30 +1,116 @@
-from openai import OpenAI
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+from openai import AsyncOpenAI, OpenAI
 
 from db.sql_utils import TemplateManager
-from modules.handler import HandlerFactory, IntentHandler
-from modules.user_state import UserState
+from modules.handler import CompareHandler, Handler, HandlerFactory, IntentHandler, StreamChunk, StreamTimings
+from modules.session_store import DEFAULT_SESSION_ID, InMemorySessionStore, SessionId, SessionStore
+from options.enums import StreamChunkKind, TraceStage
+from util.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 
 class InsuranceService:
-    def __init__(self, openai_client: OpenAI, template_manager: TemplateManager, user_state: UserState):
+    """
+    OpenAI 클라이언트/템플릿 같은 공유 자원만 가지는 무상태 서비스
+    사용자 상태는 session_store에 세션별로 보관
+    """
+
+    def __init__(
+        self,
+        openai_client: OpenAI,
+        template_manager: TemplateManager,
+        async_openai_client: Optional[AsyncOpenAI] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
         self.openai_client = openai_client
+        self.async_openai_client = async_openai_client
         self.template_manager = template_manager
-        self.user_state = user_state
+        self.session_store = session_store or InMemorySessionStore()
 
     def __get_user_input(self) -> str:
         return input("질문을 입력하세요 (종료하려면 'q', 'quit', 'exit' 입력):\n").strip()
 
-    def __handle_user_input(self, user_input: str) -> str:
-        intent_handler = IntentHandler(self.openai_client, self.template_manager)
-        intent = intent_handler.handle(user_input)
-        handler = HandlerFactory.get_handler(intent, self.openai_client, self.template_manager, self.user_state)
-        response = handler.handle(user_input)
-        return response
+    def __get_handler(self, intent: str, session_id: SessionId) -> Handler:
+        return HandlerFactory.get_handler(
+            intent,
+            self.openai_client,
+            self.template_manager,
+            self.session_store.get_user_state(session_id),
+            async_openai_client=self.async_openai_client,
+        )
+
+    def __save_session(self, handler: Handler, session_id: SessionId) -> None:
+        # 비교설계 질문에서 바뀐 나이/성별/상품유형은 같은 세션의 다음 질문에 이어서 사용
+        if isinstance(handler, CompareHandler):
+            self.session_store.save_user_state(session_id, handler.user_state)
+
+    def __handle_user_input(self, user_input: str, session_id: SessionId) -> str:
+        with tracer.span(TraceStage.REQUEST, session_id=session_id) as span:
+            intent_handler = IntentHandler(self.openai_client, self.template_manager)
+            intent = intent_handler.handle(user_input)
+            span.set(intent=intent)
+            handler = self.__get_handler(intent, session_id)
+            response = handler.handle(user_input)
+            self.__save_session(handler, session_id)
+            return response
+
+    async def __ahandle_user_input(self, user_input: str, session_id: SessionId) -> str:
+        with tracer.span(TraceStage.REQUEST, session_id=session_id) as span:
+            intent_handler = IntentHandler(
+                self.openai_client, self.template_manager, async_openai_client=self.async_openai_client
+            )
+            intent = await intent_handler.ahandle(user_input)
+            span.set(intent=intent)
+            handler = self.__get_handler(intent, session_id)
+            response = await handler.ahandle(user_input)
+            self.__save_session(handler, session_id)
+            return response
 
     def run(self) -> None:
         user_input = self.__get_user_input()
-        self.__handle_user_input(user_input)
+        self.__handle_user_input(user_input, DEFAULT_SESSION_ID)
 
-    def get_user_response(self, user_input: str) -> str:
-        response = self.__handle_user_input(user_input)
+    def get_user_response(self, user_input: str, session_id: SessionId = DEFAULT_SESSION_ID) -> str:
+        response = self.__handle_user_input(user_input, session_id)
         return response
+
+    async def aget_user_response(self, user_input: str, session_id: SessionId = DEFAULT_SESSION_ID) -> str:
+        """
+        이벤트 루프를 막지 않는 비동기 버전 (Chainlit 핸들러에서 사용)
+        """
+        return await self.__ahandle_user_input(user_input, session_id)
+
+    async def astream_user_response(
+        self, user_input: str, session_id: SessionId = DEFAULT_SESSION_ID
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        응답을 StreamChunk로 스트리밍 (약관 질문은 참고 문서 -> 답변 토큰 순)
+        마지막 DONE 청크에 첫 토큰까지 시간(TTFT)과 전체 지연 시간을 담음
+        """
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        with tracer.span(TraceStage.REQUEST, session_id=session_id, stream=True) as span:
+            intent_handler = IntentHandler(
+                self.openai_client, self.template_manager, async_openai_client=self.async_openai_client
+            )
+            intent = await intent_handler.ahandle(user_input)
+            span.set(intent=intent)
+            handler = self.__get_handler(intent, session_id)
+            async for chunk in handler.astream(user_input):
+                if first_token is None and chunk.kind == StreamChunkKind.TOKEN:
+                    first_token = time.perf_counter() - start
+                yield chunk
+            self.__save_session(handler, session_id)
+            span.set(first_token_ms=round(first_token * 1000, 3) if first_token is not None else None)
+
+        timings = StreamTimings(first_token, time.perf_counter() - start)
+        ttft = f"{timings.first_token:.2f}s" if timings.first_token is not None else "-"
+        logger.info(f"응답 스트리밍 완료 ({intent}): 첫 토큰 {ttft}, 전체 {timings.total:.2f}s")
+        yield StreamChunk(StreamChunkKind.DONE, timings=timings)
+
+    def end_session(self, session_id: SessionId) -> None:
+        self.session_store.drop(session_id)
@@ -0,0 +1,61 @@
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Union
+
+
+@contextmanager
+def atomic_write(path: Union[str, Path], mode: str = "wb", **kwargs: Any) -> Iterator[IO]:
+    """
+    path와 같은 폴더의 프로세스별 임시 파일에 쓰고 끝나면 os.replace로 교체
+    - 여러 워커가 같은 파일을 동시에 만들어도 서로의 임시 파일을 덮어쓰지 않음
+    - 쓰는 중 예외가 나면 임시 파일을 지우고 기존 파일은 그대로 둠
+    """
+    path = Path(path)
+    f = tempfile.NamedTemporaryFile(
+        mode, dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False, **kwargs
+    )
+    try:
+        with f:
+            yield f
+        os.replace(f.name, path)
+    except BaseException:
+        try:
+            os.unlink(f.name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def atomic_directory(path: Union[str, Path]) -> Iterator[Path]:
+    """
+    path와 같은 위치의 임시 폴더에 파일을 모두 쓰고 끝나면 기존 폴더와 교체
+    - 읽는 쪽은 이전 폴더 또는 새 폴더의 파일만 보게 되고 두 버전이 섞이지 않음
+    - 두 번의 rename 사이에는 폴더가 잠깐 없을 수 있음 (이전 폴더는 숨김 이름으로 옮긴 뒤 삭제)
+    - 쓰는 중 예외가 나면 임시 폴더를 지우고 기존 폴더는 그대로 둠
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"))
+    # mkdtemp는 0700으로 만들므로 기존 폴더 권한을 이어받음
+    os.chmod(staging, stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o755)
+    try:
+        yield staging
+        previous = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}.", suffix=".old"))
+        if path.exists():
+            os.rename(path, previous / path.name)
+        try:
+            os.rename(staging, path)
+        except BaseException:
+            if (previous / path.name).exists():
+                os.rename(previous / path.name, path)
+            raise
+        finally:
+            shutil.rmtree(previous, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_openai import ChatOpenAI
+
+from config.settings import PROJECT_ROOT, settings
+from options.enums import ModelType
+from options.insu_name import db_keywords, insu_match, nh_keywords
+from util.atomic_file import atomic_write
+
+InsuCompanyName = str
+InsuKeywords = list[str]
+KeywordMapping = dict[InsuCompanyName, InsuKeywords]
+
+# 파일 형식이나 프롬프트가 바뀌면 올려서 기존 캐시를 무효화
+KEYWORD_MAPPING_VERSION = 1
+
+logger = logging.getLogger(__name__)
+_lock = threading.Lock()
+_cached: Optional[tuple[str, KeywordMapping]] = None
+
+
+def insurance_keywords_mapping() -> KeywordMapping:
+    insu_filename = insu_match.values()
+    gpt4o = ChatOpenAI(model_name=ModelType.KEYWORD_MODEL, temperature=0.1, api_key=settings.openai_api_key)
+
+    keyword_chain_template = PromptTemplate.from_template(
+        """
+    {insu_filename}를 참고해서 각 키워드마다 해당하는 패턴을 value로 채워주세요.
+    반드시 value는 영어약자가 포함됩니다. key는 반드시 한글로 출력하세요.
+    영어약자는 {insu_filename}에서 _기준으로 앞부분을 참고하세요.
+    반환 형태를 key: value 형식인 JSON 형식으로 출력하세요.
+
+    "NH농협손해보험": {nh_keywords},
+    "DB손해보험": {db_keywords},
+    {keywords}:
+    """.strip()
+    )
+
+    result = keyword_chain_template | gpt4o | JsonOutputParser()
+    mapping_dict = result.invoke(
+        {
+            "insu_filename": insu_filename,
+            "keywords": lambda obj: [print(k) for k in obj.__dict__.keys()],
+            "nh_keywords": nh_keywords,
+            "db_keywords": db_keywords,
+        }
+    )
+    return mapping_dict
+
+
+def keyword_source_hash() -> str:
+    """
+    매핑 생성에 쓰이는 insu_match, nh_keywords, db_keywords의 해시
+    """
+    source = {
+        "version": KEYWORD_MAPPING_VERSION,
+        "insu_match": insu_match,
+        "nh_keywords": nh_keywords,
+        "db_keywords": db_keywords,
+    }
+    return hashlib.sha256(json.dumps(source, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def keyword_mapping_path() -> str:
+    path = settings.keyword_mapping_path
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def read_keyword_mapping(path: str, source_hash: str) -> Optional[KeywordMapping]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logger.warning(f"키워드 매핑 파일을 읽을 수 없습니다: {path}")
+        return None
+    if cached.get("version") != KEYWORD_MAPPING_VERSION or cached.get("source_hash") != source_hash:
+        return None
+    return cached["mapping"]
+
+
+def build_keyword_mapping(path: Optional[str] = None) -> KeywordMapping:
+    """
+    LLM으로 보험사별 키워드 매핑을 만들어 버전/해시와 함께 저장
+    """
+    path = path or keyword_mapping_path()
+    source_hash = keyword_source_hash()
+    mapping = insurance_keywords_mapping()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 여러 워커가 동시에 생성해도 서로의 임시 파일을 덮어쓰지 않도록 프로세스별 임시 파일에 씀
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": KEYWORD_MAPPING_VERSION,
+                "source_hash": source_hash,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "mapping": mapping,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    logger.info(f"키워드 매핑 저장 완료: {path}")
+    return mapping
+
+
+def get_insurance_keywords() -> KeywordMapping:
+    """
+    보험사별 키워드 매핑 반환
+    - 프로세스 메모리 -> 디스크 파일 순으로 확인
+    - 파일이 없거나 insu_match/키워드가 바뀌어 해시가 다르면 그때만 LLM으로 다시 생성
+    """
+    global _cached
+    source_hash = keyword_source_hash()
+    if _cached is not None and _cached[0] == source_hash:
+        return _cached[1]
+
+    with _lock:
+        if _cached is not None and _cached[0] == source_hash:
+            return _cached[1]
+        path = keyword_mapping_path()
+        mapping = read_keyword_mapping(path, source_hash)
+        if mapping is None:
+            logger.info("키워드 매핑 캐시가 없거나 오래되어 새로 생성합니다.")
+            mapping = build_keyword_mapping(path)
+        _cached = (source_hash, mapping)
+        return mapping
+
+
+def clear_keyword_mapping_cache() -> None:
+    global _cached
+    with _lock:
+        _cached = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="보험사 키워드 매핑 파일 생성")
+    parser.add_argument("--force", action="store_true", help="캐시가 최신이어도 다시 생성")
+    args = parser.parse_args()
+
+    path = keyword_mapping_path()
+    if not args.force and read_keyword_mapping(path, keyword_source_hash()) is not None:
+        print(f"키워드 매핑이 최신입니다: {path}")
+    else:
+        print(json.dumps(build_keyword_mapping(path), ensure_ascii=False, indent=2))
@@ -0,0 +1,96 @@
+from collections import deque
+from typing import Iterable, Mapping
+
+InsuCompanyName = str
+
+COMPANY = "company"
+INSURANCE_TYPE = "insurance_type"
+COMPARISON = "comparison"
+
+KeywordLabel = tuple[str, str]
+
+
+def normalize_text(text: str) -> str:
+    """
+    질문과 키워드를 같은 형태로 비교하기 위해 소문자로 바꾸고 공백 제거
+    """
+    return text.lower().replace(" ", "")
+
+
+class KeywordMatcher:
+    """
+    보험사/보험종류/비교 키워드를 Aho-Corasick 오토마톤 하나로 미리 컴파일한 매처
+    - 질문을 한 번만 훑어서 겹치는 키워드까지 모두 찾음
+    - 키워드는 질문과 동일하게 normalize_text로 정규화
+    """
+
+    def __init__(
+        self,
+        company_keywords: Mapping[InsuCompanyName, Iterable[str]],
+        insurance_type_keywords: Iterable[str],
+        comparison_keywords: Iterable[str],
+    ):
+        self.companies = list(company_keywords)
+        self.insurance_types = list(insurance_type_keywords)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[frozenset[KeywordLabel]] = [frozenset()]
+
+        patterns: dict[str, set[KeywordLabel]] = {}
+        for company, keywords in company_keywords.items():
+            for keyword in keywords:
+                patterns.setdefault(normalize_text(keyword), set()).add((COMPANY, company))
+        for keyword in self.insurance_types:
+            patterns.setdefault(normalize_text(keyword), set()).add((INSURANCE_TYPE, keyword))
+        for keyword in comparison_keywords:
+            patterns.setdefault(normalize_text(keyword), set()).add((COMPARISON, keyword))
+        patterns.pop("", None)
+
+        outputs: list[set[KeywordLabel]] = [set()]
+        for pattern, labels in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].update(labels)
+
+        # BFS로 실패 링크를 만들고, 실패 링크를 따라 도달하는 키워드도 출력에 합침
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state].update(outputs[self._fail[next_state]])
+        self._output = [frozenset(labels) for labels in outputs]
+
+    def match(self, normalized_text: str) -> set[KeywordLabel]:
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        labels: set[KeywordLabel] = set()
+        for char in normalized_text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                labels.update(output[state])
+        return labels
+
+    def find(self, normalized_text: str) -> tuple[list[InsuCompanyName], bool, list[str]]:
+        """
+        (언급된 보험사, 비교 질문 여부, 감지된 보험 종류)를 한 번에 반환
+        """
+        labels = self.match(normalized_text)
+        mentioned_companies = [company for company in self.companies if (COMPANY, company) in labels]
+        is_comparison = any(kind == COMPARISON for kind, _ in labels)
+        detected_insurance_types = [keyword for keyword in self.insurance_types if (INSURANCE_TYPE, keyword) in labels]
+        return mentioned_companies, is_comparison, detected_insurance_types
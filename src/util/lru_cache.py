@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    항목 수/메모리 크기 제한과 선택적 TTL을 가진 스레드 안전한 LRU 캐시
+    - max_bytes를 주면 sizeof(value) 합이 넘지 않도록 오래된 항목부터 제거
+    - ttl(초)이 지난 항목은 조회 시 만료 처리
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+        self._items: OrderedDict[K, tuple[V, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: K) -> None:
+        _, _, size = self._items.pop(key)
+        self.nbytes -= size
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, created_at, _ = item
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: K) -> Optional[V]:
+        """
+        LRU 순서와 적중 통계를 바꾸지 않고 조회 (만료된 항목은 제거)
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, created_at, _ = item
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                return None
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._items[key] = (value, time.monotonic(), size)
+            self.nbytes += size
+            while len(self._items) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                self._remove(next(iter(self._items)))
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,18 @@
+from typing import Optional
+
+PROC_STATUS = "/proc/self/status"
+
+
+def rss_bytes(field: str = "VmRSS") -> Optional[int]:
+    """
+    현재 프로세스의 상주 메모리(바이트). /proc이 없는 OS에서는 None
+    - field: VmRSS(전체), RssAnon(힙 등 익명 메모리), RssFile(mmap 파일 페이지)
+    """
+    try:
+        with open(PROC_STATUS, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
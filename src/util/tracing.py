@@ -0,0 +1,292 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 단계별 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Span:
+    """
+    요청 처리 단계 하나 (시작/종료 시각, 속성, LLM 토큰 수, 하위 단계)
+    """
+
+    __slots__ = ("name", "attributes", "children", "prompt_tokens", "completion_tokens", "started_at", "start", "end")
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.children: list[Span] = []
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def total_tokens(self) -> tuple[int, int]:
+        """
+        하위 단계까지 합친 (prompt, completion) 토큰 수
+        """
+        prompt_tokens, completion_tokens = self.prompt_tokens, self.completion_tokens
+        for child in self.children:
+            child_prompt, child_completion = child.total_tokens()
+            prompt_tokens += child_prompt
+            completion_tokens += child_completion
+        return prompt_tokens, completion_tokens
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        pass
+
+
+class _NoopSpanContext:
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+# 현재 단계. asyncio 태스크와 asyncio.to_thread 워커에는 컨텍스트가 복사되어 하위 단계로 이어짐
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attributes", "span", "parent", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.parent = _current_span.get()
+        self.span = Span(self.name, self.attributes)
+        if self.parent is not None:
+            self.parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        try:
+            _current_span.reset(self.token)
+        except ValueError:
+            # 스트리밍 제너레이터가 다른 컨텍스트에서 닫히면 직접 부모로 되돌림
+            _current_span.set(self.parent)
+        if self.parent is None:
+            self.tracer.finish(self.span)
+
+
+class StageMetrics:
+    __slots__ = ("count", "total", "buckets", "prompt_tokens", "completion_tokens")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def observe(self, span: Span) -> None:
+        duration = span.duration
+        self.count += 1
+        self.total += duration
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+        self.prompt_tokens += span.prompt_tokens
+        self.completion_tokens += span.completion_tokens
+
+
+class Tracer:
+    """
+    요청 파이프라인 단계별 지연 시간/토큰 추적
+    - with tracer.span("faiss_search"): 로 중첩 단계를 기록하고, 최상위 단계가 끝나면 요청 하나로 내보냄
+    - jsonl_path를 주면 요청마다 단계 트리를 JSON 한 줄로 추가
+    - prometheus_text()는 단계별 지연 시간 히스토그램과 토큰 수를 Prometheus 텍스트 형식으로 반환
+    - 비활성화 상태에서는 미리 만든 no-op 컨텍스트만 반환하므로 호출 비용이 거의 없음
+    """
+
+    def __init__(self, enabled: bool = False, jsonl_path: Optional[str] = None, max_traces: int = 100):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.traces: deque[dict[str, Any]] = deque(maxlen=max_traces)
+        self.stages: dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "Tracer":
+        return cls(settings.tracing_enabled, settings.tracing_jsonl_path)
+
+    def span(self, name: str, **attributes: Any):
+        if not self.enabled:
+            return _NOOP_SPAN_CONTEXT
+        return _SpanContext(self, name, attributes)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get() if self.enabled else None
+
+    def record_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        현재 단계에 LLM 토큰 수 추가
+        """
+        span = self.current_span()
+        if span is not None:
+            span.add_tokens(prompt_tokens, completion_tokens)
+
+    def record_openai_usage(self, response: Any) -> None:
+        # OpenAI chat.completions 응답의 usage (없으면 무시)
+        usage = getattr(response, "usage", None) if self.enabled else None
+        if usage is not None:
+            self.record_usage(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+
+    def traced(self, name: str) -> Callable:
+        """
+        함수 전체를 단계 하나로 기록하는 데코레이터 (동기/비동기 함수 모두 지원)
+        """
+
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def finish(self, root: Span) -> None:
+        prompt_tokens, completion_tokens = root.total_tokens()
+        trace = {
+            "trace_id": uuid.uuid4().hex,
+            "timestamp": root.started_at,
+            "total_prompt_tokens": prompt_tokens,
+            "total_completion_tokens": completion_tokens,
+            **root.to_dict(),
+        }
+        with self._lock:
+            for span in root.walk():
+                self.stages.setdefault(span.name, StageMetrics()).observe(span)
+            self.traces.append(trace)
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    logger.warning(f"트레이스 파일 기록 실패: {e}")
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP insu_stage_duration_seconds 요청 처리 단계별 소요 시간",
+            "# TYPE insu_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            stages = sorted(self.stages.items())
+            for name, metrics in stages:
+                for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                    lines.append(f'insu_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'insu_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {metrics.count}')
+                lines.append(f'insu_stage_duration_seconds_sum{{stage="{name}"}} {metrics.total:.6f}')
+                lines.append(f'insu_stage_duration_seconds_count{{stage="{name}"}} {metrics.count}')
+            lines += [
+                "# HELP insu_llm_tokens_total 요청 처리 단계별 OpenAI 토큰 수",
+                "# TYPE insu_llm_tokens_total counter",
+            ]
+            for name, metrics in stages:
+                if metrics.prompt_tokens or metrics.completion_tokens:
+                    lines.append(f'insu_llm_tokens_total{{stage="{name}",type="prompt"}} {metrics.prompt_tokens}')
+                    lines.append(
+                        f'insu_llm_tokens_total{{stage="{name}",type="completion"}} {metrics.completion_tokens}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.traces.clear()
+            self.stages.clear()
+
+    def serve_metrics(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """
+        GET /metrics로 prometheus_text()를 반환하는 HTTP 서버를 데몬 스레드로 시작
+        """
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"메트릭 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+tracer = Tracer.from_settings()
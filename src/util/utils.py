@@ -1,60 +1,37 @@
-import re
+import threading
+from typing import Optional
 
-from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_openai import ChatOpenAI
+from options.enums import TraceStage
+from options.insu_name import comparison_keywords, insu_match, insurance_type_keywords
+from util.keyword_mapping import InsuCompanyName, KeywordMapping, get_insurance_keywords
+from util.keyword_matcher import KeywordMatcher, normalize_text
+from util.tracing import tracer
 
-from config.settings import settings
-from options.enums import ModelType
-from options.insu_name import db_keywords, insu_match, nh_keywords
-
-InsuCompanyName = str
-InsuKeywords = list[str]
 InsuFileName = str
 CANCER = "암"
 
+_matcher_lock = threading.Lock()
+_matcher: Optional[tuple[KeywordMapping, KeywordMatcher]] = None
 
-def insurance_keywords_mapping() -> dict[InsuCompanyName, InsuKeywords]:
-    insu_filename = insu_match.values()
-    gpt4o = ChatOpenAI(model_name=ModelType.KEYWORD_MODEL, temperature=0.1, api_key=settings.openai_api_key)
-
-    keyword_chain_template = PromptTemplate.from_template(
-        """
-    {insu_filename}를 참고해서 각 키워드마다 해당하는 패턴을 value로 채워주세요.
-    반드시 value는 영어약자가 포함됩니다. key는 반드시 한글로 출력하세요.
-    영어약자는 {insu_filename}에서 _기준으로 앞부분을 참고하세요.
-    반환 형태를 key: value 형식인 JSON 형식으로 출력하세요.
 
-    "NH농협손해보험": {nh_keywords},
-    "DB손해보험": {db_keywords},
-    {keywords}:
-    """.strip()
-    )
-
-    result = keyword_chain_template | gpt4o | JsonOutputParser()
-    mapping_dict = result.invoke(
-        {
-            "insu_filename": insu_filename,
-            "keywords": lambda obj: [print(k) for k in obj.__dict__.keys()],
-            "nh_keywords": nh_keywords,
-            "db_keywords": db_keywords,
-        }
-    )
-    return mapping_dict
+def get_keyword_matcher() -> KeywordMatcher:
+    """
+    키워드 매핑이 바뀔 때만 매처를 다시 컴파일
+    """
+    global _matcher
+    insurance_company_keywords = get_insurance_keywords()
+    cached = _matcher
+    if cached is not None and cached[0] is insurance_company_keywords:
+        return cached[1]
+    with _matcher_lock:
+        if _matcher is None or _matcher[0] is not insurance_company_keywords:
+            matcher = KeywordMatcher(insurance_company_keywords, insurance_type_keywords, comparison_keywords)
+            _matcher = (insurance_company_keywords, matcher)
+        return _matcher[1]
 
 
 def find_detected_keywords(user_input: str) -> tuple[list[InsuCompanyName], bool, list[str]]:
-    insurance_company_keywords = insurance_keywords_mapping()
-    insurance_type_keywords = ["암", "상해", "질병", "재물", "화재", "운전자", "자동차", "실손"]
-    comparison_keywords = ["비교", "차이", "다른", "다른점", "비교해", "비교해줘", "차이점", "알려줘", "뭐가 더 나은가"]
-
-    mentioned_companies: list[InsuCompanyName] = []
-    for company, keywords in insurance_company_keywords.items():
-        if re.search("|".join(keywords), user_input):
-            mentioned_companies.append(company)
-
-    is_comparison_module = re.search("|".join(comparison_keywords), user_input) is not None
-    detected_insurance_types = [keyword for keyword in insurance_type_keywords if keyword in user_input]
+    mentioned_companies, is_comparison_module, detected_insurance_types = get_keyword_matcher().find(user_input)
 
     if detected_insurance_types:
         print(f"보험 종류 키워드 감지: {detected_insurance_types}")
@@ -62,6 +39,7 @@ def find_detected_keywords(user_input: str) -> tuple[list[InsuCompanyName], bool
     return mentioned_companies, is_comparison_module, detected_insurance_types
 
 
+@tracer.traced(TraceStage.KEYWORD_MATCH)
 def find_matching_collections(user_input: str, available_collections: list[InsuFileName]) -> list[InsuFileName]:
     """
     사용자 질문에서 보험사 관련 키워드를 검출하여 일치하는 컬렉션 이름 목록 반환
@@ -72,7 +50,7 @@ def find_matching_collections(user_input: str, available_collections: list[InsuF
         print("-------- 컬렉션 매칭 실패 --------\n")
         raise ValueError("질문이 없거나 사용 가능한 컬렉션이 없습니다.")
 
-    normalized_question = user_input.lower().replace(" ", "")
+    normalized_question = normalize_text(user_input)
 
     mentioned_companies, is_comparison_module, detected_insurance_types = find_detected_keywords(normalized_question)
 
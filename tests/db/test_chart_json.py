@@ -0,0 +1,91 @@
+import json
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from db.chart_json import UnsupportedResultError, build_chart_data, to_number
+from db.connection_pool import ConnectionPool
+from db.sql_templates import SQLQuery, SQLTemplateMatcher
+from db.sql_utils import DatabaseClient, QueryExecutor, TemplateManager
+from db.sqlite_client import SQLiteConnection
+from modules.user_state import UserState
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+GOLDEN_CASES = sorted(path.name.removesuffix(".input.json") for path in GOLDEN_DIR.glob("*.input.json"))
+
+
+class CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"보험사": []}'))])
+
+
+@pytest.mark.parametrize("case", GOLDEN_CASES)
+def test_build_chart_data_matches_golden(case: str) -> None:
+    result_data = json.loads((GOLDEN_DIR / f"{case}.input.json").read_text(encoding="utf-8"))
+    expected = json.loads((GOLDEN_DIR / f"{case}.expected.json").read_text(encoding="utf-8"))
+
+    assert build_chart_data(result_data) == expected
+
+
+def test_to_number_keeps_integers_exact() -> None:
+    assert to_number(Decimal("188427")) == 188427
+    assert isinstance(to_number("150000"), int)
+    assert to_number(1200.5) == 1200.5
+    assert to_number(None) is None
+
+
+def test_unsupported_columns_raise() -> None:
+    with pytest.raises(UnsupportedResultError):
+        build_chart_data({"설정값": {}, "결과": [{"company_name": "삼성화재"}]})
+
+
+@pytest.fixture
+def db_client(tmp_path: Path) -> DatabaseClient:
+    database = str(tmp_path / "insu.db")
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO insu_company VALUES ('C01', '현대해상화재', 1)")
+        cursor.execute("INSERT INTO insu_product VALUES ('C01', 'P01', '굿앤굿어린이종합보험', 1)")
+        cursor.execute("INSERT INTO coverage VALUES ('CV01', '상해사망', 10000000, 1)")
+        cursor.execute("INSERT INTO coverage VALUES ('CV02', '골절진단비', 1000000, 1)")
+        cursor.execute("INSERT INTO comparison VALUES ('홍길동', 25, 1, 'nr', '20y_100', 'C01', 'P01', 'CV01', 1200)")
+        cursor.execute("INSERT INTO comparison VALUES ('홍길동', 25, 1, 'nr', '20y_100', 'C01', 'P01', 'CV02', 300)")
+    conn.commit()
+    conn.close()
+    return DatabaseClient(ConnectionPool(lambda: SQLiteConnection(database), size=1))
+
+
+def test_execute_sql_query_builds_chart_without_llm(db_client: DatabaseClient) -> None:
+    client = CountingClient()
+    executor = QueryExecutor(client, TemplateManager(templates_dir=PROJECT_ROOT / "prompts"), db_client=db_client)
+    user_state = UserState()
+    sql_query = SQLTemplateMatcher().match("현대해상의 기본플랜 보험료를 알려줘", user_state)
+
+    chart = json.loads(executor.execute_sql_query(sql_query, user_state))
+
+    assert client.calls == 0
+    assert chart["설정값"]["성별"] == "남자"
+    assert chart["보험사"] == [
+        {
+            "이름": "현대해상화재",
+            "보험료합계": 1500,
+            "상품": [{"상품명": "굿앤굿어린이종합보험", "보장항목": {"상해사망": 1200, "골절진단비": 300}}],
+        }
+    ]
+
+
+def test_execute_sql_query_falls_back_to_llm(db_client: DatabaseClient) -> None:
+    client = CountingClient()
+    executor = QueryExecutor(client, TemplateManager(templates_dir=PROJECT_ROOT / "prompts"), db_client=db_client)
+    # LLM이 만든 임의 컬럼 SQL은 기존처럼 JSONConverter로 변환
+    result = executor.execute_sql_query(SQLQuery("SELECT company_name FROM insu_company"), UserState())
+
+    assert (result, client.calls) == ('{"보험사": []}', 1)
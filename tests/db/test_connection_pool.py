@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from db import sql_utils
+from db.connection_pool import ConnectionPool, PoolTimeoutError
+from db.sql_utils import DatabaseClient
+from db.sqlite_client import SQLiteConnection
+
+
+def make_pool(tmp_path, **kwargs) -> ConnectionPool:
+    database = str(tmp_path / "insu.db")
+    SQLiteConnection.with_schema(database).close()
+    return ConnectionPool(lambda: SQLiteConnection(database), **kwargs)
+
+
+def test_pool_reuses_connections(tmp_path) -> None:
+    pool = make_pool(tmp_path, size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+    metrics = pool.metrics()
+    assert metrics["created"] == 1
+    assert metrics["checkouts"] == 2
+    assert metrics["in_use"] == 0
+    assert metrics["idle"] == 1
+
+
+def test_pool_times_out_when_exhausted(tmp_path) -> None:
+    pool = make_pool(tmp_path, size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.metrics()["timeouts"] == 1
+    pool.release(pool.acquire())
+
+
+def test_pool_replaces_unhealthy_connections(tmp_path) -> None:
+    pool = make_pool(tmp_path, size=1, health_check_interval=0.0)
+    with pool.connection() as conn:
+        conn.close()
+    with pool.connection() as replacement:
+        assert replacement is not conn
+        assert replacement.is_connected()
+    assert pool.metrics()["failed_health_checks"] == 1
+
+
+def test_pool_never_exceeds_size_under_concurrency(tmp_path) -> None:
+    pool = make_pool(tmp_path, size=3, timeout=5.0)
+    peak = []
+
+    def work() -> None:
+        with pool.connection():
+            peak.append(pool.metrics()["in_use"])
+
+    threads = [threading.Thread(target=work) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 3
+    assert pool.metrics()["created"] <= 3
+
+
+def test_database_client_borrows_from_pool(tmp_path) -> None:
+    pool = make_pool(tmp_path, size=1)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO insu_company (company_id, company_name, is_default) VALUES (%s, %s, %s)",
+                ("C01", "현대해상화재", 1),
+            )
+        conn.commit()
+
+    client = DatabaseClient(pool)
+    rows = client.execute_query("SELECT company_name FROM insu_company WHERE company_name LIKE %s", ("%현대%",))
+    assert rows == [{"company_name": "현대해상화재"}]
+    assert pool.metrics()["in_use"] == 0
+
+
+class SnapshotConnection(SQLiteConnection):
+    # MySQL autocommit=False처럼 첫 쿼리에서 트랜잭션을 시작해 읽기 스냅샷을 유지하는 연결
+    def cursor(self, dictionary: bool = False):
+        if not self.raw.in_transaction:
+            self.raw.execute("BEGIN")
+        return super().cursor(dictionary)
+
+
+def test_reused_connection_sees_newly_committed_rows(tmp_path) -> None:
+    database = str(tmp_path / "insu.db")
+    writer = SQLiteConnection.with_schema(database)
+    writer.raw.execute("PRAGMA journal_mode=WAL")
+    client = DatabaseClient(ConnectionPool(lambda: SnapshotConnection(database), size=1))
+    count_query = "SELECT COUNT(*) AS n FROM insu_company"
+    assert client.execute_query(count_query) == [{"n": 0}]
+
+    with writer.cursor() as cursor:
+        cursor.execute("INSERT INTO insu_company VALUES (%s, %s, %s)", ("C01", "삼성화재", 1))
+    writer.commit()
+
+    # 같은 연결을 재사용해도 반납 시 스냅샷을 닫으므로 새로 커밋된 행이 보임
+    assert client.execute_query(count_query) == [{"n": 1}]
+    assert client.pool.metrics()["created"] == 1
+    writer.close()
+
+
+def test_connect_mysql_uses_autocommit(monkeypatch) -> None:
+    captured = {}
+    monkeypatch.setattr(sql_utils.mysql.connector, "connect", lambda **kwargs: captured.update(kwargs))
+    sql_utils.connect_mysql()
+    assert captured["autocommit"] is True
@@ -0,0 +1,201 @@
+import json
+import random
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from db.connection_pool import ConnectionPool
+from db.premium_cube import PremiumCube, PremiumCubeStore
+from db.query_cache import QueryCache
+from db.sql_templates import SQLTemplateMatcher, parse_comparison_question
+from db.sql_utils import DatabaseClient, QueryExecutor, SQLGenerator, TemplateManager
+from db.sqlite_client import SQLiteConnection
+from modules.handler import CompareHandler
+from modules.user_state import UserState
+from options.enums import ComparisonKind, Sex
+
+COMPANIES = [("C01", "삼성화재"), ("C02", "현대해상화재"), ("C03", "DB손해보험"), ("C04", "메리츠화재")]
+PRODUCTS = [
+    ("C01", "P01", "삼성 종합"),
+    ("C01", "P02", "삼성 건강"),
+    ("C02", "P01", "현대 종합"),
+    ("C03", "P01", "DB 종합"),
+    ("C04", "P01", "메리츠 종합"),
+]
+COVERAGES = [
+    ("CV01", "상해사망", 1),
+    ("CV02", "유사암진단비", 1),
+    ("CV03", "골절진단비", 0),
+    ("CV04", "뇌출혈진단비", 1),
+    ("CV05", "질병수술비", 0),
+]
+PROFILES = [(25, 1, "nr", "20y_100"), (40, 0, "nr", "20y_100"), (40, 0, "r", "20y_100")]
+
+QUESTIONS = [
+    "보험료 비교해줘",
+    "현대해상 보험료 알려줘",
+    "삼성화재 기본플랜 보험료를 알려줘",
+    "보장항목별 상세 보험료",
+    "가장 저렴한 보험사는?",
+    "보험료 저렴한 2곳 알려줘",
+    "제일 비싼 곳은?",
+    "기본플랜 보험료 싼 순서로 3개",
+    "DB랑 삼성 골절 진단비 보험료",
+    "진단비 보험료 알려줘",
+    "메리츠 뇌출혈 보험료",
+]
+
+
+@pytest.fixture
+def db_client(tmp_path: Path) -> DatabaseClient:
+    database = str(tmp_path / "insu.db")
+    rng = random.Random(0)
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        for company_id, company_name in COMPANIES:
+            cursor.execute("INSERT INTO insu_company VALUES (%s, %s, 1)", (company_id, company_name))
+        for company_id, product_id, product_name in PRODUCTS:
+            cursor.execute("INSERT INTO insu_product VALUES (%s, %s, %s, 1)", (company_id, product_id, product_name))
+        for coverage_id, coverage_name, is_default in COVERAGES:
+            cursor.execute(
+                "INSERT INTO coverage VALUES (%s, %s, 1000000, %s)", (coverage_id, coverage_name, is_default)
+            )
+        for age, sex, product_type, expiry_year in PROFILES:
+            for company_id, product_id, _ in PRODUCTS:
+                for coverage_id, _, _ in COVERAGES:
+                    cursor.execute(
+                        "INSERT INTO comparison VALUES ('홍길동', %s, %s, %s, %s, %s, %s, %s, %s)",
+                        (age, sex, product_type, expiry_year, company_id, product_id, coverage_id, rng.randint(1, 99)),
+                    )
+        # 보험사 정보가 없는 행은 SQL JOIN과 같이 큐브에서도 제외
+        cursor.execute("INSERT INTO comparison VALUES ('홍길동', 25, 1, 'nr', '20y_100', 'C99', 'P01', 'CV01', 5)")
+    conn.commit()
+    conn.close()
+    return DatabaseClient(ConnectionPool(lambda: SQLiteConnection(database), size=1))
+
+
+def make_user_state(age: int, sex: int, product_type: str) -> UserState:
+    user_state = UserState()
+    user_state.insu_age, user_state.insu_sex, user_state.product_type = age, Sex(sex), product_type
+    return user_state
+
+
+def normalize(rows: list[dict]) -> list[dict]:
+    return [
+        {key: float(value) if isinstance(value, (int, float)) else value for key, value in row.items()} for row in rows
+    ]
+
+
+@pytest.mark.parametrize("question", QUESTIONS)
+@pytest.mark.parametrize("profile", PROFILES[:2])
+def test_cube_matches_sql_templates(db_client: DatabaseClient, question: str, profile: tuple) -> None:
+    cube = PremiumCube.load(db_client)
+    user_state = make_user_state(*profile[:3])
+    comparison_query = parse_comparison_question(question)
+    sql_query = SQLTemplateMatcher().to_sql(comparison_query, user_state)
+
+    expected = db_client.execute_query(sql_query.sql, sql_query.params)
+    assert expected, question
+    assert normalize(cube.answer(comparison_query, user_state)) == normalize(expected)
+
+
+def test_unknown_profile_returns_no_rows(db_client: DatabaseClient) -> None:
+    cube = PremiumCube.load(db_client)
+    assert cube.answer(parse_comparison_question("보험료 비교해줘"), make_user_state(99, 1, "nr")) == []
+
+
+def test_store_reloads_when_table_changes(db_client: DatabaseClient) -> None:
+    store = PremiumCubeStore(lambda: db_client, refresh_interval=0)
+    cube = store.get()
+    assert store.get() is cube
+
+    with db_client.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE comparison SET premium_amount = premium_amount + 1 WHERE coverage_id = 'CV01'")
+        conn.commit()
+    assert store.get() is not cube
+
+    cube = store.get()
+    store.invalidate()
+    assert store.get() is not cube
+
+
+def test_store_skips_fingerprint_within_refresh_interval(db_client: DatabaseClient) -> None:
+    store = PremiumCubeStore(lambda: db_client, refresh_interval=3600)
+    store.get()
+    checkouts = db_client.pool.metrics()["checkouts"]
+    store.get()
+    assert db_client.pool.metrics()["checkouts"] == checkouts
+
+
+def test_store_serves_current_cube_while_fingerprint_is_slow(db_client: DatabaseClient) -> None:
+    class SlowFingerprintStore(PremiumCubeStore):
+        def fingerprint(self) -> tuple:
+            if self._cube is not None:
+                polling.set()
+                release.wait(5)
+            return super().fingerprint()
+
+    polling, release = threading.Event(), threading.Event()
+    store = SlowFingerprintStore(lambda: db_client, refresh_interval=0)
+    cube = store.get()
+    refresher = threading.Thread(target=store.get)
+    refresher.start()
+    assert polling.wait(5)
+
+    # fingerprint 조회가 끝나지 않아도 다른 요청은 기다리지 않고 현재 큐브로 응답
+    assert store.get() is cube
+    release.set()
+    refresher.join()
+    assert store.get() is cube
+
+
+class CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="SELECT 1"))])
+
+
+def test_compare_handler_answers_from_cube(db_client: DatabaseClient) -> None:
+    client = CountingClient()
+    template_manager = TemplateManager(templates_dir=PROJECT_ROOT / "prompts")
+    query_executor = QueryExecutor(client, template_manager, db_client=db_client)
+    sql_generator = SQLGenerator(client, template_manager)
+    question = "삼성화재 기본플랜 보험료를 알려줘"
+
+    sql_answer = CompareHandler(client, template_manager, query_executor, sql_generator, UserState()).handle(question)
+    store = PremiumCubeStore(lambda: db_client, refresh_interval=None)
+    handler = CompareHandler(client, template_manager, query_executor, sql_generator, UserState(), premium_cube=store)
+    assert json.loads(handler.handle(question)) == json.loads(sql_answer)
+    # 템플릿 SQL 생성 없이 큐브에서 바로 집계
+    assert (client.calls, sql_generator.template_hits) == (0, 1)
+
+
+def test_store_reload_invalidates_query_results(db_client: DatabaseClient) -> None:
+    cache = QueryCache()
+    store = PremiumCubeStore(lambda: db_client, refresh_interval=0, query_cache=cache)
+    sql_query = SQLTemplateMatcher().to_sql(parse_comparison_question("보험료 비교해줘"), make_user_state(25, 1, "nr"))
+    cache.put_results(sql_query, db_client.execute_query(sql_query.sql, sql_query.params))
+
+    # 처음 읽을 때와 테이블이 그대로일 때는 결과 캐시를 유지
+    store.get()
+    store.get()
+    assert cache.get_results(sql_query) is not None
+
+    with db_client.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE comparison SET premium_amount = premium_amount + 1")
+        conn.commit()
+    store.get()
+    assert cache.get_results(sql_query) is None
+
+    cache.put_results(sql_query, [])
+    store.invalidate()
+    assert cache.get_results(sql_query) is None
@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from db.connection_pool import ConnectionPool
+from db.query_cache import QueryCache, normalize_question
+from db.sql_templates import SQLQuery
+from db.sql_utils import DatabaseClient, QueryExecutor, SQLGenerator, TemplateManager
+from db.sqlite_client import SQLiteConnection
+from modules.handler import CompareHandler
+from modules.user_state import UserState
+
+
+class CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages: list[dict[str, str]], **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        content = (
+            json.dumps({"보험사": []}) if "JSON" in messages[0]["content"] else "SELECT company_name FROM insu_company"
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> ConnectionPool:
+    database = str(tmp_path / "insu.db")
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO insu_company VALUES ('C01', '현대해상화재', 1)")
+    conn.commit()
+    conn.close()
+    return ConnectionPool(lambda: SQLiteConnection(database), size=1)
+
+
+def make_handler(pool: ConnectionPool, client: CountingClient, query_cache: QueryCache) -> CompareHandler:
+    template_manager = TemplateManager(templates_dir=PROJECT_ROOT / "prompts")
+    # 템플릿 매칭을 끄고 LLM SQL 생성 경로를 그대로 캐시하는지 확인
+    sql_generator = SQLGenerator(client, template_manager)
+    sql_generator.template_matcher = None
+    query_executor = QueryExecutor(client, template_manager, db_client=DatabaseClient(pool), query_cache=query_cache)
+    return CompareHandler(client, template_manager, query_executor, sql_generator, UserState(), query_cache=query_cache)
+
+
+def test_normalize_question_ignores_spacing_case_and_punctuation() -> None:
+    assert normalize_question(" KB 보험료  알려줘? ") == normalize_question("kb보험료 알려줘")
+    assert normalize_question("KB 보험료") != normalize_question("DB 보험료")
+
+
+def test_sql_key_includes_user_state() -> None:
+    cache = QueryCache()
+    cache.put_sql("보험료 알려줘", UserState(), SQLQuery("SELECT 1"))
+
+    assert cache.get_sql("보험료 알려줘!", UserState()) == SQLQuery("SELECT 1")
+    other_state = UserState()
+    other_state.insu_age = 40
+    assert cache.get_sql("보험료 알려줘", other_state) is None
+
+
+def test_repeated_question_skips_llm_and_database(pool: ConnectionPool) -> None:
+    client = CountingClient()
+    query_cache = QueryCache()
+    handler = make_handler(pool, client, query_cache)
+
+    handler.handle("보험사 목록 보여줘")
+    # SQL 생성 1회 + JSON 변환 1회
+    assert (client.calls, pool.metrics()["checkouts"]) == (2, 1)
+
+    handler.handle("보험사 목록 보여줘?")
+    # 두 번째는 JSON 변환만 호출하고 SQL 생성/DB 조회는 캐시에서 처리
+    assert (client.calls, pool.metrics()["checkouts"]) == (3, 1)
+    assert query_cache.stats()["sql"]["hits"] == 1
+    assert query_cache.stats()["results"]["hits"] == 1
+
+
+def test_invalidate_results_keeps_sql(pool: ConnectionPool) -> None:
+    client = CountingClient()
+    query_cache = QueryCache()
+    handler = make_handler(pool, client, query_cache)
+
+    handler.handle("보험사 목록 보여줘")
+    query_cache.invalidate_results()
+    handler.handle("보험사 목록 보여줘")
+
+    assert pool.metrics()["checkouts"] == 2
+    assert query_cache.stats()["sql"]["hits"] == 1
+
+
+def test_cached_results_are_copies() -> None:
+    cache = QueryCache()
+    sql_query = SQLQuery("SELECT %s", (1,))
+    cache.put_results(sql_query, [{"보험사명": "현대해상화재"}])
+
+    cache.get_results(sql_query)[0]["보험사명"] = "변경"
+    assert cache.get_results(sql_query) == [{"보험사명": "현대해상화재"}]
+
+
+def test_entries_are_bounded_and_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr("util.lru_cache.time.monotonic", lambda: now[0])
+    cache = QueryCache(max_entries=2, ttl=10.0)
+    for i in range(3):
+        cache.put_results(SQLQuery(f"SELECT {i}"), [])
+
+    assert cache.get_results(SQLQuery("SELECT 0")) is None
+    assert cache.get_results(SQLQuery("SELECT 2")) == []
+    now[0] = 11.0
+    assert cache.get_results(SQLQuery("SELECT 2")) is None
@@ -0,0 +1,112 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from db.connection_pool import ConnectionPool
+from db.sql_templates import SQLQuery, SQLTemplateMatcher, find_companies
+from db.sql_utils import DatabaseClient, SQLGenerator, TemplateManager
+from db.sqlite_client import SQLiteConnection
+from modules.user_state import UserState
+from options.enums import Sex
+
+COMPANIES = [("C01", "삼성화재"), ("C02", "현대해상화재"), ("C03", "DB손해보험")]
+COVERAGES = [("CV01", "상해사망", 1), ("CV02", "유사암진단비", 1), ("CV03", "골절진단비", 0)]
+PREMIUMS = {"C01": [1000, 2000, 300], "C02": [900, 1500, 500], "C03": [1200, 2500, 100]}
+
+
+@pytest.fixture
+def db_client(tmp_path: Path) -> DatabaseClient:
+    database = str(tmp_path / "insu.db")
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        for company_id, company_name in COMPANIES:
+            cursor.execute("INSERT INTO insu_company VALUES (%s, %s, 1)", (company_id, company_name))
+            cursor.execute("INSERT INTO insu_product VALUES (%s, 'P01', %s, 1)", (company_id, f"{company_name} 종합"))
+        for coverage_id, coverage_name, is_default in COVERAGES:
+            cursor.execute(
+                "INSERT INTO coverage VALUES (%s, %s, 1000000, %s)", (coverage_id, coverage_name, is_default)
+            )
+        for company_id, premiums in PREMIUMS.items():
+            for (coverage_id, _, _), premium in zip(COVERAGES, premiums):
+                for age, sex in [(25, 1), (40, 0)]:
+                    cursor.execute(
+                        "INSERT INTO comparison VALUES ('홍길동', %s, %s, 'nr', '20y_100', %s, 'P01', %s, %s)",
+                        (age, sex, company_id, coverage_id, premium + age),
+                    )
+    conn.commit()
+    conn.close()
+    return DatabaseClient(ConnectionPool(lambda: SQLiteConnection(database), size=1))
+
+
+def run(db_client: DatabaseClient, question: str, user_state: UserState = None) -> list[dict]:
+    sql_query = SQLTemplateMatcher().match(question, user_state or UserState())
+    assert sql_query is not None, question
+    return db_client.execute_query(sql_query.sql, sql_query.params)
+
+
+def test_premium_total_by_company(db_client: DatabaseClient) -> None:
+    rows = run(db_client, "현대해상 보험료 알려줘")
+    assert rows == [{"보험사명": "현대해상화재", "상품명": "현대해상화재 종합", "보험료합계": 900 + 1500 + 500 + 75}]
+
+    rows = run(db_client, "보험료 비교해줘")
+    assert [row["보험사명"] for row in rows] == ["DB손해보험", "삼성화재", "현대해상화재"]
+
+
+def test_default_plan_detail_uses_user_state(db_client: DatabaseClient) -> None:
+    user_state = UserState()
+    user_state.insu_age, user_state.insu_sex = 40, Sex.FEMALE
+    rows = run(db_client, "삼성화재 기본플랜 보험료를 알려줘", user_state)
+
+    assert rows[0]["구분"] == "합계" and rows[0]["보험료"] == 1000 + 2000 + 80
+    assert [row["보장항목명"] for row in rows[1:]] == ["상해사망", "유사암진단비"]
+    assert all(row["보험사명"] == "삼성화재" for row in rows)
+
+
+def test_cheapest_n_and_most_expensive(db_client: DatabaseClient) -> None:
+    assert [row["보험사명"] for row in run(db_client, "가장 저렴한 보험사는?")] == ["현대해상화재"]
+    assert [row["보험사명"] for row in run(db_client, "보험료 저렴한 2곳 알려줘")] == ["현대해상화재", "삼성화재"]
+    assert [row["보험사명"] for row in run(db_client, "제일 비싼 곳은?")] == ["DB손해보험"]
+
+
+def test_specific_coverage_premium(db_client: DatabaseClient) -> None:
+    rows = run(db_client, "DB랑 삼성 골절 진단비 보험료")
+    assert [(row["보험사명"], row["보장항목명"], row["보험료"]) for row in rows] == [
+        ("DB손해보험", "골절진단비", 125),
+        ("삼성화재", "골절진단비", 325),
+    ]
+    assert len(run(db_client, "진단비 보험료 알려줘")) == 6
+
+
+@pytest.mark.parametrize(
+    "question", ["30세부터 40세까지 보험료 알려줘", "평균 보험료 알려줘", "연령별 보험료", "안녕하세요"]
+)
+def test_unsupported_questions_fall_back(question: str) -> None:
+    assert SQLTemplateMatcher().match(question, UserState()) is None
+
+
+def test_find_companies_aliases() -> None:
+    assert find_companies("db랑 케이비, 농협 비교") == ["DB", "KB", "농협"]
+    assert find_companies("하나만 알려줘") == []
+
+
+class CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" SELECT 1 "))])
+
+
+def test_sql_generator_calls_llm_only_without_template() -> None:
+    client = CountingClient()
+    generator = SQLGenerator(client, TemplateManager(templates_dir=PROJECT_ROOT / "prompts"))
+
+    assert generator.generate("현대해상의 기본플랜 보험료를 알려줘", UserState()).params[0] == 25
+    assert client.calls == 0
+    assert generator.generate("30세부터 40세까지 보험료 알려줘", UserState()) == SQLQuery("SELECT 1")
+    assert client.calls == 1
+    assert (generator.template_hits, generator.llm_calls) == (1, 1)
@@ -0,0 +1,70 @@
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from models.answer_cache import InMemoryAnswerBackend, SemanticAnswerCache, SQLiteAnswerBackend, collection_scope
+
+VECTORS = {
+    "PTSD 보장하는 보험은?": [1.0, 0.0, 0.0, 0.0],
+    "PTSD 보장해주는 보험은?": [0.99, 0.05, 0.0, 0.0],
+    "암 진단비 알려줘": [0.0, 1.0, 0.0, 0.0],
+    "치아 보험 알려줘": [0.0, 0.0, 1.0, 0.0],
+}
+
+
+def fake_embed(text: str) -> np.ndarray:
+    return np.array([VECTORS[text]], dtype=np.float32)
+
+
+def test_hit_on_similar_question_within_same_scope() -> None:
+    cache = SemanticAnswerCache(fake_embed, threshold=0.95)
+    cache.store("PTSD 보장하는 보험은?", "Samsung@a", "삼성 PTSD 답변")
+
+    assert cache.lookup("PTSD 보장해주는 보험은?", "Samsung@a") == "삼성 PTSD 답변"
+    assert cache.lookup("암 진단비 알려줘", "Samsung@a") is None
+    assert cache.lookup("PTSD 보장하는 보험은?", "HyunDai@a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": pytest.approx(1 / 3)}
+
+
+def test_in_memory_backend_evicts_lru_and_expires() -> None:
+    cache = SemanticAnswerCache(fake_embed, backend=InMemoryAnswerBackend(max_entries=2))
+    cache.store("PTSD 보장하는 보험은?", "s", "ptsd")
+    cache.store("암 진단비 알려줘", "s", "암")
+    assert cache.lookup("PTSD 보장하는 보험은?", "s") == "ptsd"  # 적중으로 LRU 갱신
+    cache.store("치아 보험 알려줘", "s", "치아")
+    assert cache.lookup("암 진단비 알려줘", "s") is None
+    assert cache.lookup("PTSD 보장하는 보험은?", "s") == "ptsd"
+
+    expiring = SemanticAnswerCache(fake_embed, backend=InMemoryAnswerBackend(ttl=0.01))
+    expiring.store("암 진단비 알려줘", "s", "암")
+    time.sleep(0.02)
+    assert expiring.lookup("암 진단비 알려줘", "s") is None
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path: Path) -> None:
+    path = str(tmp_path / "answers.db")
+    writer = SemanticAnswerCache(fake_embed, backend=SQLiteAnswerBackend(path, max_entries=2))
+    reader = SemanticAnswerCache(fake_embed, backend=SQLiteAnswerBackend(path, max_entries=2))
+
+    writer.store("PTSD 보장하는 보험은?", "s", "ptsd")
+    assert reader.lookup("PTSD 보장해주는 보험은?", "s") == "ptsd"
+
+    writer.store("암 진단비 알려줘", "s", "암")
+    writer.store("치아 보험 알려줘", "s", "치아")
+    assert len(reader.backend.entries("s")) == 2
+
+
+def test_scope_changes_when_index_file_changes(tmp_path: Path) -> None:
+    (tmp_path / "Samsung").mkdir()
+    index_path = tmp_path / "Samsung" / "faiss.index"
+    index_path.write_bytes(b"v1")
+    scope = collection_scope(str(tmp_path), ["Samsung"])
+    assert scope == collection_scope(str(tmp_path), ["Samsung", "Samsung"])
+
+    index_path.write_bytes(b"v2-rebuilt")
+    future = time.time() + 10
+    os.utime(index_path, (future, future))
+    assert collection_scope(str(tmp_path), ["Samsung"]) != scope
@@ -0,0 +1,133 @@
+import zlib
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+import models.search
+from models.embedding_cache import EmbeddingCache
+from models.embeddings import UpstageEmbedding
+from models.search import BatchFaissSearch, FaissSearch
+
+DIM = 16
+
+
+class FixedEmbedding:
+    def __init__(self, vector: np.ndarray):
+        self.vector = vector
+
+    def get_upstage_embedding(self, text: str) -> np.ndarray:
+        return self.vector.copy()
+
+
+def make_collections(sizes: dict[str, int], seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    collections = []
+    for name, size in sizes.items():
+        vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(DIM)
+        index.add(vectors)
+        metadata = {str(i): {"header1": None, "source": name, "text": f"{name} 청크 {i}"} for i in range(size)}
+        collections.append({"name": name, "index": index, "metadata": metadata})
+    return collections
+
+
+def hash_vector(text: str) -> list[float]:
+    return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM).astype(np.float32).tolist()
+
+
+class HashEmbedder:
+    """텍스트 해시로 시드를 정하는 결정적 가짜 임베더 (langchain UpstageEmbeddings의 사용하는 부분만)"""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.requests: list[tuple[str, list[str]]] = []
+        self.client = SimpleNamespace(create=self.create)
+
+    @property
+    def _invocation_params(self) -> dict:
+        return {"model": "model"}
+
+    def create(self, input: list[str], model: str) -> SimpleNamespace:
+        self.requests.append((model, list(input)))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=hash_vector(model + text)) for text in input])
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [hash_vector(text) for text in texts]
+
+
+@pytest.fixture
+def embedding() -> UpstageEmbedding:
+    embedding = UpstageEmbedding(
+        "test_upstage_key_789",
+        cache=EmbeddingCache("model-query", max_entries=8),
+        document_cache=EmbeddingCache("model-passage", max_entries=64),
+    )
+    embedding.upstage = HashEmbedder()
+    return embedding
+
+
+def test_embed_many_dedupes_and_batches(embedding: UpstageEmbedding) -> None:
+    texts = ["PTSD 보장", "암 진단비", "PTSD  보장", "뇌출혈", "치아 보험", "암 진단비"]
+    matrix = embedding.embed_many(texts, batch_size=2)
+
+    assert matrix.shape == (6, DIM) and matrix.dtype == np.float32 and matrix.flags.c_contiguous
+    assert embedding.upstage.batches == [["PTSD 보장", "암 진단비"], ["뇌출혈", "치아 보험"]]
+    assert np.array_equal(matrix[0], matrix[2]) and np.array_equal(matrix[1], matrix[5])
+
+    # 두 번째 호출은 캐시에 없는 텍스트만 요청
+    again = embedding.embed_many(["뇌출혈", "골절"], batch_size=2)
+    assert embedding.upstage.batches[-1] == ["골절"]
+    assert np.array_equal(again[0], matrix[3])
+
+
+def test_embed_queries_uses_query_model_and_cache(embedding: UpstageEmbedding) -> None:
+    matrix = embedding.embed_queries(["PTSD 보장", "암 진단비", "PTSD  보장"], batch_size=8)
+
+    assert embedding.upstage.requests == [("model-query", ["PTSD 보장", "암 진단비"])]
+    assert embedding.upstage.batches == []
+    assert np.array_equal(matrix[0], matrix[2])
+    # 단건 검색과 같은 query 캐시를 채우므로 같은 질문은 다시 요청하지 않음
+    assert np.array_equal(embedding.get_upstage_embedding("암 진단비")[0], matrix[1])
+    assert len(embedding.upstage.requests) == 1
+
+
+def test_batch_search_embeds_queries_with_query_model(
+    monkeypatch: pytest.MonkeyPatch, embedding: UpstageEmbedding
+) -> None:
+    monkeypatch.setattr(models.search, "upembedding", embedding)
+    BatchFaissSearch(["PTSD 보장", "암 진단비"], make_collections({"Samsung": 10})).get_batch_results()
+    assert [model for model, _ in embedding.upstage.requests] == ["model-query"]
+
+
+@pytest.mark.parametrize("top_k", [1, 3])
+@pytest.mark.parametrize("collection_names", [[], ["HyunDai", "KB"]])
+def test_batch_search_matches_single_query_search(
+    monkeypatch: pytest.MonkeyPatch, top_k: int, collection_names: list[str]
+) -> None:
+    collections = make_collections({"Samsung": 50, "HyunDai": 30, "KB": 2})
+    queries = np.random.default_rng(7).standard_normal((4, DIM)).astype(np.float32)
+
+    batch_results = BatchFaissSearch(
+        ["q0", "q1", "q2", "q3"], collections, collection_names, top_k=top_k
+    ).get_batch_results(queries.copy())
+
+    assert len(batch_results) == len(queries)
+    for query, actual in zip(queries, batch_results):
+        monkeypatch.setattr(models.search, "upembedding", FixedEmbedding(query.reshape(1, -1)))
+        expected = FaissSearch("q", collections, collection_names, top_k=top_k).get_results()
+        assert [(r["collection"], r.get("doc_id")) for r in actual] == [
+            (r["collection"], r.get("doc_id")) for r in expected
+        ]
+        assert np.allclose([r["score"] for r in actual], [r["score"] for r in expected], atol=1e-6)
+
+
+def test_batch_search_pads_smaller_embeddings() -> None:
+    collections = make_collections({"Samsung": 10})
+    queries = np.random.default_rng(3).standard_normal((2, DIM - 4)).astype(np.float32)
+    results = BatchFaissSearch(["a", "b"], collections, top_k=2).get_batch_results(queries)
+    assert [len(result) for result in results] == [2, 2]
+    assert BatchFaissSearch(["a"], []).get_batch_results(queries[:1])[0][0]["collection"] == "default"
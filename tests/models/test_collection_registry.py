@@ -0,0 +1,98 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import faiss
+import numpy as np
+import pytest
+
+from models.collection_loader import CollectionLoader
+from models.collection_registry import CollectionRegistry
+from options.insu_name import insu_match
+from util.memory import rss_bytes
+
+COLLECTION_NAME = insu_match["현대해상"]
+
+
+class CountingReader:
+    def __init__(self, delay: float = 0.0):
+        self.calls: list[str] = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, folder_path: str) -> tuple[faiss.Index, dict]:
+        with self._lock:
+            self.calls.append(folder_path)
+        time.sleep(self.delay)
+        index = faiss.IndexFlatIP(4)
+        index.add(np.eye(4, dtype=np.float32))
+        metadata = {str(i): {"header1": None, "source": None, "text": f"청크 {i}"} for i in range(4)}
+        return index, metadata
+
+
+def test_registry_loads_each_collection_once_across_threads() -> None:
+    reader = CountingReader(delay=0.05)
+    registry = CollectionRegistry("/tmp/insu_data", reader=reader)
+
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(registry.get(COLLECTION_NAME))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reader.calls) == 1
+    assert len({id(handle["index"]) for handle in handles}) == 1
+    stats = registry.stats()
+    assert stats[0]["name"] == COLLECTION_NAME
+    assert stats[0]["num_vectors"] == 4
+    assert stats[0]["estimated_index_bytes"] == 4 * 4 * 4
+
+
+def test_registry_handles_are_read_only() -> None:
+    registry = CollectionRegistry("/tmp/insu_data", reader=CountingReader())
+    handle = registry.get(COLLECTION_NAME)
+    with pytest.raises(TypeError):
+        handle["metadata"]["0"] = {"text": "변경"}  # type: ignore[index]
+    with pytest.raises(TypeError):
+        handle["name"] = "other"  # type: ignore[index]
+
+
+def test_registry_rejects_unknown_collection() -> None:
+    registry = CollectionRegistry("/tmp/insu_data", reader=CountingReader())
+    with pytest.raises(ValueError):
+        registry.get("Unknown_Collection")
+
+
+def test_collection_loader_does_not_append_duplicates() -> None:
+    reader = CountingReader()
+    registry = CollectionRegistry("/tmp/insu_data", reader=reader)
+    loader = CollectionLoader("insu_data", embeddings=None, registry=registry)
+    loader.load_collection(COLLECTION_NAME)
+    loader.load_collection(COLLECTION_NAME)
+    assert [coll["name"] for coll in loader.collections] == [COLLECTION_NAME]
+    assert len(reader.calls) == 1
+
+
+def large_reader(folder_path: str) -> tuple[faiss.Index, dict]:
+    index = faiss.IndexFlatIP(256)
+    index.add(np.random.default_rng(0).random((20000, 256), dtype=np.float32))
+    return index, {"0": {"header1": None, "source": None, "text": "청크"}}
+
+
+def load_stats() -> list:
+    registry = CollectionRegistry("/tmp/insu_data", reader=large_reader)
+    registry.get(COLLECTION_NAME)
+    return registry.stats()
+
+
+@pytest.mark.skipif(rss_bytes() is None, reason="/proc/self/status가 없는 환경")
+def test_registry_measures_resident_memory_per_collection() -> None:
+    # 다른 테스트가 해제한 메모리를 재사용하지 않도록 새 프로세스에서 측정
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+        stats = executor.submit(load_stats).result()
+
+    vector_bytes = 20000 * 256 * 4
+    assert stats[0]["estimated_index_bytes"] == vector_bytes
+    assert vector_bytes * 0.9 < stats[0]["rss_bytes"] < vector_bytes * 2
@@ -0,0 +1,133 @@
+import logging
+
+from models.context_builder import ChunkTokenCounts, ContextBuilder, heuristic_token_count
+from models.generate_answer import PolicyResponse
+
+
+def hit(collection: str, doc_id: str, score: float, text: str, tokens: int) -> dict:
+    return {"collection": collection, "doc_id": doc_id, "score": score, "metadata": {"text": text}, "tokens": tokens}
+
+
+def test_heuristic_token_count() -> None:
+    assert heuristic_token_count("") == 0
+    assert heuristic_token_count("보험금") == 3
+    assert heuristic_token_count("PTSD 진단") == 2 + 2
+
+
+def test_chunk_token_counts_are_counted_on_lookup() -> None:
+    counted = []
+
+    def count_tokens(text: str) -> int:
+        counted.append(text)
+        return len(text)
+
+    metadata = {"0": {"text": "abcd"}, "1": {"text": "abcdefgh"}, "2": {}}
+    token_counts = ChunkTokenCounts(metadata, count_tokens)
+    # 로드 시에는 아무것도 계산하지 않음
+    assert counted == [] and len(token_counts) == 3 and "1" in token_counts
+
+    assert (token_counts["1"], token_counts.count("1"), token_counts.count("2", metadata["2"])) == (8, 8, 0)
+    assert counted == ["abcdefgh", ""]
+
+
+def test_ranks_globally_and_fills_budget() -> None:
+    builder = ContextBuilder(token_budget=25, min_per_company=0)
+    results = [
+        hit("Samsung", "0", 0.5, "삼성 A", 10),
+        hit("Samsung", "1", 0.3, "삼성 B", 10),
+        hit("DB", "0", 0.9, "DB A", 10),
+        hit("DB", "1", 0.8, "DB B", 10),
+    ]
+
+    packed = builder.build(results)
+    # 컬렉션 순서와 상관없이 점수가 높은 두 청크만 예산 안에 들어감
+    assert [(h["collection"], h["doc_id"]) for h in packed.hits] == [("DB", "0"), ("DB", "1")]
+    assert (packed.tokens, packed.retrieved_tokens, packed.saved_tokens) == (20, 40, 20)
+    assert packed.context == "\n---\nDB A\n---\nDB B"
+
+
+def test_keeps_minimum_per_company() -> None:
+    builder = ContextBuilder(token_budget=25, min_per_company=1)
+    results = [
+        hit("Samsung", "0", 0.3, "삼성 A", 10),
+        hit("DB", "0", 0.9, "DB A", 10),
+        hit("DB", "1", 0.8, "DB B", 10),
+    ]
+
+    packed = builder.build(results)
+    assert [(h["collection"], h["doc_id"]) for h in packed.hits] == [("DB", "0"), ("Samsung", "0")]
+    assert packed.num_companies == 2
+    assert packed.context == "\n\n## DB 정보:\n\n---\nDB A\n\n## Samsung 정보:\n\n---\n삼성 A"
+
+
+def test_score_cutoff_and_oversized_chunks() -> None:
+    builder = ContextBuilder(token_budget=30, min_per_company=1, min_score=0.5)
+    results = [
+        hit("DB", "0", 0.9, "DB A", 10),
+        hit("DB", "1", 0.8, "DB B", 100),
+        hit("DB", "2", 0.7, "DB C", 10),
+        hit("DB", "3", 0.4, "DB D", 5),
+        hit("DB", "0", 0.9, "DB A", 10),
+    ]
+
+    packed = builder.build(results)
+    # 예산을 넘는 청크는 건너뛰고, cutoff 미만 청크는 예산이 남아도 제외 (중복 청크는 한 번만)
+    assert [h["doc_id"] for h in packed.hits] == ["0", "2"]
+    assert packed.retrieved_tokens == 125
+
+
+def test_always_keeps_best_chunk() -> None:
+    packed = ContextBuilder(token_budget=5).build([hit("DB", "0", 0.9, "DB A", 50)])
+    assert [h["doc_id"] for h in packed.hits] == ["0"]
+
+
+def test_counts_tokens_when_not_precomputed() -> None:
+    builder = ContextBuilder(count_tokens=len)
+    packed = builder.build([{"collection": "DB", "score": 0.9, "metadata": {"text": "abc"}}, {"metadata": {}}])
+    assert packed.tokens == 3 and len(packed.hits) == 1
+
+
+def test_policy_response_is_stateless(caplog) -> None:
+    policy = PolicyResponse("test-key", ContextBuilder(token_budget=100, count_tokens=len))
+    with caplog.at_level(logging.INFO, logger="models.context_builder"):
+        first, _ = policy.prepare_context(
+            "질문", [hit("Samsung", "0", 0.9, "삼성 A", 10), hit("DB", "0", 0.8, "DB A", 10)]
+        )
+        second, _ = policy.prepare_context("질문", [hit("KB", "0", 0.9, "KB A", 10)])
+
+    assert first.num_companies == 2
+    # 이전 요청의 보험사 결과가 다음 요청 컨텍스트에 섞이지 않음
+    assert second.context == "\n---\nKB A" and second.num_companies == 1
+    assert "절약" in caplog.text
+
+    packed, message = policy.prepare_context("질문", [{"collection": "DB", "metadata": {"text": " "}}])
+    assert message is not None and packed.hits == []
+
+
+def test_preserve_order_keeps_mmr_order() -> None:
+    results = [
+        hit("Samsung", "0", 0.9, "삼성 A", 10),
+        hit("Samsung", "2", 0.5, "삼성 C", 10),
+        hit("Samsung", "1", 0.8, "삼성 B", 10),
+    ]
+
+    by_score = ContextBuilder(token_budget=20, min_per_company=0).build(results)
+    by_mmr = ContextBuilder(token_budget=20, min_per_company=0, preserve_order=True).build(results)
+
+    assert [h["doc_id"] for h in by_score.hits] == ["0", "1"]
+    assert [h["doc_id"] for h in by_mmr.hits] == ["0", "2"]
+    assert by_mmr.context == "\n---\n삼성 A\n---\n삼성 C"
+
+
+def test_default_document_does_not_use_budget() -> None:
+    default_document = {
+        "collection": "default",
+        "id": "0",
+        "score": 1.0,
+        "metadata": {"text": "로드된 컬렉션이 없습니다."},
+    }
+    results = [default_document, hit("Samsung", "0", 0.4, "삼성 A", 10), hit("DB", "0", 0.3, "DB A", 10)]
+
+    packed = ContextBuilder(token_budget=10, min_per_company=1).build(results)
+    assert [(h["collection"], h["doc_id"]) for h in packed.hits] == [("Samsung", "0")]
+    assert ContextBuilder().build([default_document]).context == ""
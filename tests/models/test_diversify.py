@@ -0,0 +1,119 @@
+import logging
+
+import faiss
+import numpy as np
+
+from models.diversify import Diversifier, hit_vectors
+from models.search import FaissSearch
+from options.enums import DiversifyMode
+
+VECTORS = np.array(
+    [
+        [1.0, 0.0, 0.0],
+        [0.99, 0.1, 0.0],  # 0번과 거의 같은 표준 약관
+        [0.0, 1.0, 0.0],
+        [0.7, 0.7, 0.0],
+    ],
+    dtype=np.float32,
+)
+
+
+def make_collection(name: str, vectors: np.ndarray) -> dict:
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return {"name": name, "index": index, "metadata": {str(i): {"text": f"{name} {i}"} for i in range(len(vectors))}}
+
+
+def hit(collection: str, doc_id: str, score: float) -> dict:
+    return {"collection": collection, "doc_id": doc_id, "score": score, "metadata": {"text": f"{collection} {doc_id}"}}
+
+
+def test_hit_vectors_reconstructs_normalized_rows() -> None:
+    collections = [make_collection("Samsung", VECTORS), make_collection("DB", VECTORS * 3)]
+    hits = [hit("DB", "1", 0.9), hit("Samsung", "1", 0.8), {"collection": "default", "id": "0", "metadata": {}}]
+
+    vectors, has_vector = hit_vectors(hits, collections)
+
+    assert has_vector.tolist() == [True, True, False]
+    np.testing.assert_allclose(vectors[0], vectors[1], atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(vectors[0]), 1.0, atol=1e-6)
+
+
+def test_dedup_drops_duplicates_across_collections(caplog) -> None:
+    collections = [make_collection("Samsung", VECTORS), make_collection("DB", VECTORS)]
+    hits = [hit("Samsung", "0", 0.9), hit("Samsung", "2", 0.6), hit("DB", "1", 0.85), hit("DB", "0", 0.8)]
+
+    with caplog.at_level(logging.INFO, logger="models.diversify"):
+        result = Diversifier(DiversifyMode.DEDUP, threshold=0.95).diversify(hits, collections)
+
+    assert [(h["collection"], h["doc_id"]) for h in result.kept] == [("Samsung", "0"), ("Samsung", "2")]
+    assert [(d.hit["doc_id"], d.duplicate_of["collection"], d.duplicate_of["doc_id"]) for d in result.dropped] == [
+        ("1", "Samsung", "0"),
+        ("0", "Samsung", "0"),
+    ]
+    assert result.dropped[1].similarity > 0.99
+    assert "DB#1 ≈ Samsung#0" in caplog.text
+
+
+def test_mmr_prefers_diverse_chunks() -> None:
+    collections = [make_collection("Samsung", VECTORS)]
+    hits = [hit("Samsung", "0", 0.9), hit("Samsung", "3", 0.85), hit("Samsung", "2", 0.5)]
+
+    by_score = Diversifier(DiversifyMode.DEDUP, threshold=0.95).diversify(hits, collections)
+    by_mmr = Diversifier(DiversifyMode.MMR, threshold=0.95, mmr_lambda=0.3).diversify(hits, collections)
+
+    assert [h["doc_id"] for h in by_score.kept] == ["0", "3", "2"]
+    # 0번과 비슷한 3번보다 관련도는 낮지만 다른 내용인 2번을 먼저 고름
+    assert [h["doc_id"] for h in by_mmr.kept] == ["0", "2", "3"]
+    assert by_mmr.dropped == []
+
+
+def test_keeps_hits_without_vectors() -> None:
+    quantizer = faiss.IndexFlatIP(3)
+    ivf = faiss.IndexIVFFlat(quantizer, 3, 1, faiss.METRIC_INNER_PRODUCT)
+    ivf.train(VECTORS)
+    ivf.add(VECTORS)
+    collections = [{"name": "KB", "index": ivf, "metadata": {}}]
+    hits = [hit("KB", "0", 0.9), hit("KB", "1", 0.8)]
+
+    # direct map이 없는 IVF 인덱스는 벡터를 복원할 수 없으므로 그대로 반환
+    result = Diversifier().diversify(hits, collections)
+    assert result.kept == hits and result.dropped == []
+
+
+def test_faiss_search_applies_diversifier(monkeypatch) -> None:
+    collections = [make_collection("Samsung", VECTORS), make_collection("DB", VECTORS)]
+    query = np.array([[1.0, 0.05, 0.0]], dtype=np.float32)
+    monkeypatch.setattr("models.search.upembedding.get_upstage_embedding", lambda text: query.copy())
+
+    plain = FaissSearch("질문", collections, top_k=2, hybrid=False).get_results()
+    diversified = FaissSearch("질문", collections, top_k=2, hybrid=False, diversifier=Diversifier()).get_results()
+
+    assert len(plain) == 4
+    assert [(h["collection"], h["doc_id"]) for h in diversified] == [("Samsung", "0")]
+
+
+def test_mmr_selects_k_chunks_different_from_dedup() -> None:
+    collections = [make_collection("Samsung", VECTORS)]
+    hits = [hit("Samsung", "0", 0.9), hit("Samsung", "3", 0.85), hit("Samsung", "2", 0.5)]
+
+    by_score = Diversifier(DiversifyMode.DEDUP, threshold=0.95).diversify(hits, collections, k=2)
+    by_mmr = Diversifier(DiversifyMode.MMR, threshold=0.95, mmr_lambda=0.3).diversify(hits, collections, k=2)
+
+    # dedup은 k와 상관없이 중복만 제외하고, mmr은 다양성을 고려해 k개만 고름
+    assert [h["doc_id"] for h in by_score.kept] == ["0", "3", "2"]
+    assert [h["doc_id"] for h in by_mmr.kept] == ["0", "2"]
+
+
+def test_faiss_search_mmr_picks_from_wider_candidates(monkeypatch) -> None:
+    collections = [make_collection("Samsung", VECTORS)]
+    query = np.array([[1.0, 0.05, 0.0]], dtype=np.float32)
+    monkeypatch.setattr("models.search.upembedding.get_upstage_embedding", lambda text: query.copy())
+
+    plain = FaissSearch("질문", collections, top_k=2, hybrid=False).get_results()
+    diversifier = Diversifier(DiversifyMode.MMR, threshold=0.95, mmr_lambda=0.5, mmr_fetch_k=4)
+    diversified = FaissSearch("질문", collections, top_k=2, hybrid=False, diversifier=diversifier).get_results()
+
+    assert [h["doc_id"] for h in plain] == ["0", "1"]
+    # 0번과 거의 같은 1번 대신 top_k 밖의 후보에서 다른 내용을 고름
+    assert [h["doc_id"] for h in diversified] == ["0", "3"]
@@ -0,0 +1,69 @@
+import time
+from pathlib import Path
+
+import numpy as np
+
+from models.embedding_cache import EmbeddingCache, SQLiteEmbeddingStore
+from models.embeddings import UpstageEmbedding
+from util.lru_cache import LRUCache
+
+
+class FakeUpstage:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return [float(len(text)), 1.0, 2.0, 3.0]
+
+
+def test_lru_cache_evicts_by_entries_and_bytes() -> None:
+    cache: LRUCache[str, bytes] = LRUCache(max_entries=3, max_bytes=10, sizeof=len)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")  # 12바이트가 되어 가장 오래 안 쓴 b 제거
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.nbytes == 8
+
+
+def test_lru_cache_expires_entries() -> None:
+    cache: LRUCache[str, int] = LRUCache(ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_embedding_cache_normalizes_text_and_returns_copies() -> None:
+    cache = EmbeddingCache("solar-embedding-1-large-query", max_entries=2)
+    cache.put("PTSD  보장 ", np.ones((1, 4), dtype=np.float32))
+    vector = cache.get("PTSD 보장")
+    assert vector is not None
+    vector[0, 0] = 100.0
+    assert cache.get("PTSD 보장")[0, 0] == 1.0
+    assert cache.stats()["hits"] == 2
+
+
+def test_embedding_cache_disk_tier_survives_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model-a", disk_store=SQLiteEmbeddingStore(path))
+    cache.put("암 진단비", np.arange(4, dtype=np.float32).reshape(1, 4))
+
+    restarted = EmbeddingCache("model-a", disk_store=SQLiteEmbeddingStore(path))
+    assert np.array_equal(restarted.get("암 진단비"), np.arange(4, dtype=np.float32).reshape(1, 4))
+    assert restarted.stats()["disk_hits"] == 1
+    # 같은 텍스트라도 모델이 다르면 다른 키
+    assert EmbeddingCache("model-b", disk_store=SQLiteEmbeddingStore(path)).get("암 진단비") is None
+
+
+def test_upstage_embedding_uses_cache() -> None:
+    embedding = UpstageEmbedding("test_upstage_key_789", cache=EmbeddingCache("model", max_entries=8))
+    fake = FakeUpstage()
+    embedding.upstage = fake
+    first = embedding.get_upstage_embedding("PTSD 보장하는 보험은?")
+    second = embedding.get_upstage_embedding("PTSD 보장하는  보험은?")
+    assert fake.calls == 1
+    assert first.shape == (1, 4) and np.array_equal(first, second)
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+from models.collection_loader import CollectionLoader
+from models.index_builder import apply_search_params, build_collection_variant, build_index, index_file_name
+from options.enums import IndexVariant
+
+DIM = 32
+
+
+def make_vectors(num_vectors: int, seed: int = 0) -> np.ndarray:
+    # 클러스터 구조가 있는 정규화 벡터 (실제 약관 청크 임베딩과 비슷하게)
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((16, DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, 16, num_vectors)] + 0.3 * rng.standard_normal((num_vectors, DIM))
+    vectors = vectors.astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(index: faiss.Index, exact: faiss.Index, queries: np.ndarray, k: int) -> float:
+    _, expected = exact.search(queries, k)
+    _, actual = index.search(queries, k)
+    return float(np.mean([len(set(a) & set(e)) / k for a, e in zip(actual, expected)]))
+
+
+@pytest.mark.parametrize(
+    "variant, min_recall",
+    [(IndexVariant.SQ8, 0.9), (IndexVariant.HNSW, 0.9), (IndexVariant.IVFPQ, 0.5)],
+)
+def test_variants_keep_doc_ids_and_recall(variant: IndexVariant, min_recall: float) -> None:
+    vectors = make_vectors(2000)
+    queries = make_vectors(50, seed=1)
+    exact = build_index(vectors, IndexVariant.FLAT)
+
+    index = build_index(vectors, variant, pq_m=8)
+    apply_search_params(index, nprobe=8, ef_search=64)
+
+    assert index.ntotal == exact.ntotal
+    assert recall_at_k(index, exact, queries, k=5) >= min_recall
+
+
+def test_ivfpq_shrinks_parameters_for_small_collections() -> None:
+    index = build_index(make_vectors(100), IndexVariant.IVFPQ, pq_m=8)
+    ivf_index = faiss.extract_index_ivf(index)
+    assert ivf_index.nlist <= 100 // 39
+    assert 2**index.pq.nbits <= 100
+
+
+def test_ivfpq_rejects_m_not_dividing_dim() -> None:
+    with pytest.raises(ValueError):
+        build_index(make_vectors(500), IndexVariant.IVFPQ, pq_m=7)
+
+
+def test_load_local_picks_variant_and_falls_back(tmp_path: Path) -> None:
+    faiss.write_index(build_index(make_vectors(300), IndexVariant.FLAT), str(tmp_path / "faiss.index"))
+    (tmp_path / "metadata.json").write_text(
+        json.dumps({str(i): {"header1": None, "source": None, "text": f"청크 {i}"} for i in range(300)})
+    )
+
+    index, _ = CollectionLoader.load_local(str(tmp_path), index_variant=IndexVariant.HNSW)
+    assert isinstance(index, faiss.IndexFlat)
+
+    out_path, _ = build_collection_variant(str(tmp_path), IndexVariant.HNSW, hnsw_m=16)
+    assert Path(out_path).name == index_file_name(IndexVariant.HNSW) == "faiss_hnsw.index"
+    index, metadata = CollectionLoader.load_local(str(tmp_path), index_variant=IndexVariant.HNSW)
+    assert isinstance(index, faiss.IndexHNSW)
+    assert index.ntotal == len(metadata) == 300
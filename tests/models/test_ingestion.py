@@ -0,0 +1,167 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+
+import faiss
+import numpy as np
+import pytest
+
+from models.collection_loader import CollectionLoader
+from models.ingestion import MANIFEST_FILE, IngestionPipeline, chunk_document, split_text
+
+DIM = 16
+
+POLICY = """머리말
+
+# 제1조 보험금의 지급사유
+회사는 피보험자가 보험기간 중 상해로 사망한 경우 사망보험금을 지급합니다.
+
+## 제1항
+골절 진단이 확정된 경우 골절진단비를 지급합니다.
+
+# 제2조 보험금을 지급하지 않는 사유
+피보험자가 고의로 자신을 해친 경우 보험금을 지급하지 않습니다.
+"""
+
+
+class CountingEmbedder:
+    # 텍스트 해시로 만든 고정 벡터, 임베딩한 텍스트를 기록
+    def __init__(self, model_name: str = "fake-embedding"):
+        self.model_name = model_name
+        self.texts: list[str] = []
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        self.texts += texts
+        seeds = [int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) for text in texts]
+        return np.stack([np.random.default_rng(seed).standard_normal(DIM) for seed in seeds]).astype(np.float32)
+
+
+@pytest.fixture
+def source_dir(tmp_path: Path) -> Path:
+    source = tmp_path / "docs"
+    (source / "special").mkdir(parents=True)
+    (source / "main.md").write_text(POLICY, encoding="utf-8")
+    (source / "special" / "cancer.txt").write_text("유사암 진단비는 보험가입금액의 20%를 지급합니다.", encoding="utf-8")
+    records = [
+        {"header1": "제3조 암 진단비", "source": "암특약.pdf", "text": "암으로 진단이 확정된 경우 지급합니다."},
+        {"text": "출처가 없는 청크"},
+    ]
+    (source / "chunks.jsonl").write_text(
+        "\n".join(json.dumps(r, ensure_ascii=False) for r in records), encoding="utf-8"
+    )
+    (source / "ignored.pdf").write_bytes(b"%PDF")
+    return source
+
+
+def test_split_text_respects_size_and_overlap() -> None:
+    text = "\n\n".join(f"{i}번 문단 " + "가" * 30 for i in range(10)) + "\n\n" + "나" * 250
+    chunks = split_text(text, chunk_size=100, overlap=20)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    # 긴 문단은 겹치게 잘리고, 모든 문단이 어떤 청크에든 포함됨
+    assert all(any(f"{i}번 문단" in chunk for chunk in chunks) for i in range(10))
+    long_pieces = [chunk for chunk in chunks if chunk.startswith("나")]
+    assert len(long_pieces) == 3 and long_pieces[0][-20:] == long_pieces[1][:20]
+    assert split_text("  \n\n ", chunk_size=100, overlap=20) == []
+
+
+def test_chunk_document_uses_markdown_headers(source_dir: Path) -> None:
+    chunks = chunk_document(str(source_dir / "main.md"), "main.md", chunk_size=1000, overlap=100)
+
+    assert [chunk["header1"] for chunk in chunks] == [
+        None,
+        "제1조 보험금의 지급사유",
+        "제2조 보험금을 지급하지 않는 사유",
+    ]
+    assert "## 제1항" in chunks[1]["text"]
+    assert {chunk["source"] for chunk in chunks} == {"main.md"}
+
+
+def test_pipeline_builds_loadable_collection(source_dir: Path, tmp_path: Path) -> None:
+    collection_dir = tmp_path / "insu_data" / "Samsung"
+    stats = IngestionPipeline(CountingEmbedder(), workers=2, batch_size=2).run(str(source_dir), str(collection_dir))
+
+    index, metadata = CollectionLoader.load_local(str(collection_dir))
+    assert (stats.documents, stats.chunks, stats.embedded, stats.reused) == (3, 6, 6, 0)
+    assert index.ntotal == len(metadata) == 6
+    # 문서 경로 순서대로 doc_id 부여
+    assert [metadata[str(i)]["source"] for i in range(6)] == [
+        "암특약.pdf",
+        "chunks.jsonl",
+        "main.md",
+        "main.md",
+        "main.md",
+        "special/cancer.txt",
+    ]
+
+    query = CountingEmbedder().embed_many([metadata["5"]["text"]])
+    faiss.normalize_L2(query)
+    scores, ids = index.search(query, 1)
+    assert ids[0][0] == 5 and scores[0][0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_reingest_only_embeds_changed_chunks(source_dir: Path, tmp_path: Path) -> None:
+    collection_dir = str(tmp_path / "Samsung")
+    IngestionPipeline(CountingEmbedder(), workers=1).run(str(source_dir), collection_dir)
+    before, _ = CollectionLoader.load_local(collection_dir)
+
+    (source_dir / "main.md").write_text(
+        POLICY.replace("고의로 자신을 해친 경우", "고의로 자신을 해친 경우 또는 전쟁으로 인한 경우"), encoding="utf-8"
+    )
+    embedder = CountingEmbedder()
+    stats = IngestionPipeline(embedder, workers=1).run(str(source_dir), collection_dir)
+    after, metadata = CollectionLoader.load_local(collection_dir)
+
+    assert (stats.embedded, stats.reused) == (1, 5)
+    assert embedder.texts == [metadata["4"]["text"]]
+    unchanged = [0, 1, 2, 3, 5]
+    np.testing.assert_allclose(after.reconstruct_batch(unchanged), before.reconstruct_batch(unchanged), atol=1e-6)
+
+
+def test_embedder_change_reembeds_everything(source_dir: Path, tmp_path: Path) -> None:
+    collection_dir = str(tmp_path / "Samsung")
+    IngestionPipeline(CountingEmbedder(), workers=1).run(str(source_dir), collection_dir)
+    stats = IngestionPipeline(CountingEmbedder("other-embedding"), workers=1).run(str(source_dir), collection_dir)
+
+    assert (stats.embedded, stats.reused) == (6, 0)
+    with open(Path(collection_dir) / MANIFEST_FILE, encoding="utf-8") as f:
+        assert json.load(f)["embedder"] == "other-embedding"
+
+
+def test_failed_embedding_keeps_previous_collection(source_dir: Path, tmp_path: Path) -> None:
+    class FailingEmbedder(CountingEmbedder):
+        def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+            raise RuntimeError("embedding API error")
+
+    collection_dir = str(tmp_path / "Samsung")
+    IngestionPipeline(CountingEmbedder(), workers=1).run(str(source_dir), collection_dir)
+    (source_dir / "new.md").write_text("# 새 조항\n새로운 내용", encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="embedding API error"):
+        IngestionPipeline(FailingEmbedder(), workers=1, batch_size=1, queue_size=1).run(str(source_dir), collection_dir)
+    _, metadata = CollectionLoader.load_local(collection_dir)
+    assert len(metadata) == 6
+
+
+def test_rewrite_replaces_collection_as_a_whole(
+    source_dir: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    collection_dir = tmp_path / "Samsung"
+    pipeline = IngestionPipeline(CountingEmbedder(), workers=1)
+    pipeline.run(str(source_dir), str(collection_dir))
+    (collection_dir / "faiss_hnsw.index").write_bytes(b"stale")
+    before = {path.name: path.read_bytes() for path in collection_dir.iterdir()}
+
+    # 메타데이터를 쓰다 실패하면 새 인덱스도 반영되지 않음
+    index, _ = CollectionLoader.load_local(str(collection_dir))
+    with pytest.raises(TypeError):
+        pipeline.write(str(collection_dir), index, {"0": {"text": object()}}, ["hash"])
+    assert {path.name: path.read_bytes() for path in collection_dir.iterdir()} == before
+    # 임시 폴더는 남지 않음
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["Samsung", "docs"]
+
+    pipeline.run(str(source_dir), str(collection_dir))
+    # 이전 벡터로 만든 변형 인덱스는 옮기지 않고 다시 생성하라고 경고
+    assert not (collection_dir / "faiss_hnsw.index").exists()
+    assert "hnsw" in caplog.text
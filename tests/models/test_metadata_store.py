@@ -0,0 +1,181 @@
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+from models.collection_loader import CollectionLoader
+from models.collection_registry import CollectionRegistry
+from models.metadata_store import BLOB_FILE, MmapMetadataStore
+from models.mmap_index import MmapFlatIndex, vectors_file_name
+from models.sparse_index import BM25Index
+from options.enums import CollectionLoadMode
+from options.insu_name import insu_match
+from util.atomic_file import atomic_write
+from util.memory import rss_bytes
+
+
+def write_collection(folder: Path, metadata: object) -> None:
+    folder.mkdir(parents=True, exist_ok=True)
+    index = faiss.IndexFlatIP(8)
+    index.add(np.random.default_rng(0).random((3, 8), dtype=np.float32))
+    faiss.write_index(index, str(folder / "faiss.index"))
+    (folder / "metadata.json").write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+
+
+def test_mmap_store_matches_json_metadata(tmp_path: Path) -> None:
+    metadata = [
+        {"header1": "제1조", "source": "약관.pdf", "text": "외상후 스트레스 장애(PTSD)는 F43.1 입니다."},
+        {"header1": None, "source": None, "text": ""},
+        {"header1": "제3조", "source": "약관.pdf", "text": "암 진단비 지급 기준"},
+    ]
+    write_collection(tmp_path, metadata)
+
+    store = MmapMetadataStore.load(str(tmp_path))
+
+    assert len(store) == 3
+    assert list(store) == ["0", "1", "2"]
+    assert store["0"] == metadata[0]
+    assert store["2"]["text"] == "암 진단비 지급 기준"
+    assert "3" not in store and "-1" not in store and "abc" not in store
+    with pytest.raises(KeyError):
+        store["3"]
+
+
+def test_mmap_store_skips_missing_doc_ids(tmp_path: Path) -> None:
+    write_collection(tmp_path, {"0": {"text": "첫 번째"}, "2": {"text": "세 번째"}})
+    store = MmapMetadataStore.load(str(tmp_path))
+    assert "1" not in store
+    assert dict(store) == {"0": {"text": "첫 번째"}, "2": {"text": "세 번째"}}
+
+
+def test_mmap_store_detects_blob_from_another_build(tmp_path: Path) -> None:
+    write_collection(tmp_path, [{"text": "이전 청크 가"}, {"text": "이전 청크 나"}])
+    MmapMetadataStore.build(str(tmp_path))
+    old_blob = (tmp_path / BLOB_FILE).read_bytes()
+    metadata = [{"text": "새 청크 가나"}, {"text": "새 청크 다"}]
+    write_collection(tmp_path, metadata)
+    MmapMetadataStore.build(str(tmp_path))
+
+    # 다른 워커가 오프셋만 교체하고 blob은 아직 이전 것인 상태
+    (tmp_path / BLOB_FILE).write_bytes(old_blob)
+    with pytest.raises(ValueError):
+        MmapMetadataStore(str(tmp_path))
+    store = MmapMetadataStore.load(str(tmp_path))
+    assert isinstance(store, MmapMetadataStore)
+    assert [store["0"], store["1"]] == metadata
+
+
+def test_load_local_mmap_mode_returns_same_data(tmp_path: Path) -> None:
+    write_collection(tmp_path, [{"text": "가"}, {"text": "나"}, {"text": "다"}])
+
+    memory_index, memory_metadata = CollectionLoader.load_local(str(tmp_path))
+    mmap_index, mmap_metadata = CollectionLoader.load_local(str(tmp_path), load_mode=CollectionLoadMode.MMAP)
+
+    query = np.ones((1, 8), dtype=np.float32)
+    assert np.array_equal(memory_index.search(query, 3)[1], mmap_index.search(query, 3)[1])
+    assert isinstance(mmap_index, MmapFlatIndex) and isinstance(mmap_metadata, MmapMetadataStore)
+    assert dict(mmap_metadata) == memory_metadata
+
+
+@pytest.mark.parametrize("k", [1, 5, 300])
+def test_mmap_flat_index_matches_faiss(tmp_path: Path, k: int) -> None:
+    rng = np.random.default_rng(1)
+    index = faiss.IndexFlatIP(16)
+    index.add(rng.standard_normal((200, 16)).astype(np.float32))
+    index_path = str(tmp_path / "faiss.index")
+    faiss.write_index(index, index_path)
+    queries = rng.standard_normal((3, 16)).astype(np.float32)
+
+    mmap_index = MmapFlatIndex.load(index_path)
+    expected_distances, expected_ids = index.search(queries, k)
+    distances, ids = mmap_index.search(queries, k)
+
+    assert np.array_equal(ids, expected_ids)
+    assert np.allclose(distances, expected_distances, atol=1e-5)
+    assert np.array_equal(mmap_index.reconstruct_batch(np.array([3, 7])), index.reconstruct_batch(np.array([3, 7])))
+
+
+def heap_growth_after_load(folder_path: str, load_mode: CollectionLoadMode) -> int:
+    before = rss_bytes("RssAnon")
+    index, _ = CollectionLoader.load_local(folder_path, load_mode=load_mode)
+    index.search(np.ones((1, index.d), dtype=np.float32), 3)
+    return rss_bytes("RssAnon") - before
+
+
+@pytest.mark.skipif(rss_bytes("RssAnon") is None, reason="/proc/self/status가 없는 환경")
+def test_mmap_mode_keeps_vectors_out_of_process_heap(tmp_path: Path) -> None:
+    index = faiss.IndexFlatIP(256)
+    index.add(np.random.default_rng(0).random((20000, 256), dtype=np.float32))
+    faiss.write_index(index, str(tmp_path / "faiss.index"))
+    (tmp_path / "metadata.json").write_text(json.dumps([{"text": ""}] * 20000), encoding="utf-8")
+    MmapMetadataStore.build(str(tmp_path))
+    MmapFlatIndex.build(str(tmp_path / "faiss.index"))
+    vector_bytes = 20000 * 256 * 4
+
+    # 새 프로세스에서 로드해 힙(RssAnon) 증가량만 측정. mmap 페이지는 파일 페이지(RssFile)로 잡힘
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+        memory_growth = executor.submit(heap_growth_after_load, str(tmp_path), CollectionLoadMode.MEMORY).result()
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+        mmap_growth = executor.submit(heap_growth_after_load, str(tmp_path), CollectionLoadMode.MMAP).result()
+
+    assert memory_growth > vector_bytes * 0.9
+    assert mmap_growth < vector_bytes * 0.1
+    assert Path(vectors_file_name(str(tmp_path / "faiss.index"))).exists()
+
+
+def test_registry_load_does_not_decode_mmap_records(tmp_path: Path) -> None:
+    class CountingStore(MmapMetadataStore):
+        reads = 0
+
+        def __getitem__(self, doc_id: str) -> dict:
+            CountingStore.reads += 1
+            return super().__getitem__(doc_id)
+
+    collection_name = insu_match["현대해상"]
+    folder = tmp_path / collection_name
+    write_collection(folder, [{"header1": None, "source": None, "text": f"청크 {i}"} for i in range(3)])
+    MmapMetadataStore.build(str(folder))
+    registry = CollectionRegistry(
+        str(tmp_path), reader=lambda path: (faiss.read_index(f"{path}/faiss.index"), CountingStore(path))
+    )
+
+    collection = registry.get(collection_name)
+    # 토큰 수는 검색 결과로 조회될 때만 계산
+    assert CountingStore.reads == 0
+    assert collection["token_counts"].count("1") > 0 and CountingStore.reads == 1
+
+
+def build_repeatedly(folder_path: str) -> None:
+    for _ in range(5):
+        MmapMetadataStore.build(folder_path)
+        BM25Index.load(folder_path).save(folder_path)
+
+
+def test_concurrent_builds_do_not_corrupt_store(tmp_path: Path) -> None:
+    metadata = [{"header1": None, "source": "약관.pdf", "text": f"제{i}조 보험금 지급 " * (i + 1)} for i in range(200)]
+    write_collection(tmp_path, metadata)
+
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("fork")) as executor:
+        list(executor.map(build_repeatedly, [str(tmp_path)] * 4))
+
+    store = MmapMetadataStore(str(tmp_path))
+    assert [store[str(i)] for i in range(len(metadata))] == metadata
+    assert BM25Index.load(str(tmp_path)).search("제7조", 1)[0].tolist() == [7]
+    # 프로세스별 임시 파일은 모두 교체되거나 정리됨
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_atomic_write_keeps_existing_file_on_error(tmp_path: Path) -> None:
+    target = tmp_path / BLOB_FILE
+    target.write_bytes(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(target) as f:
+            f.write(b"partial")
+            raise RuntimeError("write failed")
+    assert target.read_bytes() == b"old"
+    assert not list(tmp_path.glob("*.tmp"))
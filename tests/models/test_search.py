@@ -1,8 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
 import numpy as np
 import pytest
 from numpy.typing import NDArray
 
-from models.search import FaissSearch
+import models.search
+from models.search import FaissSearch, configure_faiss_threads
+
+DIM = 16
 
 
 class DummyIndex:
@@ -15,6 +21,27 @@ class DummyIndex:
         return self._distances.reshape(1, -1), self._indices.reshape(1, -1)
 
 
+class FixedEmbedding:
+    def __init__(self, vector: np.ndarray):
+        self.vector = vector
+
+    def get_upstage_embedding(self, text: str) -> np.ndarray:
+        return self.vector.copy()
+
+
+def make_collections(sizes: dict[str, int], seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    collections = []
+    for name, size in sizes.items():
+        vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(DIM)
+        index.add(vectors)
+        metadata = {str(i): {"header1": None, "source": name, "text": f"{name} 청크 {i}"} for i in range(size)}
+        collections.append({"name": name, "index": index, "metadata": metadata})
+    return collections
+
+
 @pytest.mark.parametrize(
     "query_dim, index_dim, expected_shape",
     [
@@ -65,3 +92,26 @@ def test_get_results_returns_default_when_no_collections() -> None:
             "metadata": {"text": "로드된 컬렉션이 없습니다."},
         }
     ]
+
+
+@pytest.mark.parametrize("top_k", [1, 3])
+def test_parallel_search_matches_sequential_order(monkeypatch: pytest.MonkeyPatch, top_k: int) -> None:
+    collections = make_collections({"Samsung": 200, "HyunDai": 150, "KB": 3, "Meritz": 1})
+    query = np.random.default_rng(42).standard_normal((1, DIM)).astype(np.float32)
+    monkeypatch.setattr(models.search, "upembedding", FixedEmbedding(query))
+
+    expected = FaissSearch("PTSD 보장", collections, top_k=top_k).get_results()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        actual = FaissSearch("PTSD 보장", collections, top_k=top_k, executor=executor).get_results()
+
+    assert actual == expected
+    order = [c["name"] for c in collections]
+    positions = [order.index(r["collection"]) for r in actual if r["collection"] != "default"]
+    assert positions == sorted(positions)
+
+
+def test_configure_faiss_threads_splits_cores(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(models.search.os, "cpu_count", lambda: 8)
+    assert configure_faiss_threads(4) == 2
+    assert configure_faiss_threads(16) == 1
+    assert configure_faiss_threads(4, omp_threads=3) == 3
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+import models.search
+from models.search import FaissSearch
+from models.sparse_index import SPARSE_INDEX_FILE, BM25Index, reciprocal_rank_fusion, tokenize
+
+TEXTS = [
+    "외상후 스트레스 장애(F43.1)는 정신질환 특약에서 보장합니다.",
+    "암 진단비는 최초 1회에 한하여 지급합니다.",
+    "제3조 보험금의 지급사유: 상해로 입원한 경우 입원일당을 지급합니다.",
+    "뇌출혈 및 급성심근경색 진단 시 진단비를 지급합니다.",
+    "PTSD 진단을 받은 경우 심리치료비를 보장합니다.",
+]
+
+
+class FixedEmbedding:
+    def __init__(self, vector: np.ndarray):
+        self.vector = vector
+
+    def get_upstage_embedding(self, text: str) -> np.ndarray:
+        return self.vector.copy()
+
+
+@pytest.fixture
+def metadata() -> dict:
+    return {str(i): {"header1": None, "source": "Samsung", "text": text} for i, text in enumerate(TEXTS)}
+
+
+def test_tokenize_keeps_codes_and_korean_ngrams() -> None:
+    tokens = tokenize("PTSD(F43.1) 보험은?")
+    assert {"ptsd", "f43.1", "보험은", "보험", "험은"} <= set(tokens)
+
+
+def test_bm25_finds_exact_terms(metadata: dict) -> None:
+    index = BM25Index.build(metadata)
+    doc_ids, scores = index.search("F43.1 보장", top_k=2)
+    assert doc_ids[0] == 0
+    assert list(scores) == sorted(scores, reverse=True)
+    assert index.search("PTSD", top_k=3)[0].tolist() == [4]
+    assert len(index.search("골프", top_k=3)[0]) == 0
+    # 조사가 붙은 단어도 n-gram으로 매칭
+    assert index.search("입원일당은", top_k=1)[0].tolist() == [2]
+
+
+def test_bm25_save_load_and_rebuild_when_stale(tmp_path: Path, metadata: dict) -> None:
+    (tmp_path / "metadata.json").write_text(json.dumps(metadata, ensure_ascii=False))
+    built = BM25Index.load(str(tmp_path))
+    assert (tmp_path / SPARSE_INDEX_FILE).exists()
+
+    loaded = BM25Index.load(str(tmp_path))
+    assert np.array_equal(loaded.search("암 진단비", 3)[0], built.search("암 진단비", 3)[0])
+
+    metadata["5"] = {"header1": None, "source": "Samsung", "text": "치아 보철 치료비"}
+    (tmp_path / "metadata.json").write_text(json.dumps(metadata, ensure_ascii=False))
+    future = time.time() + 10
+    os.utime(tmp_path / "metadata.json", (future, future))
+    assert BM25Index.is_stale(str(tmp_path))
+    assert BM25Index.load(str(tmp_path)).search("보철", 1)[0].tolist() == [5]
+
+
+def test_reciprocal_rank_fusion_orders_by_combined_rank() -> None:
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_hybrid_search_promotes_exact_term_match(monkeypatch: pytest.MonkeyPatch, metadata: dict) -> None:
+    vectors = np.eye(len(TEXTS), 8, dtype=np.float32)
+    index = faiss.IndexFlatIP(8)
+    index.add(vectors)
+    collection = {"name": "Samsung", "index": index, "metadata": metadata, "sparse_index": BM25Index.build(metadata)}
+    # 벡터 검색은 암 진단비(1번) 청크와 가장 가깝다고 가정
+    query = np.zeros((1, 8), dtype=np.float32)
+    query[0, 1] = 1.0
+    query[0, 4] = 0.1
+    monkeypatch.setattr(models.search, "upembedding", FixedEmbedding(query))
+
+    vector_only = FaissSearch("PTSD 보장", [collection], top_k=1, hybrid=False).get_results()
+    hybrid = FaissSearch("PTSD 보장", [collection], top_k=1, hybrid=True).get_results()
+
+    assert vector_only[0]["doc_id"] == "1"
+    assert hybrid[0]["doc_id"] == "4"
+    assert len(hybrid) == 1
@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+import models.search
+from models.collection_registry import CollectionRegistry
+from models.search import FaissSearch
+from models.unified_index import UNIFIED_COLLECTIONS_FILE, UnifiedIndex
+
+DIM = 16
+
+
+class FixedEmbedding:
+    def __init__(self, vector: np.ndarray):
+        self.vector = vector
+
+    def get_upstage_embedding(self, text: str) -> np.ndarray:
+        return self.vector.copy()
+
+
+def make_collections(sizes: dict[str, int], seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    collections = []
+    for name, size in sizes.items():
+        vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(DIM)
+        index.add(vectors)
+        metadata = {str(i): {"header1": None, "source": name, "text": f"{name} 청크 {i}"} for i in range(size)}
+        collections.append({"name": name, "index": index, "metadata": metadata})
+    return collections
+
+
+@pytest.fixture
+def collections() -> list[dict]:
+    # 작은 컬렉션은 다른 보험사 결과에 밀려 컬렉션 단위 재검색 경로를 타게 됨
+    return make_collections({"Samsung": 200, "HyunDai": 150, "KB": 3, "Meritz": 1})
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("top_k", [1, 2, 5])
+@pytest.mark.parametrize("collection_names", [[], ["HyunDai", "KB"], ["Meritz"]])
+def test_unified_index_matches_per_collection_search(
+    monkeypatch: pytest.MonkeyPatch, collections: list[dict], seed: int, top_k: int, collection_names: list[str]
+) -> None:
+    query = np.random.default_rng(100 + seed).standard_normal((1, DIM)).astype(np.float32)
+    monkeypatch.setattr(models.search, "upembedding", FixedEmbedding(query))
+    unified_index = UnifiedIndex.build((collection["name"], collection["index"]) for collection in collections)
+
+    expected = FaissSearch("PTSD 보장", collections, collection_names, top_k=top_k).get_results()
+    actual = FaissSearch(
+        "PTSD 보장", collections, collection_names, top_k=top_k, unified_index=unified_index
+    ).get_results()
+
+    assert [(r["collection"], r.get("doc_id")) for r in actual] == [
+        (r["collection"], r.get("doc_id")) for r in expected
+    ]
+    assert np.allclose([r["score"] for r in actual], [r["score"] for r in expected], atol=1e-6)
+
+
+def test_unified_index_save_and_load(tmp_path: Path, collections: list[dict]) -> None:
+    unified_index = UnifiedIndex.build((collection["name"], collection["index"]) for collection in collections)
+    unified_index.save(str(tmp_path))
+    loaded = UnifiedIndex.load(str(tmp_path))
+    assert loaded.collection_names == ["Samsung", "HyunDai", "KB", "Meritz"]
+    assert loaded.collection_sizes == [200, 150, 3, 1]
+    assert loaded.index.ntotal == 354
+
+
+def test_unified_index_rejects_mismatched_dimensions() -> None:
+    with pytest.raises(ValueError):
+        UnifiedIndex.build([("A", faiss.IndexFlatIP(4)), ("B", faiss.IndexFlatIP(8))])
+
+
+def write_unified_index(base_path: Path, collections: list[dict]) -> Path:
+    for collection in collections:
+        (base_path / collection["name"]).mkdir(parents=True)
+        faiss.write_index(collection["index"], str(base_path / collection["name"] / "faiss.index"))
+    unified_index = UnifiedIndex.build(
+        ((collection["name"], collection["index"]) for collection in collections), base_path=str(base_path)
+    )
+    unified_index.save(str(base_path / "unified"))
+    return base_path / "unified"
+
+
+def test_registry_skips_unified_index_after_reingest(
+    tmp_path: Path, collections: list[dict], caplog: pytest.LogCaptureFixture
+) -> None:
+    unified_path = write_unified_index(tmp_path, collections)
+    assert CollectionRegistry(str(tmp_path), unified_index_path=str(unified_path)).get_unified_index() is not None
+    assert not list(unified_path.glob("*.tmp"))
+
+    # 컬렉션을 다시 수집하면 통합 인덱스의 doc_id가 어긋나므로 컬렉션별 검색으로 돌아감
+    faiss.write_index(make_collections({"KB": 5}, seed=1)[0]["index"], str(tmp_path / "KB" / "faiss.index"))
+    registry = CollectionRegistry(str(tmp_path), unified_index_path=str(unified_path))
+    assert registry.get_unified_index() is None
+    assert "KB" in caplog.text
+
+
+def test_registry_skips_unified_index_without_sources(tmp_path: Path, collections: list[dict]) -> None:
+    unified_path = write_unified_index(tmp_path, collections)
+    sidecar = json.loads((unified_path / UNIFIED_COLLECTIONS_FILE).read_text(encoding="utf-8"))
+    del sidecar["sources"]
+    (unified_path / UNIFIED_COLLECTIONS_FILE).write_text(json.dumps(sidecar), encoding="utf-8")
+
+    assert CollectionRegistry(str(tmp_path), unified_index_path=str(unified_path)).get_unified_index() is None
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from db.sql_utils import TemplateManager
+from modules.handler import IntentHandler
+from modules.intent_classifier import LocalIntentClassifier
+from options.enums import IntentType
+
+
+class FakeOpenAI:
+    def __init__(self, content: str):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.content = content
+
+    def create(self, **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))])
+
+
+class FakeTemplateManager(TemplateManager):
+    def __init__(self) -> None:
+        pass
+
+    def render(self, template_name: str, **kwargs: object) -> str:
+        return str(kwargs)
+
+
+@pytest.mark.parametrize(
+    "question, intent",
+    [
+        ("현대해상의 기본플랜 보험료를 알려줘", IntentType.COMPARE_QUESTION),
+        ("35세 남성 무해지 기본플랜 보험료 순위", IntentType.COMPARE_QUESTION),
+        ("외상후 스트레스 장애(PTSD)를 보장하는 보험은?", IntentType.POLICY_QUESTION),
+        ("DB손해보험 약관에서 보험금 지급 거절 사유 알려줘", IntentType.POLICY_QUESTION),
+    ],
+)
+def test_classifier_short_circuits_clear_questions(question: str, intent: IntentType) -> None:
+    assert LocalIntentClassifier().classify(question) == intent
+
+
+@pytest.mark.parametrize("question", ["안녕하세요", "메리츠화재와 한화손해보험 암 보장 차이점"])
+def test_classifier_defers_ambiguous_questions(question: str) -> None:
+    assert LocalIntentClassifier().classify(question) is None
+
+
+def test_intent_handler_falls_back_to_llm_and_reports_rate() -> None:
+    classifier = LocalIntentClassifier()
+    client = FakeOpenAI(IntentType.POLICY_QUESTION)
+    handler = IntentHandler(client, FakeTemplateManager(), classifier=classifier)
+
+    assert handler.handle("현대해상의 기본플랜 보험료를 알려줘") == IntentType.COMPARE_QUESTION
+    assert client.calls == 0
+    assert handler.handle("안녕하세요") == IntentType.POLICY_QUESTION
+    assert client.calls == 1
+
+    assert classifier.stats() == {"total": 2, "short_circuited": 1, "llm_fallback": 1, "short_circuit_rate": 0.5}
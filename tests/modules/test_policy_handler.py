@@ -0,0 +1,86 @@
+import asyncio
+
+import numpy as np
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from models.answer_cache import SemanticAnswerCache
+from models.generate_answer import NO_RESULTS_MESSAGE, PolicyResponse
+from modules.handler import PolicyHandler, StreamChunk
+from options.enums import StreamChunkKind
+
+VECTORS = {
+    "PTSD 보장하는 보험은?": [1.0, 0.0],
+    "PTSD 보장해주는 보험은?": [0.99, 0.05],
+    "암 진단비 알려줘": [0.0, 1.0],
+}
+
+
+def fake_embed(text: str) -> np.ndarray:
+    return np.array([VECTORS[text]], dtype=np.float32)
+
+
+class FakeLoader:
+    base_path = "/tmp/insu_data"
+
+
+class FakePolicy:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate_answer(self, user_input: str, search_results: list[dict]) -> str:
+        self.calls += 1
+        return f"답변 {self.calls}"
+
+
+def test_policy_handler_skips_search_and_llm_on_hit() -> None:
+    policy = FakePolicy()
+    handler = PolicyHandler(None, None, FakeLoader(), policy, answer_cache=SemanticAnswerCache(fake_embed))
+    searches = []
+    handler.load_collections = lambda user_input: setattr(handler, "use_collections", ["Samsung"])
+    handler.search = lambda user_input: searches.append(user_input) or []
+
+    assert handler.handle("PTSD 보장하는 보험은?") == "답변 1"
+    assert handler.handle("PTSD 보장해주는 보험은?") == "답변 1"
+    assert handler.handle("암 진단비 알려줘") == "답변 2"
+    assert policy.calls == 2 and len(searches) == 2
+
+
+def test_policy_handler_streams_context_then_tokens(monkeypatch) -> None:
+    policy = PolicyResponse("test-key")
+    # 글자 단위로 토큰을 내보내는 가짜 스트리밍 LLM
+    monkeypatch.setattr(policy, "policy_model", lambda: FakeListChatModel(responses=["보장됩니다."]))
+    answer_cache = SemanticAnswerCache(fake_embed)
+    handler = PolicyHandler(None, None, FakeLoader(), policy, answer_cache=answer_cache)
+    handler.load_collections = lambda user_input: setattr(handler, "use_collections", ["Samsung"])
+    handler.search = lambda user_input: [
+        {"collection": "Samsung", "metadata": {"header1": "제3조 보험금의 지급사유", "text": "PTSD 진단 시 지급"}}
+    ]
+
+    async def collect(question: str) -> list[StreamChunk]:
+        return [chunk async for chunk in handler.astream(question)]
+
+    chunks = asyncio.run(collect("PTSD 보장하는 보험은?"))
+    assert chunks[0] == StreamChunk(StreamChunkKind.CONTEXT, "참고 문서\n- Samsung 제3조 보험금의 지급사유")
+    tokens = [chunk.content for chunk in chunks[1:]]
+    assert len(tokens) > 1 and "".join(tokens) == "보장됩니다."
+
+    # 스트리밍한 전체 답변을 캐시해 다음 질문은 한 번에 반환
+    assert asyncio.run(collect("PTSD 보장해주는 보험은?")) == [StreamChunk(StreamChunkKind.TOKEN, "보장됩니다.")]
+
+
+def test_policy_handler_does_not_cache_guidance_messages() -> None:
+    answer_cache = SemanticAnswerCache(fake_embed)
+    handler = PolicyHandler(None, None, FakeLoader(), PolicyResponse("test-key"), answer_cache=answer_cache)
+    handler.load_collections = lambda user_input: setattr(handler, "use_collections", ["Samsung"])
+    searches = []
+    handler.search = lambda user_input: searches.append(user_input) or []
+
+    async def collect(question: str) -> str:
+        return "".join([chunk.content async for chunk in handler.astream(question)])
+
+    assert handler.handle("PTSD 보장하는 보험은?") == NO_RESULTS_MESSAGE
+    assert asyncio.run(handler.ahandle("PTSD 보장하는 보험은?")) == NO_RESULTS_MESSAGE
+    assert asyncio.run(collect("PTSD 보장하는 보험은?")) == NO_RESULTS_MESSAGE
+    # 안내 문구는 캐시되지 않아 매번 다시 검색
+    assert len(searches) == 3
+    assert handler.find_cached_answer("PTSD 보장하는 보험은?") is None
@@ -0,0 +1,26 @@
+import time
+
+from modules.session_store import InMemorySessionStore
+
+
+def test_session_store_evicts_least_recently_used_sessions() -> None:
+    store = InMemorySessionStore(max_sessions=2)
+    store.get_user_state("a").insu_age = 40
+    store.get_user_state("b").insu_age = 50
+    store.get_user_state("a")
+    store.get_user_state("c")  # 가장 오래 안 쓴 b 제거
+
+    assert len(store) == 2
+    assert store.get_user_state("a").insu_age == 40
+    assert store.get_user_state("b").insu_age == 25
+
+
+def test_session_store_expires_idle_sessions() -> None:
+    store = InMemorySessionStore(idle_ttl=0.05)
+    store.get_user_state("a").insu_age = 40
+    store.get_user_state("b").insu_age = 50
+    for _ in range(3):
+        time.sleep(0.02)
+        assert store.get_user_state("a").insu_age == 40  # 사용 중인 세션은 만료 시간이 연장됨
+
+    assert store.get_user_state("b").insu_age == 25
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from db.connection_pool import ConnectionPool
+from db.sql_utils import TemplateManager, set_connection_pool
+from db.sqlite_client import SQLiteConnection
+from modules.handler import StreamChunk
+from options.enums import StreamChunkKind, TraceStage
+from services.insurance_service import InsuranceService
+from util.tracing import Tracer
+
+SQL = "SELECT ic.company_name AS 보험사명 FROM insu_company ic ORDER BY ic.company_name"
+
+
+def respond(messages: list[dict[str, str]]) -> SimpleNamespace:
+    system = messages[0]["content"]
+    content = SQL if "SQL" in system else json.dumps({"보험사": []}) if "JSON" in system else "비교설계 질문"
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=len(messages[-1]["content"]), completion_tokens=len(content)),
+    )
+
+
+class SyncClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages: list[dict[str, str]], **kwargs: object) -> SimpleNamespace:
+        self.calls += 1
+        return respond(messages)
+
+
+class AsyncClient(SyncClient):
+    async def create(self, messages: list[dict[str, str]], **kwargs: object) -> SimpleNamespace:  # type: ignore
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return respond(messages)
+
+
+@pytest.fixture
+def sqlite_pool(tmp_path: Path):
+    database = str(tmp_path / "insu.db")
+    conn = SQLiteConnection.with_schema(database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO insu_company VALUES ('C01', '현대해상화재', 1)")
+        cursor.execute("INSERT INTO insu_product VALUES ('C01', 'P01', '굿앤굿어린이종합보험', 1)")
+        cursor.execute("INSERT INTO coverage VALUES ('CV01', '상해사망', 10000000, 1)")
+        cursor.execute("INSERT INTO comparison VALUES ('홍길동', 25, 1, 'nr', '20y_100', 'C01', 'P01', 'CV01', 1200)")
+    conn.commit()
+    conn.close()
+    pool = ConnectionPool(lambda: SQLiteConnection(database), size=4)
+    set_connection_pool(pool)
+    yield pool
+    set_connection_pool(None)
+
+
+def test_aget_user_response_uses_async_client(sqlite_pool: ConnectionPool, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 요청마다 커넥션을 빌리는지 확인하기 위해 비교설계 캐시는 끔
+    monkeypatch.setattr("modules.handler.query_cache", None)
+    sync_client, async_client = SyncClient(), AsyncClient()
+    service = InsuranceService(
+        sync_client,
+        TemplateManager(templates_dir=PROJECT_ROOT / "prompts"),
+        async_openai_client=async_client,
+    )
+
+    async def run() -> list[str]:
+        return await asyncio.gather(
+            *(service.aget_user_response("현대해상의 기본플랜 보험료를 알려줘") for _ in range(4))
+        )
+
+    responses = asyncio.run(run())
+
+    assert [json.loads(response)["보험사"][0]["보험료합계"] for response in responses] == [1200] * 4
+    # 의도분류는 로컬에서, 기본플랜 보험료 SQL은 템플릿으로, 결과 JSON은 직접 변환해 LLM을 호출하지 않음
+    assert (sync_client.calls, async_client.calls) == (0, 0)
+    assert sqlite_pool.metrics()["checkouts"] == 4
+
+
+def test_user_state_is_scoped_to_session(sqlite_pool: ConnectionPool) -> None:
+    service = InsuranceService(SyncClient(), TemplateManager(templates_dir=PROJECT_ROOT / "prompts"))
+
+    service.get_user_response("40세 여자 기본플랜 보험료 알려줘", session_id="a")
+    service.get_user_response("현대해상의 기본플랜 보험료를 알려줘", session_id="b")
+
+    state_a = service.session_store.get_user_state("a")
+    state_b = service.session_store.get_user_state("b")
+    assert (state_a.insu_age, state_a.insu_sex) == (40, 0)
+    assert (state_b.insu_age, state_b.insu_sex) == (25, 1)
+
+    # 같은 세션의 다음 질문은 이전에 입력한 나이/성별을 유지
+    service.get_user_response("현대해상의 기본플랜 보험료를 알려줘", session_id="a")
+    assert service.session_store.get_user_state("a").insu_age == 40
+
+    service.end_session("a")
+    assert service.session_store.get_user_state("a").insu_age == 25
+
+
+def test_astream_user_response_records_timings(sqlite_pool: ConnectionPool) -> None:
+    service = InsuranceService(SyncClient(), TemplateManager(templates_dir=PROJECT_ROOT / "prompts"))
+
+    async def collect() -> list[StreamChunk]:
+        return [chunk async for chunk in service.astream_user_response("40세 여자 기본플랜 보험료 알려줘", "a")]
+
+    chunks = asyncio.run(collect())
+
+    # 비교설계 질문은 스트리밍 없이 전체 응답을 토큰 하나로 보내고 마지막에 지연 시간을 보냄
+    assert [chunk.kind for chunk in chunks] == [StreamChunkKind.TOKEN, StreamChunkKind.DONE]
+    timings = chunks[-1].timings
+    assert timings is not None and 0 <= timings.first_token <= timings.total
+    assert service.session_store.get_user_state("a").insu_age == 40
+
+
+def test_request_is_traced_by_stage(sqlite_pool: ConnectionPool, monkeypatch: pytest.MonkeyPatch) -> None:
+    tracer = Tracer(enabled=True)
+    for module in ("modules.handler", "db.sql_utils", "services.insurance_service"):
+        monkeypatch.setattr(f"{module}.tracer", tracer)
+    monkeypatch.setattr("modules.handler.query_cache", None)
+    monkeypatch.setattr("modules.handler.premium_cube_store", None)
+    service = InsuranceService(SyncClient(), TemplateManager(templates_dir=PROJECT_ROOT / "prompts"))
+
+    service.get_user_response("보험사 이름 목록 보여줘")
+
+    trace = tracer.traces[-1]
+    stages = {child["name"]: child for child in trace["children"]}
+    assert trace["name"] == TraceStage.REQUEST and trace["attributes"]["intent"] == "비교설계 질문"
+    assert list(stages) == [
+        TraceStage.INTENT,
+        TraceStage.SQL_GENERATION,
+        TraceStage.DB_EXECUTE,
+        TraceStage.JSON_CONVERSION,
+    ]
+    # 템플릿에 없는 질문이라 SQL 생성과 JSON 변환 모두 LLM을 호출하고 토큰 수가 기록됨
+    assert stages[TraceStage.SQL_GENERATION]["attributes"] == {"source": "llm"}
+    assert stages[TraceStage.JSON_CONVERSION]["attributes"] == {"method": "llm"}
+    assert stages[TraceStage.SQL_GENERATION]["completion_tokens"] == len(SQL)
+    assert stages[TraceStage.DB_EXECUTE]["attributes"] == {"source": "db", "cache_hit": False, "rows": 1}
+    assert trace["total_prompt_tokens"] == sum(child["prompt_tokens"] for child in trace["children"]) > 0
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import util.keyword_mapping as keyword_mapping
+from config.settings import settings
+
+MAPPING = {"현대해상": ["현대해상", "현대"], "삼성화재": ["삼성화재", "삼성"]}
+
+
+@pytest.fixture
+def llm_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    calls: list[int] = []
+
+    def fake_mapping() -> dict[str, list[str]]:
+        calls.append(1)
+        return MAPPING
+
+    monkeypatch.setattr(settings, "keyword_mapping_path", str(tmp_path / "insu_keywords.json"))
+    monkeypatch.setattr(keyword_mapping, "insurance_keywords_mapping", fake_mapping)
+    keyword_mapping.clear_keyword_mapping_cache()
+    yield calls
+    keyword_mapping.clear_keyword_mapping_cache()
+
+
+def test_mapping_is_built_once_and_persisted(llm_calls: list[int], tmp_path: Path) -> None:
+    assert keyword_mapping.get_insurance_keywords() == MAPPING
+    assert keyword_mapping.get_insurance_keywords() == MAPPING
+    assert len(llm_calls) == 1
+
+    saved = json.loads((tmp_path / "insu_keywords.json").read_text(encoding="utf-8"))
+    assert saved["version"] == keyword_mapping.KEYWORD_MAPPING_VERSION
+    assert saved["source_hash"] == keyword_mapping.keyword_source_hash()
+
+    # 프로세스를 다시 띄운 것처럼 메모리 캐시만 비우면 파일에서 읽음
+    keyword_mapping.clear_keyword_mapping_cache()
+    assert keyword_mapping.get_insurance_keywords() == MAPPING
+    assert len(llm_calls) == 1
+
+
+def test_mapping_is_rebuilt_when_source_changes(llm_calls: list[int], monkeypatch: pytest.MonkeyPatch) -> None:
+    keyword_mapping.get_insurance_keywords()
+    monkeypatch.setattr(keyword_mapping, "nh_keywords", ["NH농협손해보험", "농협"])
+    keyword_mapping.get_insurance_keywords()
+    assert len(llm_calls) == 2
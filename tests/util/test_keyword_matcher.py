@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from options.insu_name import comparison_keywords, insurance_type_keywords
+from util.keyword_matcher import KeywordMatcher, normalize_text
+
+COMPANY_KEYWORDS = {
+    "NH농협손해보험": ["NH농협손해보험", "NH손보", "농협", "NH"],
+    "DB손해보험": ["db손해보험", "db", "디비"],
+    "현대해상": ["현대해상", "현대"],
+    "삼성화재": ["삼성화재", "삼성"],
+}
+
+
+def reference_find(question: str) -> tuple[list[str], bool, list[str]]:
+    companies = [
+        company
+        for company, keywords in COMPANY_KEYWORDS.items()
+        if re.search("|".join(re.escape(normalize_text(keyword)) for keyword in keywords), question)
+    ]
+    is_comparison = any(normalize_text(keyword) in question for keyword in comparison_keywords)
+    types = [keyword for keyword in insurance_type_keywords if keyword in question]
+    return companies, is_comparison, types
+
+
+@pytest.fixture(scope="module")
+def matcher() -> KeywordMatcher:
+    return KeywordMatcher(COMPANY_KEYWORDS, insurance_type_keywords, comparison_keywords)
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "현대해상의 기본플랜 보험료를 알려줘",
+        "NH농협손해보험이랑 DB손해보험 암 보장 차이점",
+        "삼성화재 화재보험과 자동차 보험 뭐가 더 나은가",
+        "외상후 스트레스 장애(PTSD)를 보장하는 보험은?",
+        "농협 실손 상해 질병 운전자",
+        "",
+    ],
+)
+def test_matcher_matches_reference(matcher: KeywordMatcher, question: str) -> None:
+    normalized = normalize_text(question)
+    assert matcher.find(normalized) == reference_find(normalized)
+
+
+def test_matcher_finds_overlapping_keywords(matcher: KeywordMatcher) -> None:
+    companies, is_comparison, types = matcher.find(normalize_text("삼성화재 비교해줘"))
+    assert companies == ["삼성화재"]
+    assert is_comparison
+    # "삼성화재" 안에 포함된 "화재"도 함께 감지
+    assert types == ["화재"]
+
+
+def test_matcher_normalizes_keywords(matcher: KeywordMatcher) -> None:
+    companies, is_comparison, _ = matcher.find(normalize_text("NH 손보랑 비교하면 뭐가 더 나은가"))
+    assert companies == ["NH농협손해보험"]
+    assert is_comparison
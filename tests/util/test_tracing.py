@@ -0,0 +1,96 @@
+import asyncio
+import json
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+from util.tracing import NOOP_SPAN, Tracer
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    tracer = Tracer(enabled=False)
+
+    with tracer.span("request") as span:
+        span.set(intent="x")
+        tracer.record_usage(10, 5)
+
+    assert span is NOOP_SPAN
+    assert list(tracer.traces) == [] and tracer.stages == {}
+
+
+def test_nested_spans_and_tokens(tmp_path: Path) -> None:
+    jsonl_path = tmp_path / "traces.jsonl"
+    tracer = Tracer(enabled=True, jsonl_path=str(jsonl_path))
+
+    with tracer.span("request", session_id="a") as root:
+        with tracer.span("intent") as span:
+            span.set(source="llm")
+            tracer.record_openai_usage(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=30, completion_tokens=4)))
+        with tracer.span("sql_generation"):
+            tracer.record_usage(100, 20)
+        root.set(intent="비교설계 질문")
+
+    lines = jsonl_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    trace = json.loads(lines[0])
+    assert trace == tracer.traces[-1]
+    assert trace["name"] == "request" and trace["attributes"] == {"session_id": "a", "intent": "비교설계 질문"}
+    assert [child["name"] for child in trace["children"]] == ["intent", "sql_generation"]
+    assert trace["children"][0]["attributes"] == {"source": "llm"}
+    assert (trace["total_prompt_tokens"], trace["total_completion_tokens"]) == (130, 24)
+
+
+def test_error_is_recorded_and_context_restored() -> None:
+    tracer = Tracer(enabled=True)
+    try:
+        with tracer.span("request"):
+            with tracer.span("db_execute"):
+                raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert tracer.traces[-1]["children"][0]["attributes"] == {"error": "RuntimeError"}
+    assert tracer.current_span() is None
+
+
+def test_async_requests_and_worker_threads_are_separate_traces() -> None:
+    tracer = Tracer(enabled=True)
+
+    @tracer.traced("faiss_search")
+    def search() -> None:
+        tracer.record_usage(1, 0)
+
+    @tracer.traced("request")
+    async def request() -> None:
+        await asyncio.sleep(0.01)
+        # asyncio.to_thread는 컨텍스트를 복사하므로 워커 스레드의 단계도 같은 요청 아래에 기록됨
+        await asyncio.to_thread(search)
+
+    async def run() -> None:
+        await asyncio.gather(request(), request(), request())
+
+    asyncio.run(run())
+
+    assert len(tracer.traces) == 3
+    assert all([child["name"] for child in trace["children"]] == ["faiss_search"] for trace in tracer.traces)
+    assert tracer.stages["faiss_search"].count == 3 and tracer.stages["faiss_search"].prompt_tokens == 3
+
+
+def test_prometheus_text_and_endpoint() -> None:
+    tracer = Tracer(enabled=True)
+    with tracer.span("request"):
+        with tracer.span("answer_generation"):
+            tracer.record_usage(50, 7)
+
+    text = tracer.prometheus_text()
+    assert 'insu_stage_duration_seconds_count{stage="request"} 1' in text
+    assert 'insu_stage_duration_seconds_bucket{stage="answer_generation",le="+Inf"} 1' in text
+    assert 'insu_llm_tokens_total{stage="answer_generation",type="completion"} 7' in text
+
+    server = tracer.serve_metrics(0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.read().decode("utf-8") == tracer.prometheus_text()
+    finally:
+        server.shutdown()
+        server.server_close()